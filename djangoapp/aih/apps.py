@@ -4,3 +4,8 @@ class AihConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'aih'
     verbose_name = "Gestão de AIH"
+
+    def ready(self):
+        from fila_cirurgica.auditoria import auditar
+        from .models import AihSolicitacao
+        auditar(AihSolicitacao, "aih")
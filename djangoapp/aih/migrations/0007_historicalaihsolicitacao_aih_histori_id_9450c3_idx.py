@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aih', '0006_aihsolicitacao_cadastrado_na_fila_and_more'),
+        ('fila_cirurgica', '0011_registroalteracao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historicalaihsolicitacao',
+            index=models.Index(fields=['id', 'history_date'], name='aih_histori_id_9450c3_idx'),
+        ),
+    ]
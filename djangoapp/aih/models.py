@@ -1,14 +1,15 @@
 from django.db import models
 
-from fila_cirurgica.models import EspecialidadeAghu, PacienteAghu, ProcedimentoAghu, ProfissionalAghu
-from simple_history.models import HistoricalRecords
+from fila_cirurgica.models import (
+    EspecialidadeAghu, HistoricalRecordsIndexados, PacienteAghu, ProcedimentoAghu, ProfissionalAghu,
+)
 
 class AihSolicitacao(models.Model):
     """
     Representa o Laudo para Solicitação/Autorização de Internação Hospitalar (AIH).
     Todos os campos são opcionais (blank=True, null=True).
     """
-    history = HistoricalRecords()
+    history = HistoricalRecordsIndexados()
     
     # Flag para controlar se esta AIH já foi enviada para a fila cirúrgica.
     cadastrado_na_fila = models.BooleanField(
@@ -1,3 +1,35 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from fila_cirurgica.arquivamento import arquivar
+from fila_cirurgica.models import HistoricoArquivado, RegistroAlteracao
+
+from .models import AihSolicitacao
+
+
+class AihAuditoriaTests(TestCase):
+    def test_alteracao_gera_registro(self):
+        aih = AihSolicitacao.objects.create(nome_paciente="Maria")
+        aih.nome_paciente = "Maria da Silva"
+        aih._change_reason = "Correção do nome"
+        aih.save()
+
+        registros = list(RegistroAlteracao.objects.do_objeto(aih))
+        self.assertEqual([r.tipo for r in registros], ["~", "+"])
+        self.assertEqual(registros[0].motivo, "Correção do nome")
+        diffs = {d["campo"]: (d["antes"], d["depois"]) for d in registros[0].diffs}
+        self.assertEqual(diffs["nome_paciente"], ("Maria", "Maria da Silva"))
+
+    def test_arquivamento(self):
+        aih = AihSolicitacao.objects.create(nome_paciente="Maria")
+        aih.nome_paciente = "Maria da Silva"
+        aih.save()
+        antigo = timezone.now() - timedelta(days=400)
+        for i, h in enumerate(aih.history.order_by("history_id")):
+            aih.history.filter(pk=h.pk).update(history_date=antigo + timedelta(minutes=i))
 
-# Create your tests here.
+        self.assertEqual(arquivar(AihSolicitacao), 1)
+        self.assertEqual(aih.history.get().nome_paciente, "Maria da Silva")
+        self.assertEqual(HistoricoArquivado.objects.get().dados["nome_paciente"], "Maria")
@@ -17,12 +17,8 @@ from .models import (
     ProfissionalAghu,
     IndicadorEspecialidade,
 )
-from .api_helpers import (
-    get_or_create_paciente,
-    get_or_create_procedimento,
-    get_or_create_especialidade,
-    get_or_create_profissional
-)
+from .api_helpers import resolver_entidades
+from .remocao import remover_da_fila
 from django.conf import settings
 from django.utils.html import format_html
 from .forms import ListaEsperaCirurgicaForm
@@ -38,7 +34,6 @@ from django.http import HttpResponseRedirect
 from django.views.generic import FormView
 from unfold.views import UnfoldModelAdminViewMixin
 import requests
-from simple_history.utils import update_change_reason
 from django.urls import reverse
 from django.utils.html import format_html
 from django.contrib.admin.utils import quote
@@ -212,14 +207,13 @@ class RemoverDaFilaView(UnfoldModelAdminViewMixin, FormView):
         motivo = form.cleaned_data['motivo']
         ids = self.request.GET.get('ids', '').split(',')
         queryset = self.model_admin.get_queryset(self.request).filter(pk__in=ids)
-        
-        count = queryset.count()
-        for obj in queryset:
-            obj.ativo = False
-            obj.motivo_saida = motivo
-            obj.save()
-            update_change_reason(obj, form.cleaned_data.get('change_reason', ''))
-        
+
+        count = remover_da_fila(
+            queryset, motivo,
+            change_reason=form.cleaned_data.get('change_reason', ''),
+            usuario=self.request.user,
+        )
+
         # Linha correta
         self.model_admin.message_user(self.request, f"{count} pacientes removidos da fila com sucesso.", messages.SUCCESS)
         
@@ -299,19 +293,17 @@ class ListaEsperaCirurgicaAdmin(SimpleHistoryAdmin, ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         """Processa campos de autocomplete com dados da API externa."""
-        try:    
-            # if not obj:
-            # Paciente
-            obj.paciente = get_or_create_paciente(form.cleaned_data.get('paciente_api_choice'))
-
-            # Procedimento
-            obj.procedimento = get_or_create_procedimento(form.cleaned_data.get('procedimento_api_choice'))
-
-            # Especialidade
-            obj.especialidade = get_or_create_especialidade(form.cleaned_data.get('especialidade_api_choice'))
-
-            # Médico (opcional)
-            obj.medico = get_or_create_profissional(form.cleaned_data.get('medico_api_choice'))
+        try:
+            # Paciente, procedimento, especialidade e médico (opcional),
+            # buscados em paralelo na API
+            objs = resolver_entidades({
+                'paciente': ('paciente', form.cleaned_data.get('paciente_api_choice')),
+                'procedimento': ('procedimento', form.cleaned_data.get('procedimento_api_choice')),
+                'especialidade': ('especialidade', form.cleaned_data.get('especialidade_api_choice')),
+                'medico': ('profissional', form.cleaned_data.get('medico_api_choice')),
+            })
+            for campo, valor in objs.items():
+                setattr(obj, campo, valor)
 
         except requests.RequestException as e:
             self.message_user(
@@ -321,10 +313,9 @@ class ListaEsperaCirurgicaAdmin(SimpleHistoryAdmin, ModelAdmin):
             )
             return
 
-        # Salva o registro
+        # Salva o registro (o motivo vai junto no registro de histórico)
+        obj._change_reason = form.cleaned_data.get('change_reason', '')
         super().save_model(request, obj, form, change)
-
-        update_change_reason(obj, form.cleaned_data.get('change_reason', ''))
         
     def judicial_personalizado(self, obj):
         if obj.medida_judicial:
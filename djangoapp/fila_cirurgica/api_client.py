@@ -0,0 +1,177 @@
+# fila_cirurgica/api_client.py
+"""
+Cliente HTTP compartilhado para a API de fila (FastAPI).
+
+Os proxies de autocomplete são views assíncronas; todas reutilizam o mesmo
+``httpx.AsyncClient`` (e, portanto, o mesmo pool de conexões keep-alive)
+dentro de um event loop, em vez de abrir uma conexão nova a cada tecla.
+Os helpers síncronos (``api_helpers.py``) usam ``get_json``, com uma
+``requests.Session`` por thread; as exportações NDJSON dos catálogos são
+lidas em stream por ``iter_ndjson``.
+
+GETs idênticos em andamento ao mesmo tempo são coalescidos: os chamadores
+concorrentes esperam uma única ida à API e compartilham o JSON retornado
+(que deve ser tratado como somente leitura).
+
+Com a API indisponível segundo ``/health/ready`` (ver ``prontidao.py``),
+as chamadas falham na hora, sem esperar o timeout.
+
+Toda chamada leva o ``X-Request-ID`` da requisição corrente e soma seu
+tempo na fase ``api`` do Server-Timing (ver ``gestor_fila_hulw.tracing``).
+"""
+import asyncio
+import json
+import threading
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from gestor_fila_hulw import tracing
+
+from . import prontidao
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+# Um cliente por event loop: sob ASGI (uvicorn) existe um único loop por
+# processo; sob WSGI o Django roda cada view async em um loop próprio.
+_async_clients = weakref.WeakKeyDictionary()
+_thread_local = threading.local()
+
+_inflight = SingleFlight()
+_async_inflight = AsyncSingleFlight()
+
+
+def api_url(path: str) -> str:
+    """Monta a URL absoluta de um recurso da API (``/api/v1/<path>``)."""
+    return f"{settings.API_BASE_URL}/api/v1/{path.lstrip('/')}"
+
+
+def _request_key(path: str, params: dict = None):
+    return (path, tuple(sorted((params or {}).items())))
+
+
+def _trace_headers() -> dict:
+    request_id = tracing.get_request_id()
+    return {tracing.REQUEST_ID_HEADER: request_id} if request_id else {}
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=settings.API_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=settings.API_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.API_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Retorna o cliente assíncrono associado ao event loop corrente."""
+    loop = asyncio.get_running_loop()
+
+    # Descarta clientes de loops já encerrados (caso WSGI)
+    for old_loop in [l for l in _async_clients.keys() if l.is_closed()]:
+        _async_clients.pop(old_loop, None)
+
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_async_client()
+        _async_clients[loop] = client
+    return client
+
+
+def get_session() -> requests.Session:
+    """Retorna a ``requests.Session`` (keep-alive) da thread corrente."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+# Header com o cursor (keyset) da próxima página nas listagens da API
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+INDISPONIVEL = "API de fila indisponível (/health/ready); tente novamente em instantes"
+
+
+async def _afetch(path: str, params: dict = None, timeout: float = None):
+    """GET coalescido; devolve ``(json, cursor da próxima página ou None)``."""
+    if not prontidao.permite():
+        raise httpx.ConnectError(INDISPONIVEL)
+
+    async def _fetch():
+        client = get_async_client()
+        response = await client.get(
+            api_url(path),
+            params=params,
+            headers=_trace_headers(),
+            timeout=timeout if timeout is not None else settings.API_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json(), response.headers.get(NEXT_CURSOR_HEADER) or None
+
+    with tracing.timed("api"):
+        return await _async_inflight.do(_request_key(path, params), _fetch)
+
+
+async def aget_json(path: str, params: dict = None, timeout: float = None):
+    """
+    GET assíncrono em ``/api/v1/<path>`` retornando o JSON decodificado.
+    Lança ``httpx.HTTPError`` em falhas de rede ou status 4xx/5xx.
+    """
+    data, _cursor = await _afetch(path, params, timeout)
+    return data
+
+
+async def aget_page(path: str, params: dict = None, timeout: float = None):
+    """
+    Como ``aget_json``, para listagens paginadas por cursor: retorna
+    ``(itens, next_cursor)``; ``next_cursor`` é None na última página.
+    """
+    return await _afetch(path, params, timeout)
+
+
+def get_json(path: str, params: dict = None, timeout: float = None):
+    """
+    GET síncrono em ``/api/v1/<path>`` retornando o JSON decodificado.
+    Lança ``requests.RequestException`` em falhas de rede ou status 4xx/5xx.
+    """
+    if not prontidao.permite():
+        raise requests.ConnectionError(INDISPONIVEL)
+
+    def _fetch():
+        response = get_session().get(
+            api_url(path),
+            params=params,
+            headers=_trace_headers(),
+            timeout=timeout if timeout is not None else settings.API_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    with tracing.timed("api"):
+        return _inflight.do(_request_key(path, params), _fetch)
+
+
+def iter_ndjson(path: str, params: dict = None, timeout: float = None):
+    """
+    GET síncrono em ``/api/v1/<path>`` para respostas NDJSON (ex.:
+    ``especialidades/export``): gera um objeto por linha, conforme chegam,
+    sem carregar a resposta inteira. Sem coalescência. Lança
+    ``requests.RequestException`` como ``get_json``.
+    """
+    if not prontidao.permite():
+        raise requests.ConnectionError(INDISPONIVEL)
+    with get_session().get(
+        api_url(path),
+        params=params,
+        headers=_trace_headers(),
+        timeout=timeout if timeout is not None else settings.API_TIMEOUT,
+        stream=True,
+    ) as response:
+        response.raise_for_status()
+        for linha in response.iter_lines():
+            if linha:
+                yield json.loads(linha)
@@ -1,7 +1,26 @@
 # fila_cirurgica/api_helpers.py
+"""
+Resolução das entidades do AGHU (paciente, procedimento, especialidade,
+profissional) em registros locais.
+
+Local primeiro: um registro sincronizado há menos de ``API_ENTITY_TTL``
+segundos é usado sem chamar a API; um registro vencido também é usado
+na hora, mas é reconsultado em segundo plano. Só entidades nunca vistas
+bloqueiam o save esperando a API.
+"""
+import contextvars
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
 import requests
 from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from . import catalogo, prontidao
+from .api_client import get_json
 from .models import (
     PacienteAghu,
     ProcedimentoAghu,
@@ -9,115 +28,224 @@ from .models import (
     ProfissionalAghu,
 )
 
-def get_or_create_paciente(prontuario):
-    if not prontuario:
-        return None
+logger = logging.getLogger(__name__)
 
-    response = requests.get(f"{settings.API_BASE_URL}/api/v1/pacientes/{prontuario}")
-    response.raise_for_status()
-    data = response.json()
 
-    obj, created = PacienteAghu.objects.get_or_create(
-        prontuario=data['PRONTUARIO_PAC'],
-        defaults={'nome': data['NOME_PACIENTE']}
-    )
-    if not created and obj.nome != data['NOME_PACIENTE']:
-        obj.nome = data['NOME_PACIENTE']
-        obj.save()
-    return obj
+class FalhaResolucaoAPI(requests.RequestException):
+    """
+    Uma ou mais entidades não puderam ser obtidas na API.
+    Agrega todas as falhas de um mesmo ``resolver_entidades`` numa única
+    mensagem (continua sendo um ``RequestException`` para quem já trata).
+    """
 
-def get_or_create_procedimento(codigo):
-    if not codigo:
-        return None
+    def __init__(self, falhas):
+        self.falhas = falhas
+        super().__init__("; ".join(f"{rotulo}: {erro}" for rotulo, erro in falhas))
 
-    response = requests.get(f"{settings.API_BASE_URL}/api/v1/procedimentos/{codigo}")
-    response.raise_for_status()
-    data = response.json()
 
-    obj, created = ProcedimentoAghu.objects.get_or_create(
-        codigo=data['COD_PROCEDIMENTO'],
-        defaults={'nome': data['PROCEDIMENTO']}
+Entidade = namedtuple(
+    "Entidade",
+    "recurso rotulo model campo_codigo campo_nome chave_codigo chave_nome",
+)
+
+ENTIDADES = {
+    'paciente': Entidade('pacientes', 'Paciente', PacienteAghu,
+                         'prontuario', 'nome', 'PRONTUARIO_PAC', 'NOME_PACIENTE'),
+    'procedimento': Entidade('procedimentos', 'Procedimento', ProcedimentoAghu,
+                             'codigo', 'nome', 'COD_PROCEDIMENTO', 'PROCEDIMENTO'),
+    'especialidade': Entidade('especialidades', 'Especialidade', EspecialidadeAghu,
+                              'cod_especialidade', 'nome_especialidade',
+                              'COD_ESPECIALIDADE', 'NOME_ESPECIALIDADE'),
+    'profissional': Entidade('profissionais', 'Profissional', ProfissionalAghu,
+                             'matricula', 'nome', 'MATRICULA', 'NOME_PROFISSIONAL'),
+}
+
+
+# --------------------- API e banco local ---------------------
+
+def _buscar(tipo, codigo):
+    # Só código e nome vão para o banco local
+    return get_json(f"{ENTIDADES[tipo].recurso}/{codigo}", params={'fields': 'autocomplete'})
+
+
+def _upsert(tipo, data):
+    """Grava o JSON da API no registro local e marca a sincronização."""
+    ent = ENTIDADES[tipo]
+    nome = data[ent.chave_nome]
+    agora = timezone.now()
+    obj, created = ent.model.objects.get_or_create(
+        **{ent.campo_codigo: data[ent.chave_codigo]},
+        defaults={ent.campo_nome: nome, 'atualizado_em': agora},
     )
-    if not created and obj.nome != data['PROCEDIMENTO']:
-        obj.nome = data['PROCEDIMENTO']
-        obj.save()
+    if not created:
+        # Um único UPDATE, sem passar por save()
+        ent.model.objects.filter(pk=obj.pk).update(**{ent.campo_nome: nome, 'atualizado_em': agora})
+        setattr(obj, ent.campo_nome, nome)
+        obj.atualizado_em = agora
     return obj
 
-def get_or_create_especialidade(cod_especialidade):
-    if not cod_especialidade:
-        return None
 
-    response = requests.get(f"{settings.API_BASE_URL}/api/v1/especialidades/{cod_especialidade}")
-    response.raise_for_status()
-    data = response.json()
+def _locais(tipo, codigos):
+    """Registros locais já existentes, indexados pelo código (str)."""
+    ent = ENTIDADES[tipo]
+    qs = ent.model.objects.filter(**{f"{ent.campo_codigo}__in": list(codigos)})
+    return {str(getattr(obj, ent.campo_codigo)): obj for obj in qs}
 
-    obj, created = EspecialidadeAghu.objects.get_or_create(
-        cod_especialidade=data['COD_ESPECIALIDADE'],
-        defaults={'nome_especialidade': data['NOME_ESPECIALIDADE']}
-    )
-    if not created and obj.nome_especialidade != data['NOME_ESPECIALIDADE']:
-        obj.nome_especialidade = data['NOME_ESPECIALIDADE']
-        obj.save()
-    return obj
 
-def get_or_create_profissional(matricula):
-    if not matricula:
+def _vencido(obj):
+    if obj.atualizado_em is None:
+        return True
+    return timezone.now() - obj.atualizado_em > timedelta(seconds=settings.API_ENTITY_TTL)
+
+
+# --------------------- Atualização em segundo plano ---------------------
+
+# Poucas threads: a atualização de registros vencidos não tem pressa e não
+# deve disputar o pool usado pelos saves.
+_executor_bg = ThreadPoolExecutor(max_workers=2, thread_name_prefix="aghu-refresh")
+_atualizando = set()
+_atualizando_lock = threading.Lock()
+
+
+def _atualizar(tipo, codigo):
+    try:
+        _upsert(tipo, _buscar(tipo, codigo))
+    except Exception as e:
+        logger.warning("Falha ao atualizar %s %s a partir da API: %s",
+                       ENTIDADES[tipo].rotulo, codigo, e)
+    finally:
+        with _atualizando_lock:
+            _atualizando.discard((tipo, codigo))
+        # Thread do pool vive muito; não segura conexão com o banco
+        connection.close()
+
+
+def agendar_atualizacao(tipo, codigo):
+    """
+    Reconsulta a entidade na API sem bloquear (no máximo uma vez por vez).
+    Com a API sobrecarregada, não agenda: o registro local segue em uso e
+    volta a ser candidato no próximo acesso.
+    """
+    if not prontidao.permite(essencial=False):
+        return
+    chave = (tipo, str(codigo))
+    with _atualizando_lock:
+        if chave in _atualizando:
+            return
+        _atualizando.add(chave)
+    _executor_bg.submit(_atualizar, *chave)
+
+
+# --------------------- Resolução ---------------------
+
+# Pool compartilhado: limita o total de chamadas simultâneas à API vindas
+# dos saves, independentemente de quantas requisições estão em andamento.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.API_RESOLVE_WORKERS,
+    thread_name_prefix="api-resolve",
+)
+
+
+def _descrever_erro(erro):
+    response = getattr(erro, 'response', None)
+    if response is not None and response.status_code == 404:
+        return "não encontrado na API"
+    if isinstance(erro, requests.Timeout):
+        return "tempo esgotado ao consultar a API"
+    if isinstance(erro, requests.RequestException):
+        return f"falha ao consultar a API ({erro})"
+    return f"resposta inesperada da API ({erro!r})"
+
+
+def resolver_entidades(pedidos):
+    """
+    Resolve várias FKs de uma vez: ``pedidos`` é um dict
+    ``nome -> (tipo, código)``, com ``tipo`` em ``ENTIDADES``.
+
+    Registros locais são devolvidos direto (os vencidos são agendados para
+    atualização). Os que não existem localmente são buscados na API em
+    paralelo no pool (o tempo fica próximo da chamada mais lenta) e
+    gravados depois, na thread corrente. Códigos vazios resultam em
+    ``None``. Se alguma chamada falhar, nada é gravado e uma única
+    ``FalhaResolucaoAPI`` lista todas as falhas.
+    """
+    resultado = {}
+    chaves = {}
+    for nome, (tipo, codigo) in pedidos.items():
+        if not codigo:
+            resultado[nome] = None
+        else:
+            chaves[nome] = (tipo, str(codigo))
+
+    # 1. Banco local: uma query por tipo
+    objetos = {}
+    por_tipo = {}
+    for tipo, codigo in chaves.values():
+        por_tipo.setdefault(tipo, set()).add(codigo)
+    for tipo, codigos in por_tipo.items():
+        for codigo, obj in _locais(tipo, codigos).items():
+            objetos[(tipo, codigo)] = obj
+            if _vencido(obj):
+                agendar_atualizacao(tipo, codigo)
+
+    # 2. API: só o que nunca foi visto
+    futuros = {}
+    for chave in chaves.values():
+        if chave in objetos or chave in futuros:
+            continue
+        # Cada tarefa roda numa cópia do contexto (X-Request-ID, tracing)
+        ctx = contextvars.copy_context()
+        futuros[chave] = _executor.submit(ctx.run, _buscar, *chave)
+
+    dados, falhas = {}, []
+    for (tipo, codigo), futuro in futuros.items():
+        try:
+            dados[(tipo, codigo)] = futuro.result()
+        except Exception as e:
+            falhas.append((f"{ENTIDADES[tipo].rotulo} {codigo}", _descrever_erro(e)))
+    if falhas:
+        raise FalhaResolucaoAPI(falhas)
+
+    for chave, data in dados.items():
+        objetos[chave] = _upsert(chave[0], data)
+
+    for nome, chave in chaves.items():
+        resultado[nome] = objetos[chave]
+    return resultado
+
+
+def _resolver_um(tipo, codigo):
+    if not codigo:
         return None
+    return resolver_entidades({tipo: (tipo, codigo)})[tipo]
 
-    response = requests.get(f"{settings.API_BASE_URL}/api/v1/profissionais/{matricula}")
-    response.raise_for_status()
-    data = response.json()
 
-    obj, created = ProfissionalAghu.objects.get_or_create(
-        matricula=data['MATRICULA'],
-        defaults={'nome': data['NOME_PROFISSIONAL']}
-    )
-    if not created and obj.nome != data['NOME_PROFISSIONAL']:
-        obj.nome = data['NOME_PROFISSIONAL']
-        obj.save()
-    return obj
-# Adicionar no final de fila_cirurgica/api_helpers.py
+def get_or_create_paciente(prontuario):
+    return _resolver_um('paciente', prontuario)
+
+def get_or_create_procedimento(codigo):
+    return _resolver_um('procedimento', codigo)
+
+def get_or_create_especialidade(cod_especialidade):
+    return _resolver_um('especialidade', cod_especialidade)
+
+def get_or_create_profissional(matricula):
+    return _resolver_um('profissional', matricula)
 
 def validar_procedimento_na_especialidade(procedimento_id: str, especialidade_id: str) -> bool:
     """
-    Verifica via API se um procedimento específico pertence a uma especialidade.
-
-    Esta função é usada para validação no backend (forms.py) para garantir
-    que a combinação enviada pelo usuário é válida.
+    Verifica se um procedimento específico pertence a uma especialidade,
+    consultando o índice local (``catalogo``), sem chamada de rede.
 
-    Retorna True se a combinação for válida, False caso contrário.
+    Retorna True se a combinação for válida, False caso contrário. Se o
+    índice não puder ser carregado, é mais seguro invalidar a submissão
+    para forçar uma nova tentativa do usuário.
     """
     if not procedimento_id or not especialidade_id:
         return False
 
-    # A URL e os parâmetros são baseados na lógica encontrada em `utils.api_autocomplete_procedimento`
-    api_url = f"{settings.API_BASE_URL}/procedimentos/"
-    params = {
-        'cod_especialidade': especialidade_id,
-        'term': procedimento_id,  # Usamos 'term' para buscar o código específico
-        'limit': 1                # Só precisamos de 1 resultado para confirmar a existência
-    }
-
     try:
-        # Assumindo que a validação não precisa de autenticação especial,
-        # caso contrário, adicione os headers necessários.
-        response = requests.get(api_url, params=params, timeout=5)
-        response.raise_for_status()  # Lança erro para status 4xx/5xx
-        data = response.json()
-
-        # Normaliza a resposta (pode ser lista ou dict com 'results')
-        if isinstance(data, dict) and 'results' in data:
-            items = data['results']
-        else:
-            items = data
-        
-        # Se a API retornou algum item que corresponde à busca, a combinação é válida.
-        # Para uma validação mais estrita, poderíamos verificar se o ID do item retornado
-        # é exatamente igual ao `procedimento_id`, mas `len(items) > 0` é suficiente aqui.
-        return len(items) > 0
-
-    except requests.RequestException as e:
-        # Em caso de falha na API, é mais seguro invalidar a submissão
-        # para forçar uma nova tentativa do usuário.
-        print(f"ERRO DE VALIDAÇÃO: Falha ao contatar a API para validar procedimento. {e}")
-        return False
\ No newline at end of file
+        return catalogo.procedimento_pertence(especialidade_id, procedimento_id)
+    except catalogo.IndiceIndisponivel as e:
+        logger.warning("Índice especialidade/procedimento indisponível: %s", e)
+        return False
@@ -5,3 +5,8 @@ class FilaCirurgicaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fila_cirurgica'
     verbose_name = 'Fila Cirúrgica'
+
+    def ready(self):
+        from .auditoria import auditar
+        from .models import ListaEsperaCirurgica
+        auditar(ListaEsperaCirurgica, "fila")
@@ -0,0 +1,78 @@
+# fila_cirurgica/arquivamento.py
+"""
+Arquivamento do histórico antigo (``HistoricoArquivado``).
+
+As tabelas ``Historical*`` guardam uma cópia da linha inteira a cada save
+e crescem para sempre. Aqui, os registros com mais de
+``HISTORICO_ARQUIVAR_APOS_DIAS`` dias saem delas, em lotes (um por
+transação), para uma tabela de arquivo única, com os campos em JSON.
+
+O registro mais recente de cada objeto nunca é arquivado, por mais antigo
+que seja: é contra ele que o próximo save calcula o diff do log de
+alterações (``auditoria.py``). As páginas de histórico leem o log, que fica
+completo; o arquivo só é lido para auditoria.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .auditoria import valor_json
+from .models import HistoricoArquivado
+
+CAMPOS_HISTORICO = {"history_id", "history_date", "history_type", "history_user_id", "history_change_reason"}
+
+
+def limite_padrao():
+    """Data de corte a partir de ``HISTORICO_ARQUIVAR_APOS_DIAS``."""
+    return timezone.now() - timedelta(days=settings.HISTORICO_ARQUIVAR_APOS_DIAS)
+
+
+def arquivaveis(model, antes_de):
+    """Registros de histórico de ``model`` anteriores a ``antes_de``, menos o último de cada objeto."""
+    historico = model.history.model
+    pk = model._meta.pk.attname
+    mais_recente = historico.objects.filter(**{pk: OuterRef(pk)}, history_date__gt=OuterRef("history_date"))
+    return historico.objects.filter(history_date__lt=antes_de).filter(Exists(mais_recente))
+
+
+def arquivar(model, antes_de=None, batch_size=1000):
+    """
+    Move os registros ``arquivaveis`` para ``HistoricoArquivado``, em lotes
+    por ``history_id``. Retorna quantos foram movidos.
+    """
+    historico = model.history.model
+    pk = model._meta.pk.attname
+    content_type = ContentType.objects.get_for_model(model)
+    pendentes = arquivaveis(model, antes_de or limite_padrao()).order_by("history_id")
+
+    movidos = 0
+    ultimo = 0
+    while True:
+        ids = list(pendentes.filter(history_id__gt=ultimo).values_list("history_id", flat=True)[:batch_size])
+        if not ids:
+            return movidos
+        with transaction.atomic():
+            linhas = historico.objects.filter(history_id__in=ids).values()
+            HistoricoArquivado.objects.bulk_create(
+                [
+                    HistoricoArquivado(
+                        content_type=content_type,
+                        objeto_id=linha[pk],
+                        history_id=linha["history_id"],
+                        history_date=linha["history_date"],
+                        history_type=linha["history_type"],
+                        history_user_id=linha["history_user_id"],
+                        history_change_reason=linha["history_change_reason"],
+                        dados={k: valor_json(v) for k, v in linha.items() if k not in CAMPOS_HISTORICO},
+                    )
+                    for linha in linhas
+                ],
+                ignore_conflicts=True,
+            )
+            historico.objects.filter(history_id__in=ids).delete()
+        movidos += len(ids)
+        ultimo = ids[-1]
@@ -0,0 +1,217 @@
+# fila_cirurgica/auditoria.py
+"""
+Log de alterações com diff calculado na escrita (``RegistroAlteracao``).
+
+A cada registro de histórico do django-simple-history de um modelo
+auditado (``auditar``, chamado no ``ready`` dos apps: fila e AIH), o diff
+contra o registro anterior é calculado uma vez e gravado já com os rótulos
+de exibição. As páginas de histórico e relatórios só leem a tabela, pelo
+índice, sem comparar snapshots por requisição.
+
+O motivo vem de ``obj._change_reason`` (definido antes do ``save``); um
+``update_change_reason`` depois do save não chega aqui. Um save que não
+mudou nenhum campo não gera registro.
+
+``bulk_history_create`` não dispara o sinal: quem grava histórico em lote
+chama ``registrar_lote`` (ex.: ``remocao.py``); depois de cargas,
+``reconstruir`` (comando ``reconstruir_alteracoes``) gera o que faltar.
+"""
+import datetime
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.timezone import localtime
+from simple_history.signals import post_create_historical_record
+
+from .models import RegistroAlteracao
+
+CAMPOS_IGNORADOS = {"id", "history_id", "history_date", "history_type",
+                    "history_user", "history_change_reason"}
+
+_AUDITADOS = {}
+
+# Modelos auditados pelo nome curto ("fila", "aih"), preenchido por
+# ``auditar``. Os comandos de histórico e o filtro da auditoria do portal
+# usam este mapa.
+MODELOS_AUDITADOS = {}
+
+
+def exibir(field, value):
+    """Formata valor para exibição (choices, FK, bool, datas)."""
+    if value is None:
+        return ""
+    # choices -> rótulo
+    if getattr(field, "choices", None):
+        return str(dict(field.choices).get(value, value))
+    # FK -> string amigável
+    if getattr(field, "many_to_one", False) and hasattr(field, "remote_field"):
+        return str(value) if value else ""
+    # boolean
+    if isinstance(field, models.BooleanField):
+        return "Sim" if bool(value) else "Não"
+    # datas
+    if isinstance(field, models.DateTimeField):
+        return localtime(value).strftime("%d/%m/%Y %H:%M") if value else ""
+    if isinstance(field, models.DateField):
+        return value.strftime("%d/%m/%Y") if value else ""
+    return str(value)
+
+
+def valor_json(value):
+    """Valor como vai para o JSON (datas em ISO, o resto que não for primitivo como texto)."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _valor(field, registro):
+    value = getattr(registro, field.attname, None)
+    if isinstance(field, models.FileField):
+        # No histórico o arquivo é texto (o nome); no registro recém-criado
+        # ainda é FieldFile. Vazio ("" ou nome None) vale None
+        return getattr(value, "name", value) or None
+    return value
+
+
+def diff_campos(model, anterior, atual):
+    """
+    [(field, antes, depois)] dos campos que mudaram entre dois registros de
+    histórico, comparando os valores crus (FK = id, via ``attname``).
+    """
+    if anterior is None or atual is None:
+        return []
+    diffs = []
+    for field in model._meta.fields:
+        if field.name in CAMPOS_IGNORADOS:
+            continue
+        antes = _valor(field, anterior)
+        depois = _valor(field, atual)
+        if antes != depois:
+            diffs.append((field, antes, depois))
+    return diffs
+
+
+def _objetos_fk(diffs_por_registro):
+    """{(modelo, pk): objeto} das FKs que aparecem nos diffs: um ``in_bulk`` por modelo."""
+    ids = {}
+    for diffs in diffs_por_registro:
+        for field, antes, depois in diffs:
+            if field.many_to_one:
+                ids.setdefault(field.related_model, set()).update(v for v in (antes, depois) if v is not None)
+    objetos = {}
+    for model, pks in ids.items():
+        for pk, obj in model._default_manager.in_bulk(pks).items():
+            objetos[(model, pk)] = obj
+    return objetos
+
+
+def _montar(content_type, historico, diffs, objetos):
+    def rotulo(field, value):
+        if field.many_to_one and value is not None:
+            # FK que não existe mais: mostra o id
+            value = objetos.get((field.related_model, value), value)
+        return exibir(field, value)
+
+    return RegistroAlteracao(
+        content_type=content_type,
+        objeto_id=historico.id,
+        historico_id=historico.history_id,
+        data=historico.history_date,
+        tipo=historico.history_type,
+        usuario_id=historico.history_user_id,
+        motivo=historico.history_change_reason or "",
+        diffs=[
+            {
+                "campo": field.name,
+                "rotulo": str(field.verbose_name or field.name),
+                "antes": valor_json(antes),
+                "depois": valor_json(depois),
+                "antes_exib": rotulo(field, antes),
+                "depois_exib": rotulo(field, depois),
+            }
+            for field, antes, depois in diffs
+        ],
+    )
+
+
+def _relevante(historico, diffs):
+    # Criação e remoção sempre; alteração só se algum campo mudou
+    return historico.history_type != "~" or bool(diffs)
+
+
+def _registrar(sender, history_instance, **kwargs):
+    model = _AUDITADOS.get(sender)
+    if model is None:
+        return
+    anterior = history_instance.prev_record if history_instance.history_type != "+" else None
+    diffs = diff_campos(model, anterior, history_instance)
+    if not _relevante(history_instance, diffs):
+        return
+    content_type = ContentType.objects.get_for_model(model)
+    _montar(content_type, history_instance, diffs, _objetos_fk([diffs])).save()
+
+
+def registrar_lote(model, pares):
+    """
+    Grava o log de registros de histórico criados em lote
+    (``bulk_history_create``), que não passam pelo sinal. ``pares`` é
+    [(anterior, historico)], com ``anterior`` = o estado antes da alteração
+    (registro de histórico ou a própria instância; None na criação).
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    lote = [(h, diff_campos(model, anterior, h)) for anterior, h in pares]
+    lote = [(h, diffs) for h, diffs in lote if _relevante(h, diffs)]
+    objetos = _objetos_fk([diffs for _, diffs in lote])
+    RegistroAlteracao.objects.bulk_create([_montar(content_type, h, diffs, objetos) for h, diffs in lote])
+
+
+def auditar(model, nome):
+    """
+    Passa a registrar as alterações de ``model`` (que precisa ter
+    ``history``), conhecido nos comandos e filtros como ``nome``.
+    """
+    historico = model.history.model
+    _AUDITADOS[historico] = model
+    MODELOS_AUDITADOS[nome] = model
+    post_create_historical_record.connect(
+        _registrar, sender=historico, dispatch_uid=f"auditoria_{model._meta.label_lower}")
+
+
+def reconstruir(model, batch_size=2000):
+    """
+    Gera os ``RegistroAlteracao`` que faltam a partir do histórico de
+    ``model`` (ex.: depois de ``bulk_history_create``). Percorre o histórico
+    em ordem (id, data) comparando cada registro com o anterior do mesmo
+    objeto; os já existentes são ignorados (comando
+    ``reconstruir_alteracoes``). Retorna quantos foram lidos.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    historico = model.history.model.objects.order_by("id", "history_date", "history_id")
+
+    lidos = 0
+    lote = []
+    anterior = None
+
+    def gravar():
+        diffs_por_registro = [diffs for _, diffs in lote]
+        objetos = _objetos_fk(diffs_por_registro)
+        RegistroAlteracao.objects.bulk_create(
+            [_montar(content_type, h, diffs, objetos) for h, diffs in lote],
+            batch_size=batch_size, ignore_conflicts=True,
+        )
+        lote.clear()
+
+    for h in historico.iterator(chunk_size=batch_size):
+        mesmo_objeto = anterior is not None and anterior.id == h.id and h.history_type != "+"
+        diffs = diff_campos(model, anterior if mesmo_objeto else None, h)
+        if _relevante(h, diffs):
+            lote.append((h, diffs))
+        anterior = h
+        lidos += 1
+        if len(lote) >= batch_size:
+            gravar()
+    if lote:
+        gravar()
+    return lidos
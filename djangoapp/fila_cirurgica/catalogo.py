@@ -0,0 +1,96 @@
+# fila_cirurgica/catalogo.py
+"""
+Índice local de pertinência especialidade → procedimento.
+
+Guarda em memória (por processo) o conjunto de pares
+``(cod_especialidade, cod_procedimento)`` vindo de
+``/api/v1/procedimentos/pares-especialidade``. A validação dos formulários
+vira um ``in`` num ``frozenset``, sem chamada de rede.
+
+A primeira consulta carrega o índice (bloqueando). Depois disso, quando o
+índice passa de ``CATALOGO_REFRESH_INTERVAL`` segundos, ele continua sendo
+usado enquanto uma thread em segundo plano busca a versão nova.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+from . import prontidao
+from .api_client import get_json
+
+logger = logging.getLogger(__name__)
+
+
+class IndiceIndisponivel(Exception):
+    """O índice nunca foi carregado e a API não respondeu."""
+
+
+_lock = threading.Lock()
+_pares = None
+_carregado_em = 0.0
+_atualizando = False
+
+
+def _carregar():
+    data = get_json("procedimentos/pares-especialidade")
+    return frozenset((str(esp), str(proc)) for esp, proc in data)
+
+
+def _substituir(pares):
+    global _pares, _carregado_em
+    _pares = pares
+    _carregado_em = time.monotonic()
+
+
+def _atualizar_em_segundo_plano():
+    global _atualizando
+    try:
+        _substituir(_carregar())
+    except Exception as e:
+        logger.warning("Falha ao atualizar o índice especialidade/procedimento: %s", e)
+    finally:
+        _atualizando = False
+
+
+def _indice():
+    global _atualizando
+    if _pares is None:
+        with _lock:
+            if _pares is None:
+                try:
+                    _substituir(_carregar())
+                except (requests.RequestException, ValueError, TypeError) as e:
+                    # Resposta que não é JSON (ValueError) ou não é lista de pares
+                    # também deixa o índice indisponível, não um 500
+                    raise IndiceIndisponivel(str(e)) from e
+        return _pares
+
+    # Recarga adiável: espera a API sair de "degraded" (ver prontidao.py)
+    if (time.monotonic() - _carregado_em > settings.CATALOGO_REFRESH_INTERVAL
+            and prontidao.permite(essencial=False)):
+        with _lock:
+            if not _atualizando:
+                _atualizando = True
+                threading.Thread(
+                    target=_atualizar_em_segundo_plano,
+                    name="catalogo-refresh",
+                    daemon=True,
+                ).start()
+    return _pares
+
+
+def procedimento_pertence(cod_especialidade, cod_procedimento) -> bool:
+    """
+    ``True`` se o procedimento pertence à especialidade (comparação exata).
+    Lança ``IndiceIndisponivel`` se o índice nunca pôde ser carregado.
+    """
+    return (str(cod_especialidade), str(cod_procedimento)) in _indice()
+
+
+def recarregar():
+    """Força a recarga síncrona do índice (ex.: após mudanças no AGHU)."""
+    with _lock:
+        _substituir(_carregar())
@@ -119,7 +119,7 @@ class ListaEsperaCirurgicaForm(forms.ModelForm):
 
         # Prossegue com a validação apenas se ambos os campos tiverem sido preenchidos
         if procedimento_id and especialidade_id:
-            # Chama nossa função helper para verificar a combinação na API
+            # Verifica a combinação no índice local (fila_cirurgica/catalogo.py)
             if not validar_procedimento_na_especialidade(procedimento_id, especialidade_id):
                 # Se for inválido, adiciona um erro ao campo 'procedimento_api_choice'
                 self.add_error(
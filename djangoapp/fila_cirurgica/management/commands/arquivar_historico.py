@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from fila_cirurgica.arquivamento import arquivaveis, arquivar
+from fila_cirurgica.auditoria import MODELOS_AUDITADOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Move o histórico antigo da fila e das AIHs para a tabela de arquivo (HistoricoArquivado), "
+        "em lotes. O registro mais recente de cada objeto é sempre mantido."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("modelos", nargs="*",
+                            help=f"Históricos a arquivar: {', '.join(MODELOS_AUDITADOS)} (padrão: todos).")
+        parser.add_argument("--dias", type=int, default=settings.HISTORICO_ARQUIVAR_APOS_DIAS,
+                            help="Arquiva o que tiver mais de N dias (padrão: HISTORICO_ARQUIVAR_APOS_DIAS).")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Só conta o que seria arquivado.")
+
+    def handle(self, *args, **options):
+        modelos = options["modelos"] or list(MODELOS_AUDITADOS)
+        desconhecidos = [m for m in modelos if m not in MODELOS_AUDITADOS]
+        if desconhecidos:
+            raise CommandError(f"Modelo desconhecido: {', '.join(desconhecidos)}")
+
+        antes_de = timezone.now() - timedelta(days=options["dias"])
+        for nome in modelos:
+            if options["dry_run"]:
+                total = arquivaveis(MODELOS_AUDITADOS[nome], antes_de).count()
+                self.stdout.write(f"{nome}: {total} registros seriam arquivados (anteriores a {antes_de:%d/%m/%Y}).")
+                continue
+            movidos = arquivar(MODELOS_AUDITADOS[nome], antes_de, batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{nome}: {movidos} registros arquivados."))
@@ -0,0 +1,294 @@
+import importlib.util
+import json
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from aih.models import AihSolicitacao
+from fila_cirurgica.auditoria import reconstruir
+from fila_cirurgica.models import (
+    EspecialidadeAghu,
+    ListaEsperaCirurgica,
+    PacienteAghu,
+    ProcedimentoAghu,
+    ProfissionalAghu,
+    RegistroAlteracao,
+)
+
+MOTIVO_CARGA = "Carga sintética"
+
+FILA_API = settings.BASE_DIR.parent / "fila-api-hulw"
+CATALOGO_PADRAO = FILA_API / "app" / "db" / "mock_data"
+
+SITUACOES = [s for s, _ in ListaEsperaCirurgica.SITUACAO_CHOICES]
+MOTIVOS_SAIDA = [m for m, _ in ListaEsperaCirurgica.MOTIVO_SAIDA_CHOICES]
+CIDS = ["K80.2", "K40.9", "K42.9", "E04.1", "C50.9", "D25.9", "N40", "N20.0",
+        "K35.8", "I83.9", "H25.9", "J35.0", "M23.2", "M16.9", "C18.9", "K64.9"]
+OBSERVACOES = [
+    None, None, None,
+    "Aguardando exames pré-operatórios.",
+    "Paciente não atendeu, nova tentativa agendada.",
+    "Risco cirúrgico liberado.",
+    "Família solicitou remarcação.",
+]
+
+
+def _synthetic():
+    """
+    ``app/db/synthetic.py`` da fila-api (só stdlib), de onde vem o formato
+    do catálogo: a leitura aqui é a mesma de lá.
+    """
+    caminho = FILA_API / "app" / "db" / "synthetic.py"
+    if not caminho.exists():
+        raise CommandError(f"fila-api-hulw não encontrada: {caminho}")
+    spec = importlib.util.spec_from_file_location("fila_api_synthetic", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _ler(synthetic, diretorio, nome, limite=None):
+    """Lê ``<nome>.jsonl`` (em streaming) ou ``<nome>.json`` do catálogo."""
+    caminho = synthetic.caminho_dataset(diretorio, nome)
+    if caminho.endswith(".jsonl"):
+        yield from synthetic.ler_jsonl(caminho, limite)
+        return
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            dados = json.load(f)
+    except FileNotFoundError:
+        raise CommandError(f"Catálogo não encontrado: {caminho} (nem .jsonl)")
+    yield from (dados if limite is None else dados[:limite])
+
+
+def _lotes(itens, tamanho):
+    for i in range(0, len(itens), tamanho):
+        yield itens[i:i + tamanho]
+
+
+@contextmanager
+def _datas_manuais(model, *campos):
+    """Desliga auto_now/auto_now_add para gravar datas espalhadas no tempo."""
+    fields = [model._meta.get_field(c) for c in campos]
+    antes = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, antes):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera entradas sintéticas da fila (com histórico) e AIHs em lote, usando o "
+        "catálogo gerado para a API mock (fila-api-hulw/generate_mock_data.py). "
+        "A mesma --seed gera os mesmos dados (as datas são relativas ao dia da carga)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entradas", type=int, default=10000, help="Quantidade de entradas na fila.")
+        parser.add_argument("--aihs", type=int, default=5000, help="Quantidade de AIHs.")
+        parser.add_argument("--historico", type=int, default=3,
+                            help="Máximo de alterações (registros '~') por entrada, além da criação.")
+        parser.add_argument("--pacientes", type=int, default=0,
+                            help="Quantos pacientes do catálogo usar (padrão: um por entrada).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--catalogo", default=str(CATALOGO_PADRAO),
+                            help="Diretório com especialidades/procedimentos/profissionais/pacientes (.jsonl ou .json).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--replace", action="store_true",
+                            help="Apaga entradas, AIHs e seus históricos antes da carga.")
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.agora = timezone.now()
+        n_pacientes = options["pacientes"] or max(options["entradas"], options["aihs"], 1)
+
+        # Catálogo lido antes de apagar qualquer coisa
+        synthetic = _synthetic()
+        diretorio = options["catalogo"]
+        catalogo = {
+            "especialidades": list(_ler(synthetic, diretorio, "especialidades")),
+            "procedimentos": list(_ler(synthetic, diretorio, "procedimentos")),
+            "profissionais": list(_ler(synthetic, diretorio, "profissionais")),
+            "pacientes": list(_ler(synthetic, diretorio, "pacientes", n_pacientes)),
+        }
+        if not (catalogo["especialidades"] and catalogo["procedimentos"] and catalogo["pacientes"]):
+            raise CommandError("Catálogo vazio: gere os dados com generate_mock_data.py.")
+
+        # --replace e a carga numa transação só: se algo falhar no meio, o
+        # banco fica como estava (e não com a fila apagada pela metade)
+        with transaction.atomic():
+            if options["replace"]:
+                for model in (ListaEsperaCirurgica, AihSolicitacao):
+                    # Nesta ordem: apagar os objetos gera registros "-" no
+                    # histórico (e no log), que saem logo em seguida
+                    model.objects.all().delete()
+                    model.history.all().delete()
+                    RegistroAlteracao.objects.filter(content_type__model=model._meta.model_name,
+                                                     content_type__app_label=model._meta.app_label).delete()
+                self.stdout.write(self.style.WARNING("Fila, AIHs, históricos e log de alterações apagados (--replace)."))
+            self._carregar(options, **catalogo)
+
+    def _carregar(self, options, especialidades, procedimentos, profissionais, pacientes):
+        seed = options["seed"]
+        esp_ids = self._sincronizar(EspecialidadeAghu, "cod_especialidade", "nome_especialidade",
+                                    {str(e["COD_ESPECIALIDADE"]): e["NOME_ESPECIALIDADE"] for e in especialidades})
+        proc_ids = self._sincronizar(ProcedimentoAghu, "codigo", "nome",
+                                     {str(p["COD_PROCEDIMENTO"]): p["PROCEDIMENTO"].strip() for p in procedimentos})
+        prof_ids = self._sincronizar(ProfissionalAghu, "matricula", "nome",
+                                     {str(p["MATRICULA"]): p["NOME_PROFISSIONAL"] or "" for p in profissionais})
+        pac_ids = self._sincronizar(PacienteAghu, "prontuario", "nome",
+                                    {str(p["PRONTUARIO_PAC"]): p["NOME_PACIENTE"] for p in pacientes})
+
+        # Procedimentos de cada especialidade (só os pares que existem no catálogo)
+        por_especialidade = {}
+        for p in procedimentos:
+            esp = str(p.get("COD_ESPECIALIDADE_FK"))
+            if esp in esp_ids:
+                por_especialidade.setdefault(esp_ids[esp], []).append(proc_ids[str(p["COD_PROCEDIMENTO"])])
+        self.pares = sorted(por_especialidade.items())
+        self.medicos = sorted(prof_ids.values())
+        self.pacientes = [(pac_ids[str(p["PRONTUARIO_PAC"])], str(p["PRONTUARIO_PAC"]), p["NOME_PACIENTE"])
+                          for p in pacientes]
+        self.nomes_proc = {proc_ids[str(p["COD_PROCEDIMENTO"])]: (str(p["COD_PROCEDIMENTO"]), p["PROCEDIMENTO"].strip())
+                           for p in procedimentos}
+
+        self._gerar_entradas(random.Random(f"{seed}:fila"), options["entradas"], options["historico"])
+        self._gerar_aihs(random.Random(f"{seed}:aih"), options["aihs"])
+
+        # bulk_history_create não passa pelo sinal do log de alterações
+        for model in (ListaEsperaCirurgica, AihSolicitacao):
+            lidos = reconstruir(model, batch_size=self.batch_size)
+            self.stdout.write(f"Log de alterações: {lidos} registros de {model._meta.verbose_name_plural}.")
+
+    def _sincronizar(self, model, campo_codigo, campo_nome, nomes):
+        """Cria as entidades que faltam (bulk) e devolve ``codigo -> id``."""
+        model.objects.bulk_create(
+            [model(**{campo_codigo: cod, campo_nome: nome, "atualizado_em": self.agora})
+             for cod, nome in nomes.items()],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        ids = {}
+        for lote in _lotes(list(nomes), self.batch_size):
+            ids.update(model.objects.filter(**{f"{campo_codigo}__in": lote}).values_list(campo_codigo, "id"))
+        self.stdout.write(f"{model._meta.verbose_name_plural}: {len(ids)} no catálogo local.")
+        return ids
+
+    def _data_passada(self, rng, max_dias=3 * 365):
+        return self.agora - timedelta(days=rng.uniform(0, max_dias))
+
+    def _nova_entrada(self, rng):
+        esp_id, procs = rng.choice(self.pares)
+        pac_id, _, _ = rng.choice(self.pacientes)
+        judicial = rng.random() < 0.03
+        entrada = ListaEsperaCirurgica(
+            paciente_id=pac_id,
+            especialidade_id=esp_id,
+            procedimento_id=rng.choice(procs),
+            medico_id=rng.choice(self.medicos) if self.medicos and rng.random() < 0.8 else None,
+            data_entrada=self._data_passada(rng),
+            prioridade=rng.choices(["SEM", "BRE", "ONC"], weights=[70, 20, 10])[0],
+            medida_judicial=judicial,
+            judicial_numero=f"{rng.randint(0, 9999999):07d}-{rng.randint(10, 99)}.{rng.randint(2019, 2025)}.8.15.0001" if judicial else None,
+            situacao=rng.choice(SITUACOES),
+            observacoes=rng.choice(OBSERVACOES),
+        )
+        if len(procs) > 1 and rng.random() < 0.1:
+            entrada.especialidade_secundario_id = esp_id
+            entrada.procedimento_secundario_id = rng.choice([p for p in procs if p != entrada.procedimento_id])
+        entrada._history_date = entrada.data_entrada
+        return entrada
+
+    def _alterar(self, rng, entrada, ultima):
+        """Aplica uma alteração plausível e avança a data do histórico."""
+        entrada._history_date = min(entrada._history_date + timedelta(days=rng.uniform(1, 120)), self.agora)
+        entrada.situacao = rng.choice(SITUACOES)
+        entrada.observacoes = rng.choice(OBSERVACOES)
+        if rng.random() < 0.3:
+            entrada.data_novo_contato = (entrada._history_date + timedelta(days=rng.randint(7, 60))).date()
+        if ultima and rng.random() < 0.3:
+            entrada.ativo = False
+            entrada.motivo_saida = rng.choice(MOTIVOS_SAIDA)
+
+    def _gerar_entradas(self, rng, total, max_historico):
+        criadas = historicos = 0
+        campos_alterados = ["situacao", "observacoes", "data_novo_contato", "ativo", "motivo_saida"]
+        with _datas_manuais(ListaEsperaCirurgica, "data_entrada"):
+            for inicio in range(0, total, self.batch_size):
+                lote = [self._nova_entrada(rng) for _ in range(min(self.batch_size, total - inicio))]
+                with transaction.atomic():
+                    ListaEsperaCirurgica.objects.bulk_create(lote, batch_size=self.batch_size)
+                    ListaEsperaCirurgica.history.bulk_history_create(
+                        lote, batch_size=self.batch_size, default_change_reason=MOTIVO_CARGA)
+                    historicos += len(lote)
+
+                    versoes = {e.pk: rng.randint(0, max_historico) for e in lote}
+                    alteradas = [e for e in lote if versoes[e.pk]]
+                    for v in range(1, max_historico + 1):
+                        da_vez = [e for e in alteradas if versoes[e.pk] >= v]
+                        if not da_vez:
+                            break
+                        for e in da_vez:
+                            self._alterar(rng, e, ultima=(versoes[e.pk] == v))
+                        ListaEsperaCirurgica.history.bulk_history_create(
+                            da_vez, batch_size=self.batch_size, update=True,
+                            default_change_reason=MOTIVO_CARGA)
+                        historicos += len(da_vez)
+                    # Estado atual = última versão do histórico
+                    ListaEsperaCirurgica.objects.bulk_update(alteradas, campos_alterados, batch_size=self.batch_size)
+                criadas += len(lote)
+                self.stdout.write(f"Fila: {criadas}/{total} entradas, {historicos} registros de histórico.")
+        self.stdout.write(self.style.SUCCESS(f"{criadas} entradas criadas na fila ({historicos} registros de histórico)."))
+
+    def _nova_aih(self, rng):
+        esp_id, procs = rng.choice(self.pares)
+        pac_id, prontuario, nome = rng.choice(self.pacientes)
+        proc_id = rng.choice(procs)
+        cod_proc, descricao = self.nomes_proc[proc_id]
+        criada = self._data_passada(rng)
+        aih = AihSolicitacao(
+            paciente_id=pac_id,
+            especialidade_id=esp_id,
+            procedimento_id=proc_id,
+            medico_id=rng.choice(self.medicos) if self.medicos else None,
+            nome_paciente=nome[:100],
+            numero_prontuario=prontuario,
+            sexo=rng.choice(["M", "F"]),
+            data_nascimento=(criada - timedelta(days=rng.randint(365, 90 * 365))).date(),
+            nome_estabelecimento_solicitante="HOSPITAL UNIVERSITÁRIO LAURO WANDERLEY",
+            nome_estabelecimento_executante="HOSPITAL UNIVERSITÁRIO LAURO WANDERLEY",
+            codigo_procedimento=cod_proc[:10],
+            descricao_procedimento_solicitado=descricao[:255],
+            cid10_principal=rng.choice(CIDS),
+            carater_internacao="ELETIVA",
+            data_solicitacao=criada.date(),
+            numero_aih="".join(str(rng.randint(0, 9)) for _ in range(13)),
+            prioridade=rng.choices(["SEM", "BRE", "ONC"], weights=[70, 20, 10])[0],
+            cadastrado_na_fila=rng.random() < 0.4,
+            data_criacao=criada,
+            data_atualizacao=criada,
+        )
+        aih._history_date = criada
+        return aih
+
+    def _gerar_aihs(self, rng, total):
+        criadas = 0
+        with _datas_manuais(AihSolicitacao, "data_criacao", "data_atualizacao"):
+            for inicio in range(0, total, self.batch_size):
+                lote = [self._nova_aih(rng) for _ in range(min(self.batch_size, total - inicio))]
+                with transaction.atomic():
+                    AihSolicitacao.objects.bulk_create(lote, batch_size=self.batch_size)
+                    AihSolicitacao.history.bulk_history_create(
+                        lote, batch_size=self.batch_size, default_change_reason=MOTIVO_CARGA)
+                criadas += len(lote)
+                self.stdout.write(f"AIHs: {criadas}/{total}.")
+        self.stdout.write(self.style.SUCCESS(f"{criadas} AIHs criadas."))
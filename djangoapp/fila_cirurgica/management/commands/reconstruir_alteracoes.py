@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from fila_cirurgica.auditoria import MODELOS_AUDITADOS, reconstruir
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o log de alterações (RegistroAlteracao) a partir do histórico já existente: "
+        "registros anteriores ao log ou criados por bulk_history_create. Os que já existem "
+        "são mantidos, então pode rodar de novo sem duplicar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("modelos", nargs="*",
+                            help=f"Históricos a processar: {', '.join(MODELOS_AUDITADOS)} (padrão: todos).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        modelos = options["modelos"] or list(MODELOS_AUDITADOS)
+        desconhecidos = [m for m in modelos if m not in MODELOS_AUDITADOS]
+        if desconhecidos:
+            raise CommandError(f"Modelo desconhecido: {', '.join(desconhecidos)}")
+
+        for nome in modelos:
+            lidos = reconstruir(MODELOS_AUDITADOS[nome], batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{nome}: {lidos} registros de histórico processados."))
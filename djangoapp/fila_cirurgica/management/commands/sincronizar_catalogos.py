@@ -0,0 +1,80 @@
+from itertools import islice
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from fila_cirurgica.api_client import iter_ndjson
+from fila_cirurgica.api_helpers import ENTIDADES
+
+# Recurso da API -> tipo em ENTIDADES
+CATALOGOS = {
+    "especialidades": "especialidade",
+    "procedimentos": "procedimento",
+    "profissionais": "profissional",
+}
+
+
+def _lotes(itens, tamanho):
+    itens = iter(itens)
+    while True:
+        lote = list(islice(itens, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+class Command(BaseCommand):
+    help = (
+        "Sincroniza os catálogos locais (especialidades, procedimentos, profissionais) "
+        "com a exportação NDJSON da API (/api/v1/<recurso>/export), em um único stream "
+        "por catálogo e gravando em lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("recursos", nargs="*",
+                            help=f"Catálogos a sincronizar: {', '.join(CATALOGOS)} (padrão: todos).")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        params = {"fields": "autocomplete"}
+
+        recursos = options["recursos"] or list(CATALOGOS)
+        desconhecidos = [r for r in recursos if r not in CATALOGOS]
+        if desconhecidos:
+            raise CommandError(f"Catálogo desconhecido: {', '.join(desconhecidos)}")
+
+        for recurso in recursos:
+            try:
+                criados, renomeados, total = self._sincronizar(
+                    CATALOGOS[recurso], iter_ndjson(f"{recurso}/export", params=params), options["batch_size"])
+            except requests.RequestException as e:
+                raise CommandError(f"Falha ao exportar {recurso} da API: {e}")
+            self.stdout.write(self.style.SUCCESS(
+                f"{recurso}: {total} recebidos, {criados} novos, {renomeados} com nome alterado"))
+
+    def _sincronizar(self, tipo, itens, batch_size):
+        ent = ENTIDADES[tipo]
+        criados = renomeados = total = 0
+        for lote in _lotes(itens, batch_size):
+            total += len(lote)
+            agora = timezone.now()
+            nomes = {str(item[ent.chave_codigo]): (item[ent.chave_nome] or "").strip() for item in lote}
+            with transaction.atomic():
+                # Os existentes também ganham atualizado_em novo: ficam
+                # dentro do API_ENTITY_TTL e os saves não reconsultam a API
+                existentes = list(ent.model.objects.filter(**{f"{ent.campo_codigo}__in": list(nomes)}))
+                for obj in existentes:
+                    nome = nomes.pop(getattr(obj, ent.campo_codigo))
+                    if getattr(obj, ent.campo_nome) != nome:
+                        setattr(obj, ent.campo_nome, nome)
+                        renomeados += 1
+                    obj.atualizado_em = agora
+                ent.model.objects.bulk_update(existentes, [ent.campo_nome, "atualizado_em"])
+                ent.model.objects.bulk_create([
+                    ent.model(**{ent.campo_codigo: codigo, ent.campo_nome: nome, "atualizado_em": agora})
+                    for codigo, nome in nomes.items()
+                ])
+            criados += len(nomes)
+        return criados, renomeados, total
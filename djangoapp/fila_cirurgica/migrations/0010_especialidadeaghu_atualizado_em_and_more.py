@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fila_cirurgica', '0009_historicallistaesperacirurgica_prioridade_justificativa_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='especialidadeaghu',
+            name='atualizado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Sincronizado com o AGHU em'),
+        ),
+        migrations.AddField(
+            model_name='pacienteaghu',
+            name='atualizado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Sincronizado com o AGHU em'),
+        ),
+        migrations.AddField(
+            model_name='procedimentoaghu',
+            name='atualizado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Sincronizado com o AGHU em'),
+        ),
+        migrations.AddField(
+            model_name='profissionalaghu',
+            name='atualizado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Sincronizado com o AGHU em'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('fila_cirurgica', '0010_especialidadeaghu_atualizado_em_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAlteracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('historico_id', models.PositiveBigIntegerField(help_text='history_id do registro correspondente no django-simple-history')),
+                ('data', models.DateTimeField()),
+                ('tipo', models.CharField(choices=[('+', 'Criado'), ('~', 'Alterado'), ('-', 'Deletado')], max_length=1)),
+                ('motivo', models.CharField(blank=True, default='', max_length=100)),
+                ('diffs', models.JSONField(blank=True, default=list)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='usuário')),
+            ],
+            options={
+                'verbose_name': 'Registro de alteração',
+                'verbose_name_plural': 'Registros de alteração',
+                'indexes': [models.Index(fields=['content_type', 'objeto_id', '-data'], name='registro_alteracao_objeto'), models.Index(fields=['-data'], name='registro_alteracao_data')],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'historico_id'), name='registro_alteracao_historico_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('fila_cirurgica', '0011_registroalteracao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricoArquivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('history_id', models.PositiveBigIntegerField()),
+                ('history_date', models.DateTimeField()),
+                ('history_type', models.CharField(choices=[('+', 'Criado'), ('~', 'Alterado'), ('-', 'Deletado')], max_length=1)),
+                ('history_user_id', models.IntegerField(blank=True, null=True)),
+                ('history_change_reason', models.CharField(blank=True, max_length=100, null=True)),
+                ('dados', models.JSONField(default=dict)),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Histórico arquivado',
+                'verbose_name_plural': 'Históricos arquivados',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='historicallistaesperacirurgica',
+            index=models.Index(fields=['id', 'history_date'], name='fila_cirurg_id_d2b2a5_idx'),
+        ),
+        migrations.AddField(
+            model_name='historicoarquivado',
+            name='content_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AddIndex(
+            model_name='historicoarquivado',
+            index=models.Index(fields=['content_type', 'objeto_id', 'history_date'], name='historico_arquivado_objeto'),
+        ),
+        migrations.AddConstraint(
+            model_name='historicoarquivado',
+            constraint=models.UniqueConstraint(fields=('content_type', 'history_id'), name='historico_arquivado_unico'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('fila_cirurgica', '0012_historicoarquivado_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='registroalteracao',
+            name='registro_alteracao_data',
+        ),
+        migrations.AddIndex(
+            model_name='registroalteracao',
+            index=models.Index(fields=['-data', '-id'], name='registro_alteracao_data'),
+        ),
+        migrations.AddIndex(
+            model_name='registroalteracao',
+            index=models.Index(fields=['content_type', '-data'], name='registro_alteracao_modelo'),
+        ),
+        migrations.AddIndex(
+            model_name='registroalteracao',
+            index=models.Index(fields=['usuario', '-data'], name='registro_alteracao_usuario'),
+        ),
+        migrations.AddIndex(
+            model_name='registroalteracao',
+            index=models.Index(fields=['tipo', '-data'], name='registro_alteracao_tipo'),
+        ),
+    ]
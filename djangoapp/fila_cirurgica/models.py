@@ -1,10 +1,27 @@
 # models.py
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models import Case, When, IntegerField
 from django.utils.translation import gettext_lazy as _
 from simple_history.models import HistoricalRecords
 
 
+class HistoricalRecordsIndexados(HistoricalRecords):
+    """
+    ``HistoricalRecords`` com índice em (id do objeto, ``history_date``): o
+    histórico de um objeto, o ``prev_record`` de cada save (log de
+    alterações) e o "mais recente por objeto" do arquivamento usam esse par.
+    """
+
+    def get_meta_options(self, model):
+        meta_fields = super().get_meta_options(model)
+        meta_fields["indexes"] = tuple(meta_fields.get("indexes", ())) + (
+            models.Index(fields=(model._meta.pk.attname, "history_date")),
+        )
+        return meta_fields
+
+
 class PacienteAghu(models.Model):
     prontuario = models.CharField(
         max_length=20,
@@ -15,6 +32,11 @@ class PacienteAghu(models.Model):
         max_length=255,
         verbose_name="Nome do Paciente"
         )
+    atualizado_em = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Sincronizado com o AGHU em"
+        )
 
     def __str__(self):
         return f"{self.nome} ({self.prontuario})"
@@ -34,6 +56,11 @@ class ProcedimentoAghu(models.Model):
         max_length=255,
         verbose_name="Nome do Procedimento"
         )
+    atualizado_em = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Sincronizado com o AGHU em"
+        )
 
     def __str__(self):
         return f"{self.codigo} - {self.nome}"
@@ -53,6 +80,11 @@ class EspecialidadeAghu(models.Model):
         max_length=255,
         verbose_name="Nome da Especialidade"
         )
+    atualizado_em = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Sincronizado com o AGHU em"
+        )
 
     def __str__(self):
         return self.nome_especialidade
@@ -72,6 +104,11 @@ class ProfissionalAghu(models.Model):
         max_length=255,
         verbose_name="Nome do Profissional"
         )
+    atualizado_em = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Sincronizado com o AGHU em"
+        )
 
     def __str__(self):
         return f"{self.nome} - {self.matricula}"
@@ -113,7 +150,7 @@ class ListaEsperaCirurgicaManager(models.Manager):
 
 
 class ListaEsperaCirurgica(models.Model):
-    history = HistoricalRecords()
+    history = HistoricalRecordsIndexados()
     
     PRIORIDADE_CHOICES = [
         ('ONC', 'Paciente Oncológico'),
@@ -263,3 +300,125 @@ class IndicadorEspecialidade(ListaEsperaCirurgica):
         proxy = True
         verbose_name = _("Indicadores de Especialidades")
         verbose_name_plural = _("Indicadores de Especialidades")
+
+
+class RegistroAlteracaoQuerySet(models.QuerySet):
+    def do_objeto(self, obj):
+        """Alterações de ``obj`` (mais recentes primeiro), pelo índice do objeto."""
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(obj, for_concrete_model=True),
+            objeto_id=obj.pk,
+        ).order_by("-data", "-historico_id")
+
+
+class RegistroAlteracao(models.Model):
+    """
+    Log de alterações com o diff já calculado, gravado a cada registro de
+    histórico (save) da fila e das AIHs (ver ``auditoria.py``).
+
+    ``diffs``: ``[{"campo", "rotulo", "antes", "depois", "antes_exib",
+    "depois_exib"}]``, só os campos que mudaram, com os valores crus (FK =
+    id) e os rótulos prontos para exibir.
+    """
+    TIPO_CHOICES = [
+        ("+", "Criado"),
+        ("~", "Alterado"),
+        ("-", "Deletado"),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    objeto_id = models.PositiveBigIntegerField()
+    historico_id = models.PositiveBigIntegerField(
+        help_text="history_id do registro correspondente no django-simple-history"
+        )
+    data = models.DateTimeField()
+    tipo = models.CharField(
+        max_length=1,
+        choices=TIPO_CHOICES
+        )
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name="usuário"
+        )
+    motivo = models.CharField(
+        max_length=100,
+        blank=True,
+        default=""
+        )
+    diffs = models.JSONField(
+        default=list,
+        blank=True
+        )
+
+    objects = RegistroAlteracaoQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Registro de alteração"
+        verbose_name_plural = "Registros de alteração"
+        constraints = [
+            models.UniqueConstraint(fields=["content_type", "historico_id"], name="registro_alteracao_historico_unico"),
+        ]
+        indexes = [
+            # Histórico de uma entrada/AIH
+            models.Index(fields=["content_type", "objeto_id", "-data"], name="registro_alteracao_objeto"),
+            # Feed de auditoria (keyset em data, id) e seus filtros
+            models.Index(fields=["-data", "-id"], name="registro_alteracao_data"),
+            models.Index(fields=["content_type", "-data"], name="registro_alteracao_modelo"),
+            models.Index(fields=["usuario", "-data"], name="registro_alteracao_usuario"),
+            models.Index(fields=["tipo", "-data"], name="registro_alteracao_tipo"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.content_type.model} #{self.objeto_id} em {self.data:%d/%m/%Y %H:%M}"
+
+    @property
+    def linhas_diff(self):
+        """[(rótulo, antes, depois)] para os templates."""
+        return [(d["rotulo"], d["antes_exib"], d["depois_exib"]) for d in self.diffs]
+
+
+class HistoricoArquivado(models.Model):
+    """
+    Registros de histórico antigos tirados das tabelas ``Historical*``
+    (comando ``arquivar_historico``), com os campos do registro em ``dados``.
+    O log de alterações (``RegistroAlteracao``) não é arquivado.
+    """
+    TIPO_CHOICES = RegistroAlteracao.TIPO_CHOICES
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    objeto_id = models.PositiveBigIntegerField()
+    history_id = models.PositiveBigIntegerField()
+    history_date = models.DateTimeField()
+    history_type = models.CharField(
+        max_length=1,
+        choices=TIPO_CHOICES
+        )
+    history_user_id = models.IntegerField(
+        null=True, blank=True
+        )
+    history_change_reason = models.CharField(
+        max_length=100,
+        null=True, blank=True
+        )
+    dados = models.JSONField(
+        default=dict
+        )
+    arquivado_em = models.DateTimeField(
+        auto_now_add=True
+        )
+
+    class Meta:
+        verbose_name = "Histórico arquivado"
+        verbose_name_plural = "Históricos arquivados"
+        constraints = [
+            models.UniqueConstraint(fields=["content_type", "history_id"], name="historico_arquivado_unico"),
+        ]
+        indexes = [
+            models.Index(fields=["content_type", "objeto_id", "history_date"], name="historico_arquivado_objeto"),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.objeto_id} ({self.history_type}) em {self.history_date:%d/%m/%Y %H:%M}"
@@ -0,0 +1,85 @@
+# fila_cirurgica/prontidao.py
+"""
+Prontidão da API de fila (``/health/ready``) vista pelo cliente.
+
+O último estado fica em memória (por processo) e é renovado em segundo
+plano a cada ``API_READY_INTERVAL`` segundos, nunca no caminho da
+requisição:
+
+- ``unavailable`` (503, ou API fora do ar): as chamadas falham na hora,
+  sem ir à API, até passar o ``Retry-After``;
+- ``degraded`` (pool da API perto do limite): as chamadas dos usuários
+  seguem, mas o trabalho adiável (atualização em segundo plano das
+  entidades e do índice do catálogo) espera a próxima verificação;
+- sonda com resposta inesperada (ex.: API antiga, sem ``/health``):
+  tratado como ``ok``.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+OK, DEGRADED, UNAVAILABLE = "ok", "degraded", "unavailable"
+
+_lock = threading.Lock()
+_status = OK
+_verificado_em = float("-inf")
+_bloqueado_ate = 0.0
+_verificando = False
+
+
+def _verificar():
+    global _status, _bloqueado_ate, _verificado_em, _verificando
+    try:
+        response = requests.get(f"{settings.API_BASE_URL}/health/ready", timeout=settings.API_READY_TIMEOUT)
+        if response.status_code == 503:
+            espera = response.headers.get("Retry-After") or settings.API_READY_INTERVAL
+            _status, _bloqueado_ate = UNAVAILABLE, time.monotonic() + float(espera)
+        elif response.ok:
+            body = response.json()
+            atual = body.get("status") if isinstance(body, dict) else None
+            _status = atual if atual in (OK, DEGRADED, UNAVAILABLE) else OK
+        else:
+            _status = OK
+    except (requests.ConnectionError, requests.Timeout) as e:
+        logger.warning("API de fila sem resposta em /health/ready: %s", e)
+        _status, _bloqueado_ate = UNAVAILABLE, time.monotonic() + settings.API_READY_INTERVAL
+    except (requests.RequestException, ValueError) as e:
+        logger.debug("Resposta inesperada de /health/ready: %s", e)
+        _status = OK
+    finally:
+        _verificado_em = time.monotonic()
+        _verificando = False
+
+
+def status() -> str:
+    """Último estado conhecido; agenda nova verificação se ele estiver velho."""
+    global _verificando
+    if settings.API_READY_INTERVAL <= 0:
+        return OK
+    agora = time.monotonic()
+    if agora - _verificado_em > settings.API_READY_INTERVAL:
+        with _lock:
+            if not _verificando:
+                _verificando = True
+                threading.Thread(target=_verificar, name="api-ready", daemon=True).start()
+    if _status == UNAVAILABLE and agora >= _bloqueado_ate:
+        # Retry-After vencido: deixa as chamadas dos usuários passarem
+        # enquanto a nova verificação não chega
+        return DEGRADED
+    return _status
+
+
+def permite(essencial: bool = True) -> bool:
+    """
+    ``False`` se a chamada deve ser evitada agora: qualquer uma com a API
+    indisponível; só as não essenciais com a API sobrecarregada.
+    """
+    atual = status()
+    if atual == UNAVAILABLE:
+        return False
+    return essencial or atual == OK
@@ -0,0 +1,52 @@
+# fila_cirurgica/remocao.py
+"""
+Remoção (inativação) de entradas da fila em lote, usada pela ação do admin
+e pelo portal.
+
+Tudo numa transação: as entradas são travadas e lidas uma vez, um único
+``UPDATE`` marca ``ativo``/``motivo_saida`` e o histórico (com o motivo já
+preenchido) e o log de alterações são inseridos em lote, em vez de um
+``save`` por entrada.
+"""
+import copy
+
+from django.db import transaction
+from django.utils import timezone
+
+from .auditoria import registrar_lote
+from .models import ListaEsperaCirurgica
+
+
+def remover_da_fila(queryset, motivo_saida, change_reason="", usuario=None, batch_size=500):
+    """
+    Inativa as entradas de ``queryset`` com ``motivo_saida`` e registra o
+    histórico com ``change_reason`` e ``usuario``. Retorna quantas foram
+    removidas.
+    """
+    with transaction.atomic():
+        entradas = list(
+            ListaEsperaCirurgica.objects.select_for_update()
+            .filter(pk__in=queryset.values("pk"))
+            .order_by("pk")
+        )
+        if not entradas:
+            return 0
+
+        anteriores = [copy.copy(e) for e in entradas]
+        ListaEsperaCirurgica.objects.filter(pk__in=[e.pk for e in entradas]).update(
+            ativo=False, motivo_saida=motivo_saida)
+        for e in entradas:
+            e.ativo = False
+            e.motivo_saida = motivo_saida
+
+        historicos = ListaEsperaCirurgica.history.bulk_history_create(
+            entradas,
+            batch_size=batch_size,
+            update=True,
+            default_user=usuario,
+            default_change_reason=change_reason or "",
+            default_date=timezone.now(),
+        )
+        if historicos:
+            registrar_lote(ListaEsperaCirurgica, list(zip(anteriores, historicos)))
+    return len(entradas)
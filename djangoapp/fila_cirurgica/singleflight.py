@@ -0,0 +1,85 @@
+# fila_cirurgica/singleflight.py
+"""
+Coalescência de requisições idênticas em andamento ("single-flight").
+
+Quando vários chamadores pedem a mesma chave ao mesmo tempo, apenas o
+primeiro executa a chamada real; os demais esperam e recebem o mesmo
+resultado (ou a mesma exceção). Nada é guardado depois que a chamada
+termina: isto não é um cache.
+
+O resultado é compartilhado entre os chamadores e deve ser tratado como
+somente leitura.
+"""
+import asyncio
+import threading
+import weakref
+
+
+class _Chamada:
+    __slots__ = ("evento", "resultado", "erro")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class SingleFlight:
+    """Versão para código síncrono (threads de workers WSGI/ASGI)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chamadas = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            chamada = self._chamadas.get(key)
+            lider = chamada is None
+            if lider:
+                chamada = _Chamada()
+                self._chamadas[key] = chamada
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = fn()
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                self._chamadas.pop(key, None)
+            chamada.evento.set()
+        return chamada.resultado
+
+
+class AsyncSingleFlight:
+    """
+    Versão para corrotinas. A chamada real roda em uma Task própria, de modo
+    que o cancelamento de um dos chamadores (ex.: cliente fechou o Select2)
+    não derruba a requisição dos demais.
+    """
+
+    def __init__(self):
+        # event loop -> {chave: Task}
+        self._tasks = weakref.WeakKeyDictionary()
+
+    async def do(self, key, coro_fn):
+        loop = asyncio.get_running_loop()
+        em_andamento = self._tasks.setdefault(loop, {})
+
+        task = em_andamento.get(key)
+        if task is None:
+            task = loop.create_task(coro_fn())
+            em_andamento[key] = task
+
+            def _remover(t, key=key):
+                if em_andamento.get(key) is t:
+                    del em_andamento[key]
+            task.add_done_callback(_remover)
+
+        return await asyncio.shield(task)
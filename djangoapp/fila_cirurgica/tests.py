@@ -1,3 +1,473 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import requests
+from aih.models import AihSolicitacao
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import api_client, api_helpers, catalogo, prontidao
+from .arquivamento import arquivar
+from .auditoria import MODELOS_AUDITADOS, reconstruir
+from .models import (
+    EspecialidadeAghu,
+    HistoricoArquivado,
+    ListaEsperaCirurgica,
+    PacienteAghu,
+    ProcedimentoAghu,
+    RegistroAlteracao,
+)
+from .remocao import remover_da_fila
+from .singleflight import SingleFlight
+
+
+class FilaTestMixin:
+    """Catálogo mínimo para criar entradas da fila."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("auditor", password="x", is_staff=True)
+        cls.paciente = PacienteAghu.objects.create(prontuario="100", nome="Maria")
+        cls.proc_a = ProcedimentoAghu.objects.create(codigo="p1", nome="Apendicectomia")
+        cls.proc_b = ProcedimentoAghu.objects.create(codigo="p2", nome="Colecistectomia")
+        cls.especialidade = EspecialidadeAghu.objects.create(cod_especialidade="e1", nome_especialidade="Cirurgia Geral")
+
+    def nova_entrada(self, **kwargs):
+        kwargs.setdefault("paciente", self.paciente)
+        kwargs.setdefault("procedimento", self.proc_a)
+        kwargs.setdefault("especialidade", self.especialidade)
+        return ListaEsperaCirurgica.objects.create(**kwargs)
+
+
+class RegistroAlteracaoTests(FilaTestMixin, TestCase):
+    def test_criacao_gera_registro(self):
+        entrada = self.nova_entrada()
+        registros = list(RegistroAlteracao.objects.do_objeto(entrada))
+        self.assertEqual([r.tipo for r in registros], ["+"])
+        self.assertEqual(registros[0].diffs, [])
+
+    def test_diff_de_fk_guarda_id_e_rotulo(self):
+        entrada = self.nova_entrada()
+        entrada.procedimento = self.proc_b
+        entrada.save()
+
+        registro = RegistroAlteracao.objects.do_objeto(entrada).first()
+        self.assertEqual(registro.tipo, "~")
+        (diff,) = registro.diffs
+        self.assertEqual(diff["campo"], "procedimento")
+        self.assertEqual((diff["antes"], diff["depois"]), (self.proc_a.pk, self.proc_b.pk))
+        self.assertEqual((diff["antes_exib"], diff["depois_exib"]), (str(self.proc_a), str(self.proc_b)))
+
+    def test_choices_e_booleanos_com_rotulo(self):
+        entrada = self.nova_entrada()
+        entrada.ativo = False
+        entrada.motivo_saida = "MORTE"
+        entrada.save()
+
+        registro = RegistroAlteracao.objects.do_objeto(entrada).first()
+        self.assertEqual(
+            registro.linhas_diff,
+            [("Está ativo na fila?", "Sim", "Não"), ("Motivo da saída da fila", "", "Paciente faleceu")],
+        )
+
+    def test_motivo_e_usuario(self):
+        entrada = self.nova_entrada()
+        entrada.observacoes = "ligar de novo"
+        entrada._change_reason = "Contato com o paciente"
+        entrada._history_user = self.usuario
+        entrada.save()
+
+        registro = RegistroAlteracao.objects.do_objeto(entrada).first()
+        self.assertEqual(registro.motivo, "Contato com o paciente")
+        self.assertEqual(registro.usuario, self.usuario)
+
+    def test_save_sem_alteracao_nao_gera_registro(self):
+        entrada = self.nova_entrada()
+        antes = RegistroAlteracao.objects.do_objeto(entrada).count()
+        entrada.save()
+        self.assertEqual(RegistroAlteracao.objects.do_objeto(entrada).count(), antes)
+        # O histórico do simple_history continua com as duas versões
+        self.assertEqual(entrada.history.count(), 2)
+
+    def test_reconstruir_gera_o_mesmo_que_o_sinal(self):
+        entrada = self.nova_entrada()
+        entrada.procedimento = self.proc_b
+        entrada.save()
+        entrada.save()  # sem alteração
+        entrada.observacoes = "x"
+        entrada._change_reason = "obs"
+        entrada.save()
+
+        campos = ("historico_id", "tipo", "motivo", "diffs")
+        pelo_sinal = list(RegistroAlteracao.objects.order_by("historico_id").values_list(*campos))
+        RegistroAlteracao.objects.all().delete()
+
+        reconstruir(ListaEsperaCirurgica)
+        self.assertEqual(list(RegistroAlteracao.objects.order_by("historico_id").values_list(*campos)), pelo_sinal)
+        # Idempotente
+        reconstruir(ListaEsperaCirurgica)
+        self.assertEqual(RegistroAlteracao.objects.count(), len(pelo_sinal))
+
+    def test_comando_preenche_o_log_do_historico_existente(self):
+        entrada = self.nova_entrada()
+        entrada.observacoes = "antes do log"
+        entrada.save()
+        RegistroAlteracao.objects.all().delete()
+
+        call_command("reconstruir_alteracoes", "fila", stdout=StringIO())
+
+        self.assertEqual([r.tipo for r in RegistroAlteracao.objects.do_objeto(entrada)], ["~", "+"])
+
+
+class RemocaoTests(FilaTestMixin, TestCase):
+    def setUp(self):
+        self.removidas = [self.nova_entrada(), self.nova_entrada()]
+        self.mantida = self.nova_entrada()
+        self.queryset = ListaEsperaCirurgica.objects.filter(pk__in=[e.pk for e in self.removidas])
+
+    def remover(self):
+        return remover_da_fila(self.queryset, "MORTE", change_reason="Óbito informado", usuario=self.usuario)
+
+    def test_um_update_para_o_lote(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.remover(), 2)
+        tabela = ListaEsperaCirurgica._meta.db_table
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(f'UPDATE "{tabela}"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            list(ListaEsperaCirurgica.objects.order_by("pk").values_list("ativo", "motivo_saida")),
+            [(False, "MORTE"), (False, "MORTE"), (True, None)],
+        )
+
+    def test_historico_e_log_com_motivo_e_usuario(self):
+        self.remover()
+        for entrada in self.removidas:
+            historico = entrada.history.first()
+            self.assertEqual(historico.history_type, "~")
+            self.assertEqual(historico.history_change_reason, "Óbito informado")
+            self.assertEqual(historico.history_user, self.usuario)
+
+            registro = RegistroAlteracao.objects.do_objeto(entrada).first()
+            self.assertEqual((registro.motivo, registro.usuario), ("Óbito informado", self.usuario))
+            self.assertEqual({d["campo"] for d in registro.diffs}, {"ativo", "motivo_saida"})
+        self.assertEqual(self.mantida.history.count(), 1)
+
+    def test_falha_desfaz_tudo(self):
+        with mock.patch("fila_cirurgica.remocao.registrar_lote", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.remover()
+        self.assertTrue(all(self.queryset.values_list("ativo", flat=True)))
+        self.assertEqual(self.removidas[0].history.count(), 1)
+
+    def test_queryset_vazio(self):
+        self.assertEqual(remover_da_fila(ListaEsperaCirurgica.objects.none(), "MORTE"), 0)
+
+
+class ArquivamentoTests(FilaTestMixin, TestCase):
+    def test_arquiva_o_antigo_e_mantem_o_ultimo_de_cada_objeto(self):
+        entrada = self.nova_entrada()
+        entrada.observacoes = "primeira"
+        entrada.save()
+        entrada.observacoes = "segunda"
+        entrada.save()
+        outra = self.nova_entrada()
+        historico = ListaEsperaCirurgica.history.model
+        antigo = timezone.now() - timedelta(days=400)
+        for i, h in enumerate(historico.objects.order_by("history_id")):
+            historico.objects.filter(pk=h.pk).update(history_date=antigo + timedelta(minutes=i))
+
+        self.assertEqual(arquivar(ListaEsperaCirurgica, batch_size=1), 2)
+
+        self.assertEqual([h.observacoes for h in entrada.history.all()], ["segunda"])
+        self.assertEqual(outra.history.count(), 1)
+        arquivados = HistoricoArquivado.objects.order_by("history_id")
+        self.assertEqual([a.history_type for a in arquivados], ["+", "~"])
+        self.assertEqual(arquivados[1].dados["observacoes"], "primeira")
+        self.assertEqual({a.objeto_id for a in arquivados}, {entrada.pk})
+
+        # O próximo save ainda tem contra o que calcular o diff
+        entrada.observacoes = "terceira"
+        entrada.save()
+        (diff,) = RegistroAlteracao.objects.do_objeto(entrada).first().diffs
+        self.assertEqual((diff["antes"], diff["depois"]), ("segunda", "terceira"))
+
+    def test_comando_conhece_os_modelos_auditados(self):
+        self.assertEqual(MODELOS_AUDITADOS, {"fila": ListaEsperaCirurgica, "aih": AihSolicitacao})
+        saida = StringIO()
+        call_command("arquivar_historico", "--dry-run", stdout=saida)
+        self.assertEqual([linha.split(":")[0] for linha in saida.getvalue().splitlines()], ["aih", "fila"])
+        with self.assertRaises(CommandError):
+            call_command("arquivar_historico", "paciente", stdout=StringIO())
+
+    def test_nada_recente_e_arquivado(self):
+        entrada = self.nova_entrada()
+        entrada.observacoes = "x"
+        entrada.save()
+        self.assertEqual(arquivar(ListaEsperaCirurgica), 0)
+        self.assertEqual(entrada.history.count(), 2)
+
+
+class CatalogoTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(catalogo, "_pares", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_primeira_carga_com_resposta_invalida_fica_indisponivel(self):
+        for erro in (ValueError("Expecting value"), {"detail": "erro"}):
+            with self.subTest(erro=erro):
+                efeito = {"side_effect": erro} if isinstance(erro, Exception) else {"return_value": erro}
+                with mock.patch.object(catalogo, "get_json", **efeito):
+                    with self.assertRaises(catalogo.IndiceIndisponivel):
+                        catalogo.procedimento_pertence("e1", "p1")
+
+    def test_primeira_carga(self):
+        with mock.patch.object(catalogo, "get_json", return_value=[["e1", "p1"]]):
+            self.assertTrue(catalogo.procedimento_pertence("e1", "p1"))
+            self.assertFalse(catalogo.procedimento_pertence("e1", "p2"))
+
+
+class ProntidaoTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(prontidao, _status=prontidao.OK, _bloqueado_ate=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def verificar(self, body):
+        resposta = mock.Mock(status_code=200, ok=True)
+        resposta.json.return_value = body
+        with mock.patch.object(prontidao.requests, "get", return_value=resposta):
+            prontidao._verificar()
+        return prontidao._status
+
+    def test_status_do_corpo(self):
+        self.assertEqual(self.verificar({"status": "degraded"}), prontidao.DEGRADED)
+
+    def test_corpo_inesperado_conta_como_ok(self):
+        for body in (["degraded"], "degraded", None, {"status": "talvez"}):
+            with self.subTest(body=body):
+                prontidao._status = prontidao.DEGRADED
+                self.assertEqual(self.verificar(body), prontidao.OK)
+
+
+class ApiTestMixin:
+    """API de fila simulada: ``responder(request)`` (httpx) no lugar da rede."""
+
+    def setUp(self):
+        super().setUp()
+        self.chamadas = []
+        configuracao = override_settings(API_BASE_URL="http://api.teste", API_READY_INTERVAL=0)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        def transporte(request):
+            self.chamadas.append(request)
+            return self.responder(request)
+
+        patcher = mock.patch.object(
+            api_client, "_build_async_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(transporte)),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class AutocompleteTests(ApiTestMixin, TestCase):
+    def responder(self, request):
+        if request.url.path == "/api/v1/especialidades/":
+            return httpx.Response(200, json=[{"COD_ESPECIALIDADE": 7, "NOME_ESPECIALIDADE": "Urologia"}],
+                                  headers={"X-Next-Cursor": "abc"})
+        if request.url.path == "/api/v1/procedimentos/42/":
+            return httpx.Response(200, json={"COD_PROCEDIMENTO": 42, "PROCEDIMENTO": "Apendicectomia"})
+        if request.url.path == "/api/v1/procedimentos/":
+            return httpx.Response(200, json=[])
+        return httpx.Response(503)
+
+    async def test_repassa_busca_e_cursor_para_a_api(self):
+        response = await self.async_client.get(
+            reverse("fila_cirurgica:especialidade_api_autocomplete"), {"term": "uro", "cursor": "xyz"})
+        self.assertEqual(response.json(), {
+            "results": [{"id": "7", "text": "Urologia"}],
+            "pagination": {"more": True, "cursor": "abc"},
+        })
+        (chamada,) = self.chamadas
+        self.assertEqual(dict(chamada.url.params),
+                         {"term": "uro", "limit": "25", "fields": "autocomplete", "cursor": "xyz"})
+
+    async def test_procedimento_por_id_e_filtro_de_especialidade(self):
+        url = reverse("fila_cirurgica:procedimento_api_autocomplete")
+        response = await self.async_client.get(url, {"id": "42"})
+        self.assertEqual(response.json()["results"], [{"id": 42, "text": "42 - Apendicectomia"}])
+
+        await self.async_client.get(url, {"term": "x", "especialidade_id": "7"})
+        self.assertEqual(self.chamadas[-1].url.params["cod_especialidade"], "7")
+
+    async def test_falha_da_api_e_registrada(self):
+        with self.assertLogs("fila_cirurgica.utils", "ERROR") as logs:
+            response = await self.async_client.get(reverse("fila_cirurgica:paciente_api_autocomplete"), {"term": "a"})
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("pacientes", logs.output[0])
+
+    async def test_um_cliente_por_event_loop(self):
+        self.assertIs(api_client.get_async_client(), api_client.get_async_client())
+
+
+class CoalescenciaTests(ApiTestMixin, TestCase):
+    def responder(self, request):
+        return httpx.Response(200, json={"path": request.url.path})
+
+    async def test_gets_iguais_simultaneos_viram_uma_chamada(self):
+        iguais = await asyncio.gather(*(api_client.aget_json("pacientes/1/") for _ in range(5)))
+        self.assertEqual(len(self.chamadas), 1)
+        self.assertTrue(all(r is iguais[0] for r in iguais))
+
+        await asyncio.gather(api_client.aget_json("pacientes/1/"), api_client.aget_json("pacientes/2/"),
+                             api_client.aget_json("pacientes/1/", {"fields": "autocomplete"}))
+        self.assertEqual(len(self.chamadas), 4)  # chave = path + params; sem cache
+
+    def test_get_json_sincrono_coalesce_entre_threads(self):
+        liberar = threading.Event()
+        resposta = mock.Mock(**{"json.return_value": {"ok": True}})
+
+        def get(*args, **kwargs):
+            liberar.wait(2)
+            return resposta
+
+        sessao = mock.Mock(**{"get.side_effect": get})
+        resultados = []
+        with mock.patch.object(api_client, "get_session", return_value=sessao):
+            threads = [threading.Thread(target=lambda: resultados.append(api_client.get_json("especialidades/7/")))
+                       for _ in range(4)]
+            for t in threads:
+                t.start()
+            time.sleep(0.05)
+            liberar.set()
+            for t in threads:
+                t.join(2)
+        self.assertEqual(sessao.get.call_count, 1)
+        self.assertEqual(resultados, [{"ok": True}] * 4)
+
+    def test_erro_propaga_e_libera_a_chave(self):
+        sf = SingleFlight()
+
+        def falha():
+            raise requests.HTTPError("503")
+
+        with self.assertRaises(requests.HTTPError):
+            sf.do("k", falha)
+        self.assertEqual(sf.do("k", lambda: 1), 1)
+
+
+def _json_da_api(tipo, codigo):
+    ent = api_helpers.ENTIDADES[tipo]
+    return {ent.chave_codigo: codigo, ent.chave_nome: f"{ent.rotulo} {codigo}"}
+
+
+class ResolucaoTests(TestCase):
+    def test_chamadas_a_api_em_paralelo_e_sem_repetir_codigo(self):
+        # Quatro códigos distintos: se fossem em série, a barreira estouraria
+        barreira = threading.Barrier(4, timeout=2)
+        chamadas = []
+
+        def buscar(tipo, codigo):
+            chamadas.append((tipo, codigo))
+            barreira.wait()
+            return _json_da_api(tipo, codigo)
+
+        with mock.patch.object(api_helpers, "_buscar", buscar):
+            objs = api_helpers.resolver_entidades({
+                "paciente": ("paciente", 10),
+                "procedimento": ("procedimento", "20"),
+                "especialidade": ("especialidade", "30"),
+                "preceptor": ("profissional", "40"),
+                "cirurgiao": ("profissional", "40"),
+                "vazio": ("profissional", ""),
+            })
+        self.assertEqual(len(chamadas), 4)
+        self.assertIsNone(objs["vazio"])
+        self.assertIs(objs["preceptor"], objs["cirurgiao"])
+        self.assertEqual(objs["paciente"].nome, "Paciente 10")
+        self.assertEqual(ProcedimentoAghu.objects.get().nome, "Procedimento 20")
+
+    def test_falhas_sobem_juntas_e_nada_e_gravado(self):
+        def buscar(tipo, codigo):
+            if tipo == "paciente":
+                return _json_da_api(tipo, codigo)
+            if tipo == "procedimento":
+                raise requests.HTTPError(response=mock.Mock(status_code=404))
+            raise requests.Timeout()
+
+        with mock.patch.object(api_helpers, "_buscar", buscar):
+            with self.assertRaises(api_helpers.FalhaResolucaoAPI) as ctx:
+                api_helpers.resolver_entidades({
+                    "paciente": ("paciente", 1),
+                    "procedimento": ("procedimento", 2),
+                    "especialidade": ("especialidade", 3),
+                })
+        self.assertEqual(ctx.exception.falhas, [
+            ("Procedimento 2", "não encontrado na API"),
+            ("Especialidade 3", "tempo esgotado ao consultar a API"),
+        ])
+        self.assertIsInstance(ctx.exception, requests.RequestException)
+        self.assertFalse(PacienteAghu.objects.exists())
+
+
+@override_settings(API_READY_INTERVAL=0, API_ENTITY_TTL=60)
+class LocalPrimeiroTests(TestCase):
+    def setUp(self):
+        self.agora = timezone.now()
+        self.recente = EspecialidadeAghu.objects.create(
+            cod_especialidade="1", nome_especialidade="Recente", atualizado_em=self.agora)
+        self.vencida = EspecialidadeAghu.objects.create(
+            cod_especialidade="2", nome_especialidade="Antigo", atualizado_em=self.agora - timedelta(minutes=5))
+        self.buscar = mock.Mock(side_effect=_json_da_api)
+        self.agendadas = []
+        for patcher in (
+            mock.patch.object(api_helpers, "_buscar", self.buscar),
+            mock.patch.object(api_helpers._executor_bg, "submit", lambda fn, *args: self.agendadas.append(args)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(api_helpers._atualizando.clear)
+
+    def test_registro_recente_nao_chama_a_api(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(api_helpers.get_or_create_especialidade(1), self.recente)
+        self.buscar.assert_not_called()
+        self.assertEqual(self.agendadas, [])
+
+    def test_registro_vencido_volta_na_hora_e_e_atualizado_uma_vez(self):
+        for _ in range(2):
+            self.assertEqual(api_helpers.get_or_create_especialidade("2").nome_especialidade, "Antigo")
+        self.buscar.assert_not_called()
+        self.assertEqual(self.agendadas, [("especialidade", "2")])
+
+        with mock.patch.object(api_helpers, "connection"):  # não fecha a conexão do TestCase
+            api_helpers._atualizar("especialidade", "2")
+        self.vencida.refresh_from_db()
+        self.assertEqual(self.vencida.nome_especialidade, "Especialidade 2")
+        self.assertGreaterEqual(self.vencida.atualizado_em, self.agora)
+        self.assertEqual(api_helpers._atualizando, set())
+
+    def test_api_sobrecarregada_adia_a_atualizacao(self):
+        with mock.patch.object(prontidao, "status", return_value=prontidao.DEGRADED):
+            api_helpers.get_or_create_especialidade("2")
+        self.assertEqual(self.agendadas, [])
+
+    def test_so_o_desconhecido_espera_a_api(self):
+        objs = api_helpers.resolver_entidades({
+            "a": ("especialidade", "1"), "b": ("especialidade", "2"), "c": ("especialidade", "3"),
+        })
+        self.buscar.assert_called_once_with("especialidade", "3")
+        self.assertEqual(objs["c"].nome_especialidade, "Especialidade 3")
+        self.assertIsNotNone(objs["c"].atualizado_em)
@@ -1,56 +1,81 @@
 # fila_cirurgica/utils.py
-import requests
+import logging
+
+import httpx
 from django.http import JsonResponse
-from django.conf import settings
+from gestor_fila_hulw import tracing
 
-# djangoapp/fila_cirurgica/utils.py
-def api_autocomplete_proxy(request, api_endpoint, id_field, text_format_str):
-    term = request.GET.get('term', '')
+from .api_client import aget_json, aget_page
+
+logger = logging.getLogger(__name__)
+
+
+def _select2_response(results, next_cursor=None):
+    # "more" vem do cursor da API; o JS devolve o cursor ao pedir a próxima página
+    pagination = {"more": next_cursor is not None}
+    if next_cursor:
+        pagination["cursor"] = next_cursor
+    with tracing.timed("json"):
+        return JsonResponse({"results": results, "pagination": pagination})
+
+
+def _page_params(request, params):
+    """Repassa o cursor (keyset) ou, na falta dele, o número da página."""
+    cursor = request.GET.get('cursor')
     page = request.GET.get('page')
-    limit = request.GET.get('limit', 25)
-    params = {'term': term, 'limit': 25}
-    if page:
+    if cursor:
+        params['cursor'] = cursor
+    elif page:
         params['page'] = page
-    if limit:
-        params['limit'] = limit
-        
-    print(">>> [UTIL] api_autocomplete_proxy chamada")
-    print(">>> [UTIL] API_BASE_URL:", settings.API_BASE_URL)
-    print(">>> [UTIL] endpoint:", api_endpoint)
-    print(">>> [UTIL] params:", params)
+    return params
+
+
+def _parse_limit(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# djangoapp/fila_cirurgica/utils.py
+async def api_autocomplete_proxy(request, api_endpoint, id_field, text_format_str, fields='autocomplete'):
+    """
+    Proxy autocomplete (Select2) assíncrono para a API de fila.
+    Aceita ?term=... & cursor=... (ou page=...) & limit=... e repassa para
+    /api/v1/<endpoint>/.
+    ``fields`` vai para a API: o perfil ``autocomplete`` traz só chave e nome
+    (o que o Select2 mostra); passe outros campos se o texto precisar deles.
+    """
+    term = request.GET.get('term', '')
+    limit = _parse_limit(request.GET.get('limit'), 25)
+    params = _page_params(request, {'term': term, 'limit': limit, 'fields': fields})
 
     try:
-        print("1" + f"{settings.API_BASE_URL}/api/v1/{api_endpoint}/")
-        response = requests.get(f"{settings.API_BASE_URL}/api/v1/{api_endpoint}/", params=params)
-        print("12")
-        response.raise_for_status()
-        print("123")
-        api_data = response.json()
-        print("1234")
-
-        results = [
-            {"id": str(item[id_field]), "text": text_format_str.format(**item)}
-            for item in api_data
-        ]
-        more = str(len(results)) == params.get('limit', 25)
-        return JsonResponse({"results": results, "pagination": {"more": more}})
-    except requests.RequestException:
-        print("api_autocomplete_proxy: erro ao chamar API")
+        api_data, next_cursor = await aget_page(f"{api_endpoint}/", params=params)
+    except httpx.HTTPError:
+        logger.exception("Falha ao chamar a API de fila (autocomplete de %s)", api_endpoint)
         return JsonResponse({'error': 'Falha ao contatar a API'}, status=500)
-    
+
+    results = [
+        {"id": str(item[id_field]), "text": text_format_str.format(**item)}
+        for item in api_data
+    ]
+    return _select2_response(results, next_cursor)
+
 
 # adicionar em fila_cirurgica/utils.py (abaixo da api_autocomplete_proxy existente)
 
-def api_autocomplete_procedimento(request,
-                                  api_endpoint='procedimentos',
-                                  id_field='COD_PROCEDIMENTO',
-                                  text_format_str='{COD_PROCEDIMENTO} - {PROCEDIMENTO}',
-                                  especialidade_param='cod_especialidade',
-                                  limit=5,
-                                  timeout=10):
+async def api_autocomplete_procedimento(request,
+                                        api_endpoint='procedimentos',
+                                        id_field='COD_PROCEDIMENTO',
+                                        text_format_str='{COD_PROCEDIMENTO} - {PROCEDIMENTO}',
+                                        especialidade_param='cod_especialidade',
+                                        limit=5,
+                                        timeout=10,
+                                        fields='autocomplete'):
     """
     Proxy autocomplete específico para PROCEDIMENTOS que:
-      - aceita ?term=... & page=...
+      - aceita ?term=... & cursor=... (ou page=...)
       - se receber ?especialidade_id=... envia esse filtro para a API
       - se receber ?id=NNN tenta buscar o item único em /<endpoint>/<id>/ (útil para pré-carregar Select2 no edit)
     Retorna JSON no formato: { "results": [...], "pagination": {"more": True/False} }
@@ -59,29 +84,25 @@ def api_autocomplete_procedimento(request,
     requested_id = request.GET.get('id')
     if requested_id:
         try:
-            resp = requests.get(f"{settings.API_BASE_URL}/api/v1/{api_endpoint}/{requested_id}/", timeout=timeout)
-            resp.raise_for_status()
-            item = resp.json()
-            # aceita resposta objeto ou lista
-            if isinstance(item, list):
-                item = item[0] if item else None
-            if not item:
-                return JsonResponse({"results": [], "pagination": {"more": False}})
-            return JsonResponse({
-                "results": [
-                    {"id": item[id_field], "text": text_format_str.format(**item)}
-                ],
-                "pagination": {"more": False}
-            })
-        except requests.RequestException:
+            item = await aget_json(f"{api_endpoint}/{requested_id}/", params={'fields': fields}, timeout=timeout)
+        except httpx.HTTPError:
+            logger.exception("Falha ao chamar a API de fila (%s/%s)", api_endpoint, requested_id)
             return JsonResponse({'error': 'Falha ao contatar a API'}, status=500)
+        # aceita resposta objeto ou lista
+        if isinstance(item, list):
+            item = item[0] if item else None
+        if not item:
+            return JsonResponse({"results": [], "pagination": {"more": False}})
+        return JsonResponse({
+            "results": [
+                {"id": item[id_field], "text": text_format_str.format(**item)}
+            ],
+            "pagination": {"more": False}
+        })
 
     # --- caso busca/paginação normal ---
     term = request.GET.get('term', '')
-    page = request.GET.get('page')
-    params = {'term': term, 'limit': limit}
-    if page:
-        params['page'] = page
+    params = _page_params(request, {'term': term, 'limit': limit, 'fields': fields})
 
     # pega especialidade_id do querystring
     especialidade_val = request.GET.get('especialidade_id')
@@ -89,25 +110,23 @@ def api_autocomplete_procedimento(request,
         params[especialidade_param] = especialidade_val
 
     try:
-        response = requests.get(f"{settings.API_BASE_URL}/api/v1/{api_endpoint}/", params=params, timeout=timeout)
-        response.raise_for_status()
-        api_data = response.json()
-        # se a API devolve wrapper { results: [...] }, normalize
-        if isinstance(api_data, dict) and 'results' in api_data:
-            items = api_data['results']
-        else:
-            items = api_data
-
-        results = []
-        for item in items:
-            try:
-                results.append({"id": item[id_field], "text": text_format_str.format(**item)})
-            except Exception:
-                # pula itens mal formatados
-                continue
-
-        more = len(results) == limit
-        return JsonResponse({"results": results, "pagination": {"more": more}})
-    except requests.RequestException:
+        api_data, next_cursor = await aget_page(f"{api_endpoint}/", params=params, timeout=timeout)
+    except httpx.HTTPError:
+        logger.exception("Falha ao chamar a API de fila (autocomplete de %s)", api_endpoint)
         return JsonResponse({'error': 'Falha ao contatar a API'}, status=500)
 
+    # se a API devolve wrapper { results: [...] }, normalize
+    if isinstance(api_data, dict) and 'results' in api_data:
+        items = api_data['results']
+    else:
+        items = api_data
+
+    results = []
+    for item in items:
+        try:
+            results.append({"id": item[id_field], "text": text_format_str.format(**item)})
+        except Exception:
+            # pula itens mal formatados
+            continue
+
+    return _select2_response(results, next_cursor)
@@ -1,21 +1,20 @@
 # fila_cirurgica/views.py
 from .utils import api_autocomplete_proxy, api_autocomplete_procedimento
 
-def procedimento_api_autocomplete(request):
-    return api_autocomplete_procedimento(request)
+# Views assíncronas: sob ASGI a espera pela API não prende um worker.
 
-def paciente_api_autocomplete(request):
-    return api_autocomplete_proxy(request, 'pacientes', 'PRONTUARIO_PAC', '{NOME_PACIENTE} (Prontuário: {PRONTUARIO_PAC})')
+async def procedimento_api_autocomplete(request):
+    return await api_autocomplete_procedimento(request)
 
-def medico_api_autocomplete(request):
-    return api_autocomplete_proxy(request, 'profissionais', 'MATRICULA', '{NOME_PROFISSIONAL} (Matrícula: {MATRICULA})')
+async def paciente_api_autocomplete(request):
+    return await api_autocomplete_proxy(request, 'pacientes', 'PRONTUARIO_PAC', '{NOME_PACIENTE} (Prontuário: {PRONTUARIO_PAC})')
 
-# djangoapp/fila_cirurgica/views.py
-def especialidade_api_autocomplete(request):
-    print(">>> [VIEW] especialidade_api_autocomplete chamada")
-    print(">>> [VIEW] GET:", request.GET)
+async def medico_api_autocomplete(request):
+    return await api_autocomplete_proxy(request, 'profissionais', 'MATRICULA', '{NOME_PROFISSIONAL} (Matrícula: {MATRICULA})')
 
-    return api_autocomplete_proxy(
+# djangoapp/fila_cirurgica/views.py
+async def especialidade_api_autocomplete(request):
+    return await api_autocomplete_proxy(
         request,
         'especialidades',
         'COD_ESPECIALIDADE',
@@ -3,6 +3,10 @@ ASGI config for gestor_fila_hulw project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Em produção, sirva com (veja scripts/commands.sh, DJANGO_SERVER=asgi):
+
+    uvicorn gestor_fila_hulw.asgi:application --host 0.0.0.0 --port 8050 --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
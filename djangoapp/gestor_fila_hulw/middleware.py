@@ -0,0 +1,62 @@
+# gestor_fila_hulw/middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+
+from . import tracing
+
+
+def _install_db_wrapper(sender, connection, **kwargs):
+    # Cada thread tem sua própria conexão; o wrapper é instalado em todas
+    # e só registra tempo quando há uma requisição sendo rastreada.
+    if tracing.db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(tracing.db_execute_wrapper)
+
+
+connection_created.connect(_install_db_wrapper, dispatch_uid="tracing_db_wrapper")
+
+
+class RequestTracingMiddleware:
+    """
+    Gera/propaga o ``X-Request-ID``, devolve o ``Server-Timing`` com as fases
+    medidas e alimenta o histograma de latência por rota.
+
+    Deve ser o primeiro middleware da lista, para medir a requisição inteira
+    e renderizar os TemplateResponse por último.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        trace = tracing.start_trace(request.headers.get(tracing.REQUEST_ID_HEADER))
+        response = self.get_response(request)
+        return self._finish(request, response, trace)
+
+    async def __acall__(self, request):
+        trace = tracing.start_trace(request.headers.get(tracing.REQUEST_ID_HEADER))
+        response = await self.get_response(request)
+        return self._finish(request, response, trace)
+
+    def process_template_response(self, request, response):
+        # Renderiza aqui (último da cadeia) para medir o tempo de template
+        with tracing.timed("tpl"):
+            response.render()
+        return response
+
+    def _finish(self, request, response, trace):
+        response[tracing.REQUEST_ID_HEADER] = trace.request_id
+        response["Server-Timing"] = trace.server_timing()
+
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else "<sem rota>"
+        tracing.request_latency.observe(route, request.method, time.perf_counter() - trace.start)
+        return response
@@ -17,6 +17,29 @@ ALLOWED_HOSTS = [
 # Em Docker, o serviço da API expõe a porta 8000; o Django fala com ela via rede do compose.
 API_BASE_URL = os.getenv("API_BASE_URL", "http://fila_api:8000")
 
+# Pool de conexões HTTP compartilhado com a API (fila_cirurgica/api_client.py)
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "10"))
+API_MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "100"))
+API_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("API_MAX_KEEPALIVE_CONNECTIONS", "20"))
+# Threads usadas para resolver em paralelo as FKs vindas da API ao salvar
+API_RESOLVE_WORKERS = int(os.getenv("API_RESOLVE_WORKERS", "8"))
+# Por quanto tempo (s) um paciente/procedimento/... local é usado sem reconsultar a API
+API_ENTITY_TTL = int(os.getenv("API_ENTITY_TTL", "21600"))
+# Prontidão da API (/health/ready, fila_cirurgica/prontidao.py): intervalo (s)
+# entre verificações (0 desliga) e timeout da sonda
+API_READY_INTERVAL = float(os.getenv("API_READY_INTERVAL", "5"))
+API_READY_TIMEOUT = float(os.getenv("API_READY_TIMEOUT", "1"))
+# Intervalo (s) de atualização do índice especialidade/procedimento (fila_cirurgica/catalogo.py)
+CATALOGO_REFRESH_INTERVAL = int(os.getenv("CATALOGO_REFRESH_INTERVAL", "900"))
+# Idade (dias) a partir da qual o histórico da fila/AIHs vai para o arquivo
+# (comando arquivar_historico, fila_cirurgica/arquivamento.py)
+HISTORICO_ARQUIVAR_APOS_DIAS = int(os.getenv("HISTORICO_ARQUIVAR_APOS_DIAS", "365"))
+
+# IPs autorizados a ler /metrics/ (separados por vírgula; "*" libera todos)
+METRICS_ALLOWED_IPS = [
+    h.strip() for h in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if h.strip()
+]
+
 # ---------- Installed apps (adapte listagem de apps do seu projeto) ----------
 INSTALLED_APPS = [
     # Django default apps
@@ -44,6 +67,8 @@ INSTALLED_APPS = [
 
 # ---------- Middleware (WhiteNoise logo após SecurityMiddleware) ----------
 MIDDLEWARE = [
+    # Correlation ID + Server-Timing + histogramas (deve ser o primeiro)
+    "gestor_fila_hulw.middleware.RequestTracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     # WhiteNoise para servir staticfiles em produção
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -75,6 +100,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "gestor_fila_hulw.wsgi.application"
+ASGI_APPLICATION = "gestor_fila_hulw.asgi.application"
 
 # ---------- Database: Postgres via env, fallback para sqlite (dev) ----------
 if os.getenv("POSTGRES_HOST"):
@@ -142,6 +168,8 @@ LOGGING = {
     "disable_existing_loggers": False,
     "handlers": {"console": {"class": "logging.StreamHandler"}},
     "root": {"handlers": ["console"], "level": os.getenv("DJANGO_LOG_LEVEL", "INFO")},
+    # httpx loga cada requisição em INFO; os autocompletes geram muitas
+    "loggers": {"httpx": {"level": "WARNING"}},
 }
 
 # ---------- Email (exemplo básico via env; ajuste conforme necessário) ----------
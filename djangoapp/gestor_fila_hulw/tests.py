@@ -0,0 +1,73 @@
+import re
+
+import httpx
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from fila_cirurgica.tests import ApiTestMixin
+
+from . import tracing
+from .middleware import _install_db_wrapper
+
+
+class TracingTests(ApiTestMixin, TestCase):
+    def responder(self, request):
+        return httpx.Response(200, json=[])
+
+    def test_request_id_valido_e_repassado_para_a_api(self):
+        response = self.client.get(reverse("fila_cirurgica:paciente_api_autocomplete"),
+                                   HTTP_X_REQUEST_ID="abc-123")
+        self.assertEqual(response[tracing.REQUEST_ID_HEADER], "abc-123")
+        (chamada,) = self.chamadas
+        self.assertEqual(chamada.headers[tracing.REQUEST_ID_HEADER], "abc-123")
+        self.assertRegex(response["Server-Timing"], r'^api;dur=[\d.]+;desc="fila_api", .*total;dur=[\d.]+$')
+
+    def test_request_id_invalido_e_substituido(self):
+        response = self.client.get(reverse("fila_cirurgica:paciente_api_autocomplete"),
+                                   HTTP_X_REQUEST_ID="não vale")
+        self.assertRegex(response[tracing.REQUEST_ID_HEADER], r"^[0-9a-f]{32}$")
+
+    def test_fases_de_banco_e_template(self):
+        # A conexão do TestCase foi aberta antes do middleware ser importado
+        _install_db_wrapper(None, connection)
+        self.addCleanup(connection.execute_wrappers.remove, tracing.db_execute_wrapper)
+        usuario = get_user_model().objects.create_user("auditor", password="x", is_staff=True)
+        usuario.user_permissions.add(Permission.objects.get(codename="view_registroalteracao"))
+        self.client.force_login(usuario)
+        timing = self.client.get(reverse("portal:auditoria"))["Server-Timing"]
+        fases = [parte.split(";")[0] for parte in timing.split(", ")]
+        self.assertEqual(fases, ["db", "tpl", "total"])
+
+
+class MetricsTests(TestCase):
+    def test_histograma_por_rota(self):
+        self.client.get(reverse("portal:login"))
+        texto = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn("# TYPE django_http_request_duration_seconds histogram", texto)
+        contagem = re.search(
+            r'^django_http_request_duration_seconds_count\{route="portal/login/",method="GET"\} (\d+)$',
+            texto, re.M)
+        self.assertIsNotNone(contagem)
+        inf = re.search(
+            r'^django_http_request_duration_seconds_bucket\{route="portal/login/",method="GET",le="\+Inf"\} (\d+)$',
+            texto, re.M)
+        self.assertEqual(inf.group(1), contagem.group(1))
+
+    def test_so_para_ips_autorizados(self):
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.9").status_code, 403)
+        with self.settings(METRICS_ALLOWED_IPS=["*"]):
+            self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.9").status_code, 200)
+
+    def test_histograma_acumulado(self):
+        histograma = tracing.LatencyHistogram(buckets=(0.1, 1.0))
+        for segundos in (0.05, 0.5, 0.5, 3):
+            histograma.observe("r/", "GET", segundos)
+        linhas = histograma.render("x").splitlines()
+        self.assertIn('x_bucket{route="r/",method="GET",le="0.1"} 1', linhas)
+        self.assertIn('x_bucket{route="r/",method="GET",le="1.0"} 3', linhas)
+        self.assertIn('x_bucket{route="r/",method="GET",le="+Inf"} 4', linhas)
+        self.assertIn('x_sum{route="r/",method="GET"} 4.050000', linhas)
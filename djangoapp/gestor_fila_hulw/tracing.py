@@ -0,0 +1,144 @@
+# gestor_fila_hulw/tracing.py
+"""
+Rastreamento por requisição: correlation ID, tempos por fase e histogramas
+de latência por rota.
+
+- O ID vem do header ``X-Request-ID`` (ou é gerado) e é repassado pelo
+  ``fila_cirurgica.api_client`` em todas as chamadas à fila_api.
+- As fases medidas (``db``, ``api``, ``tpl``, ``json``) são devolvidas no
+  header ``Server-Timing`` pelo ``RequestTracingMiddleware``.
+- Os histogramas ficam em memória, por processo, e são expostos em
+  ``/metrics/`` no formato texto do Prometheus.
+"""
+import contextvars
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._\-]{1,64}$")
+
+# Descrições das fases no Server-Timing (headers HTTP: apenas ASCII)
+PHASES = {
+    "db": "Banco de dados",
+    "api": "fila_api",
+    "tpl": "Templates",
+    "json": "JSON",
+}
+
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    __slots__ = ("request_id", "start", "phases")
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.start = time.perf_counter()
+        self.phases = {}
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self):
+        total = time.perf_counter() - self.start
+        parts = [
+            f'{name};dur={self.phases[name] * 1000:.1f};desc="{desc}"'
+            for name, desc in PHASES.items() if name in self.phases
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def start_trace(incoming_id=None):
+    """Inicia o rastreamento da requisição corrente e devolve o ``Trace``."""
+    if not incoming_id or not _VALID_REQUEST_ID.match(incoming_id):
+        incoming_id = uuid.uuid4().hex
+    trace = Trace(incoming_id)
+    _trace.set(trace)
+    return trace
+
+
+def get_request_id():
+    trace = _trace.get()
+    return trace.request_id if trace else None
+
+
+def record(phase, seconds):
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase):
+    """Acumula o tempo do bloco na fase ``phase`` da requisição corrente."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """``execute_wrapper`` do Django: soma o tempo das queries na fase ``db``."""
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record("db", time.perf_counter() - start)
+
+
+# --------------------- Histogramas ---------------------
+
+# Limites (em segundos) dos buckets de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Histograma cumulativo de latências por rota (thread-safe)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, route, method, seconds):
+        key = (route, method)
+        with self._lock:
+            serie = self._series.get(key)
+            if serie is None:
+                serie = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = serie[0]
+            for i, limite in enumerate(self.buckets):
+                if seconds <= limite:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            serie[1] += seconds
+
+    def render(self, name):
+        """Exporta no formato texto do Prometheus."""
+        with self._lock:
+            series = {k: (list(v[0]), v[1]) for k, v in self._series.items()}
+        lines = [
+            f"# HELP {name} Latência das requisições por rota, em segundos.",
+            f"# TYPE {name} histogram",
+        ]
+        for (route, method), (counts, soma) in sorted(series.items()):
+            labels = f'route="{route}",method="{method}"'
+            acumulado = 0
+            for limite, c in zip(self.buckets, counts):
+                acumulado += c
+                lines.append(f'{name}_bucket{{{labels},le="{limite}"}} {acumulado}')
+            acumulado += counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {acumulado}')
+            lines.append(f"{name}_sum{{{labels}}} {soma:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {acumulado}")
+        return "\n".join(lines) + "\n"
+
+
+request_latency = LatencyHistogram()
@@ -7,6 +7,8 @@ from django.views.generic.base import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .views import metrics
+
 # handlers globais (usados quando DEBUG=False)
 handler404 = "portal.views.error_404"
 handler403 = "portal.views.error_403"
@@ -20,6 +22,7 @@ urlpatterns = ([
     path('externo/', include('externo.urls', namespace="externo")),
     path("portal/", include("portal.urls", namespace="portal")),
     path("admin/", admin.site.urls),
+    path("metrics/", metrics, name="metrics"),
     ]
 )
 
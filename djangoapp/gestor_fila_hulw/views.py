@@ -6,9 +6,12 @@ from django.core.files.storage import default_storage
 from django.contrib import messages
 import csv
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.contrib.auth.decorators import login_required
 
+from .tracing import request_latency
+
 
 @login_required  # Garante que apenas usuários autenticados acessem
 def especialidade_autocomplete(request):
@@ -23,6 +26,20 @@ def especialidade_autocomplete(request):
     return JsonResponse(data, safe=False)
 
 
+def metrics(request):
+    """
+    Histogramas de latência por rota (formato Prometheus), apenas para os
+    IPs em METRICS_ALLOWED_IPS (por padrão, somente a própria máquina).
+    """
+    allowed = settings.METRICS_ALLOWED_IPS
+    if "*" not in allowed and request.META.get("REMOTE_ADDR") not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        request_latency.render("django_http_request_duration_seconds"),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 def home(request):
     if request.method == 'POST' and request.FILES.get('file'):
         # Obter o arquivo HTML enviado
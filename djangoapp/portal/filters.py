@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import copy
+from datetime import datetime, time, timedelta
+
 import django_filters as df
 from django import forms
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.utils.timezone import make_aware
+
+from fila_cirurgica.auditoria import MODELOS_AUDITADOS
 from fila_cirurgica.models import (
     ListaEsperaCirurgica,
+    RegistroAlteracao,
     EspecialidadeAghu as Especialidade,
     ProcedimentoAghu as Procedimento,
     ProfissionalAghu as Profissional,
@@ -27,10 +36,32 @@ class TriStateChoiceFilter(df.ChoiceFilter):
         return qs  # '' -> sem filtro
 
 
+class SelectMultipleAjax(forms.SelectMultiple):
+    """
+    SelectMultiple para campos de modelo buscados por AJAX (Select2): só as
+    opções selecionadas viram ``<option>``, lidas com um ``IN``; o resto do
+    catálogo nunca é carregado para renderizar o formulário.
+    """
+    def optgroups(self, name, value, attrs=None):
+        campo = getattr(self.choices, "field", None)
+        if campo is None:
+            return super().optgroups(name, value, attrs)
+        selecionados = [v for v in value if v]
+        objs = (
+            campo.queryset.filter(**{f"{campo.to_field_name or 'pk'}__in": selecionados})
+            if selecionados else []
+        )
+        widget = copy.copy(self)
+        widget.choices = [(campo.prepare_value(o), campo.label_from_instance(o)) for o in objs]
+        return super(SelectMultipleAjax, widget).optgroups(name, value, attrs)
+
+
 class FilaFilter(df.FilterSet):
     """
     - Especialidade, Procedimento, Médico: múltiplos via Select2 (IDs externos)
-      mapeados por `to_field_name`.
+      mapeados por `to_field_name`. As opções vêm por AJAX: o formulário só
+      renderiza as selecionadas e os códigos enviados são validados com um
+      único `IN` (ModelMultipleChoiceField), sem carregar o catálogo.
     - Datas: min/max.
     - Booleanos: tri-state (Todos/Sim/Não).
     - Prontuário: icontains.
@@ -42,21 +73,21 @@ class FilaFilter(df.FilterSet):
         field_name="especialidade__cod_especialidade",
         queryset=Especialidade.objects.order_by("nome_especialidade"),
         to_field_name="cod_especialidade",
-        widget=forms.SelectMultiple(attrs={"id": "id_especialidade"}),
+        widget=SelectMultipleAjax(attrs={"id": "id_especialidade"}),
     )
     procedimento = df.ModelMultipleChoiceFilter(
         label="Procedimento",
         field_name="procedimento__codigo",
         queryset=Procedimento.objects.order_by("nome"),
         to_field_name="codigo",
-        widget=forms.SelectMultiple(attrs={"id": "id_procedimento"}),
+        widget=SelectMultipleAjax(attrs={"id": "id_procedimento"}),
     )
     medico = df.ModelMultipleChoiceFilter(
         label="Médico",
         field_name="medico__matricula",
         queryset=Profissional.objects.order_by("nome"),
         to_field_name="matricula",
-        widget=forms.SelectMultiple(attrs={"id": "id_medico"}),
+        widget=SelectMultipleAjax(attrs={"id": "id_medico"}),
     )
 
     # Demais filtros
@@ -103,3 +134,61 @@ class FilaFilter(df.FilterSet):
             "data_entrada_max",
             "prontuario",
         ]
+
+
+class AuditoriaFilter(df.FilterSet):
+    """
+    Filtros do feed de auditoria (``RegistroAlteracao``). As datas viram
+    intervalos em ``data`` (sem ``__date``), para usar os índices.
+    """
+
+    modelo = df.ChoiceFilter(
+        label="Registro",
+        choices=(("fila", "Fila"), ("aih", "AIH")),
+        empty_label="Todos",
+        method="filtrar_modelo",
+        widget=forms.Select(attrs={"id": "id_modelo"}),
+    )
+    usuario = df.ModelChoiceFilter(
+        label="Usuário",
+        field_name="usuario",
+        queryset=get_user_model().objects.order_by("username"),
+        empty_label="Todos",
+        widget=forms.Select(attrs={"id": "id_usuario"}),
+    )
+    tipo = df.ChoiceFilter(
+        label="Tipo",
+        field_name="tipo",
+        choices=RegistroAlteracao.TIPO_CHOICES,
+        empty_label="Todos",
+        widget=forms.Select(attrs={"id": "id_tipo"}),
+    )
+    motivo = df.CharFilter(
+        label="Motivo",
+        field_name="motivo",
+        lookup_expr="icontains",
+        widget=forms.TextInput(attrs={"placeholder": "Ex.: contato", "id": "id_motivo"}),
+    )
+    data_min = df.DateFilter(
+        label="Data (de)",
+        method="filtrar_data_min",
+        widget=forms.DateInput(attrs={"type": "date", "id": "id_data_min"}),
+    )
+    data_max = df.DateFilter(
+        label="Data (até)",
+        method="filtrar_data_max",
+        widget=forms.DateInput(attrs={"type": "date", "id": "id_data_max"}),
+    )
+
+    class Meta:
+        model = RegistroAlteracao
+        fields = ["modelo", "usuario", "tipo", "motivo", "data_min", "data_max"]
+
+    def filtrar_modelo(self, qs, name, value):
+        return qs.filter(content_type=ContentType.objects.get_for_model(MODELOS_AUDITADOS[value]))
+
+    def filtrar_data_min(self, qs, name, value):
+        return qs.filter(data__gte=make_aware(datetime.combine(value, time.min)))
+
+    def filtrar_data_max(self, qs, name, value):
+        return qs.filter(data__lt=make_aware(datetime.combine(value + timedelta(days=1), time.min)))
@@ -2,16 +2,32 @@ from __future__ import annotations
 
 from django import forms
 from django.urls import reverse_lazy  # Importado para resolver URLs no widget
+from fila_cirurgica import catalogo
 from fila_cirurgica.api_helpers import (
-    get_or_create_especialidade,
-    get_or_create_paciente,
-    get_or_create_procedimento,
-    get_or_create_profissional,
+    resolver_entidades,
 )
 from fila_cirurgica.models import ListaEsperaCirurgica
 from aih.models import AihSolicitacao
 
 
+def _validar_procedimento_da_especialidade(form, cleaned, esp_field, proc_field):
+    """
+    Confere no índice local se o procedimento escolhido pertence à
+    especialidade (comparação exata, sem chamada à API).
+    """
+    esp_id = cleaned.get(esp_field)
+    proc_id = cleaned.get(proc_field)
+    if not esp_id or not proc_id:
+        return
+    try:
+        valido = catalogo.procedimento_pertence(esp_id, proc_id)
+    except catalogo.IndiceIndisponivel:
+        form.add_error(proc_field, "Não foi possível validar o procedimento agora. Tente novamente.")
+        return
+    if not valido:
+        form.add_error(proc_field, "O procedimento selecionado não pertence à especialidade informada.")
+
+
 class FilaUpdateForm(forms.ModelForm):
     """
     Formulário para EDIÇÃO de uma entrada da fila.
@@ -539,6 +555,11 @@ class FilaCreateForm(forms.ModelForm):
                     self.add_error(name, "Este campo não pode ser alterado pois foi originado de uma AIH.")
                     # (Opcional) Força o valor de volta para o inicial
                     cleaned[name] = self.initial.get(name)
+
+        # Procedimento(s) devem pertencer à(s) especialidade(s) escolhida(s)
+        _validar_procedimento_da_especialidade(self, cleaned, "especialidade_api", "procedimento_api")
+        _validar_procedimento_da_especialidade(
+            self, cleaned, "especialidade_secundario_api", "procedimento_secundario_api")
         return cleaned
 
     def save(self, commit: bool = True) -> ListaEsperaCirurgica:
@@ -558,20 +579,26 @@ class FilaCreateForm(forms.ModelForm):
         esp_sec_id = self.cleaned_data.get("especialidade_secundario_api")
 
         # 2. Usa os 'helpers' para buscar ou criar os objetos FK
-        # (Isso desacopla o form da lógica de API)
-        instance.paciente = get_or_create_paciente(prontuario=prontuario)
-        instance.especialidade = get_or_create_especialidade(esp_id)
-        instance.procedimento = get_or_create_procedimento(proc_id)
-        instance.medico = get_or_create_profissional(med_id)
+        # (Isso desacopla o form da lógica de API). As chamadas à API
+        # rodam em paralelo; falhas sobem juntas numa FalhaResolucaoAPI.
+        pedidos = {
+            "paciente": ("paciente", prontuario),
+            "especialidade": ("especialidade", esp_id),
+            "procedimento": ("procedimento", proc_id),
+            "medico": ("profissional", med_id),
+        }
 
         # 3. Processa os campos secundários (opcionais)
         if proc_sec_id and esp_sec_id:
-            instance.procedimento_secundario = get_or_create_procedimento(proc_sec_id)
-            instance.especialidade_secundario = get_or_create_especialidade(esp_sec_id)
+            pedidos["procedimento_secundario"] = ("procedimento", proc_sec_id)
+            pedidos["especialidade_secundario"] = ("especialidade", esp_sec_id)
         else:
             instance.procedimento_secundario = None
             instance.especialidade_secundario = None
 
+        for campo, obj in resolver_entidades(pedidos).items():
+            setattr(instance, campo, obj)
+
         # 4. Salva a instância no banco (se commit=True)
         if commit:
             instance.save()
@@ -776,6 +803,8 @@ class AihCreateForm(forms.ModelForm):
         if prioridade and prioridade != "SEM" and not prioridade_justificativa:
             self.add_error("prioridade_justificativa",
                            "Informe o motivo dessa prioridade.")
+
+        _validar_procedimento_da_especialidade(self, cleaned, "especialidade_api", "procedimento_api")
         return cleaned
 
     def save(self, commit: bool = True) -> AihSolicitacao:
@@ -792,11 +821,17 @@ class AihCreateForm(forms.ModelForm):
         med_id = str(self.cleaned_data["medico_api"])
 
         # Usa os helpers para buscar/criar os objetos relacionados
-        # Assumindo que os helpers retornam o objeto ou None se não encontrado/criado
-        paciente_obj = get_or_create_paciente(prontuario=prontuario_str)
-        especialidade_obj = get_or_create_especialidade(esp_id)
-        procedimento_obj = get_or_create_procedimento(proc_id)
-        medico_obj = get_or_create_profissional(med_id)
+        # (chamadas à API em paralelo; None se o código vier vazio)
+        objs = resolver_entidades({
+            "paciente": ("paciente", prontuario_str),
+            "especialidade": ("especialidade", esp_id),
+            "procedimento": ("procedimento", proc_id),
+            "medico": ("profissional", med_id),
+        })
+        paciente_obj = objs["paciente"]
+        especialidade_obj = objs["especialidade"]
+        procedimento_obj = objs["procedimento"]
+        medico_obj = objs["medico"]
 
         # --- PREENCHIMENTO DOS CAMPOS ---
 
@@ -57,6 +57,9 @@ $(function () {
             return;
         }
 
+        // Cursor da próxima página (ver select2_cursor.js)
+        const pager = select2Cursor();
+
         $el.select2({
             placeholder,
             allowClear: true,
@@ -69,12 +72,14 @@ $(function () {
                 // Impede a requisição AJAX se o campo 'dependsOn' (se existir) não estiver preenchido
                 transport: (p, ok, fail) => (dependsOn && !dependsOn.val()) ? null : $.ajax(p).then(ok).catch(fail),
                 // Monta os parâmetros da query (termo, paginação, etc)
-                data: p => getParams ? getParams(p) : ({
+                data: p => pager.params(p, getParams ? getParams(p) : ({
                     term: p.term,
-                    page: p.page || 1,
                     limit: 10
-                }),
-                processResults: mapResults,
+                })),
+                processResults: (data, p) => {
+                    pager.remember(data, p);
+                    return mapResults(data);
+                },
                 cache: true
             }
         });
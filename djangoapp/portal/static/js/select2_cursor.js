@@ -0,0 +1,35 @@
+/**
+ * Paginação por cursor (keyset) para os Select2 que usam os proxies de
+ * autocomplete do Django.
+ *
+ * O proxy devolve em `pagination.cursor` o cursor da próxima página. O
+ * Select2 só conhece o número da página, então guardamos o cursor por
+ * (termo, página) e o enviamos quando o usuário rola para a página seguinte.
+ *
+ * Uso:
+ *   const pager = select2Cursor();
+ *   ajax: {
+ *     data: p => pager.params(p, { term: p.term, limit: 10 }),
+ *     processResults: (data, p) => { pager.remember(data, p); return ...; }
+ *   }
+ */
+window.select2Cursor = function () {
+    const cursors = {};
+    const key = (p, page) => `${p.term || ''}|${page}`;
+
+    return {
+        /** Acrescenta `page` e, a partir da 2ª página, o `cursor` conhecido. */
+        params(p, base) {
+            const page = p.page || 1;
+            const cursor = cursors[key(p, page)];
+            base.page = page;
+            if (page > 1 && cursor) base.cursor = cursor;
+            return base;
+        },
+        /** Guarda o cursor devolvido para ser usado na próxima página. */
+        remember(data, p) {
+            const cursor = data && data.pagination && data.pagination.cursor;
+            if (cursor) cursors[key(p, (p.page || 1) + 1)] = cursor;
+        }
+    };
+};
@@ -1,3 +1,134 @@
+from django.contrib.auth.models import Permission
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from fila_cirurgica.models import EspecialidadeAghu, ListaEsperaCirurgica, RegistroAlteracao
+from fila_cirurgica.tests import FilaTestMixin
+
+from .filters import FilaFilter
+
+
+class AuditoriaTests(FilaTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario.user_permissions.add(Permission.objects.get(codename="view_registroalteracao"))
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        for i in range(4):
+            entrada = self.nova_entrada()
+            entrada.observacoes = f"obs {i}"
+            entrada.save()
+        # Empates na data: a ordem (e o cursor) desempata pelo id
+        RegistroAlteracao.objects.filter(pk__in=RegistroAlteracao.objects.values("pk")[:3]).update(
+            data=RegistroAlteracao.objects.order_by("data").first().data)
+
+    def get_api(self, **params):
+        return self.client.get(reverse("portal:auditoria_api"), params)
+
+    def test_keyset_percorre_todos_sem_repetir(self):
+        ids, cursor = [], None
+        while True:
+            params = {"limite": 3}
+            if cursor:
+                params["cursor"] = cursor
+            corpo = self.get_api(**params).json()
+            ids += [r["id"] for r in corpo["resultados"]]
+            cursor = corpo["proximo"]
+            if not cursor:
+                break
+        self.assertEqual(ids, list(RegistroAlteracao.objects.order_by("-data", "-id").values_list("pk", flat=True)))
+
+    def test_filtros(self):
+        corpo = self.get_api(modelo="fila", tipo="~", motivo="").json()
+        self.assertEqual(len(corpo["resultados"]), 4)
+        self.assertTrue(all(r["tipo"] == "~" and r["modelo"] == "fila" for r in corpo["resultados"]))
+
+    def test_parametros_invalidos_sao_400(self):
+        for params in ({"cursor": "nao-e-cursor"}, {"data_min": "ontem"}, {"limite": "x"}, {"modelo": "paciente"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.get_api(**params).status_code, 400)
+
+    def test_pagina_com_cursor_invalido_volta_ao_inicio(self):
+        response = self.client.get(reverse("portal:auditoria"), {"cursor": "nao-e-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["is_primeira"])
+        self.assertEqual(len(response.context["linhas"]), RegistroAlteracao.objects.count())
+
+    def test_sem_permissao(self):
+        self.usuario.user_permissions.clear()
+        self.assertNotEqual(self.get_api().status_code, 200)
+
+
+class FilaHistoryTests(FilaTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario.user_permissions.add(Permission.objects.get(codename="view_listaesperacirurgica"))
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def com_historico(self, alteracoes):
+        entrada = self.nova_entrada()
+        for i in range(alteracoes):
+            entrada.observacoes = f"obs {i}"
+            entrada.save()
+        return entrada
+
+    def get(self, entrada, **params):
+        return self.client.get(reverse("portal:fila_history", args=[entrada.pk]), params)
+
+    def test_mais_recente_primeiro_com_o_diff(self):
+        entrada = self.com_historico(1)
+        entrada.procedimento = self.proc_b
+        entrada.save()
+        linhas = self.get(entrada).context["linhas"]
+        self.assertEqual([linha["tipo"] for linha in linhas], ["Alterado", "Alterado", "Criado"])
+        rotulo = ListaEsperaCirurgica._meta.get_field("procedimento").verbose_name
+        self.assertEqual(linhas[0]["diffs"], [(rotulo, str(self.proc_a), str(self.proc_b))])
+
+    def test_paginado_e_com_consultas_constantes(self):
+        curta, longa = self.com_historico(2), self.com_historico(60)
+        with CaptureQueriesContext(connection) as ctx_curta:
+            self.get(curta)
+        with CaptureQueriesContext(connection) as ctx_longa:
+            response = self.get(longa)
+        self.assertEqual(len(ctx_longa.captured_queries), len(ctx_curta.captured_queries))
+        self.assertEqual(len(response.context["linhas"]), 50)
+        self.assertTrue(response.context["is_paginated"])
+
+        ultima = self.get(longa, page=2).context["linhas"]
+        self.assertEqual(len(ultima), 11)
+        self.assertEqual(ultima[-1]["tipo"], "Criado")
+
+
+class FilaFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            EspecialidadeAghu.objects.create(cod_especialidade=f"t{i}", nome_especialidade=f"Teste {i}")
+
+    def test_so_as_selecionadas_viram_option(self):
+        filtro = FilaFilter({"especialidade": ["t1", "t3"]})
+        self.assertTrue(filtro.is_valid())  # a validação faz o seu próprio IN
+        with CaptureQueriesContext(connection) as ctx:
+            html = str(filtro.form["especialidade"])
+        self.assertEqual(html.count("<option"), 2)
+        self.assertIn('value="t1" selected', html)
+        self.assertIn('value="t3" selected', html)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_sem_selecao_nao_consulta(self):
+        filtro = FilaFilter({})
+        with CaptureQueriesContext(connection) as ctx:
+            html = str(filtro.form["especialidade"])
+        self.assertNotIn("<option", html)
+        self.assertEqual(ctx.captured_queries, [])
+
+    def test_codigo_inexistente_invalida(self):
+        self.assertTrue(FilaFilter({"especialidade": ["t1"]}).is_valid())
+        self.assertFalse(FilaFilter({"especialidade": ["t1", "nao-existe"]}).is_valid())
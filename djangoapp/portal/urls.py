@@ -3,6 +3,8 @@ from django.contrib.auth import views as auth_views
 
 from .views import (
     AihDetailView,
+    AuditoriaJsonView,
+    AuditoriaView,
     DashboardView,
     FilaDeactivateView,
     FilaListView,
@@ -35,4 +37,8 @@ urlpatterns = [
     path("aih/", AihListView.as_view(), name="aih_list"),
     path("aih/nova/", AihCreateView.as_view(), name="aih_create"),
     path("aih/<int:pk>/", AihDetailView.as_view(), name="aih_detail"),
+
+    # Auditoria (alterações de toda a fila e AIHs)
+    path("auditoria/", AuditoriaView.as_view(), name="auditoria"),
+    path("auditoria/api/", AuditoriaJsonView.as_view(), name="auditoria_api"),
 ]
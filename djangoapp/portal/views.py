@@ -1,23 +1,31 @@
 from __future__ import annotations
 
-from datetime import timedelta
+import base64
+from datetime import datetime, timedelta
 from typing import Any, Dict
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin, UserPassesTestMixin
-from django.db.models import Count, Min
+from django.core.paginator import Paginator
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Min, Q
 from django.db.models.functions import TruncMonth
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
-from django.utils.timezone import now, localtime
+from django.urls import reverse, reverse_lazy
+from django.utils.functional import cached_property
+from django.utils.timezone import now
 from django.views.decorators.http import require_GET
-from django.views.generic import CreateView, DetailView, TemplateView, UpdateView, FormView
+from django.views.generic import CreateView, DetailView, TemplateView, UpdateView, FormView, View
 from django_filters.views import FilterView
-from simple_history.utils import update_change_reason
 
-from fila_cirurgica.models import EspecialidadeAghu, ListaEsperaCirurgica, PacienteAghu, ProcedimentoAghu, ProfissionalAghu
-from .filters import FilaFilter
+from fila_cirurgica.api_helpers import FalhaResolucaoAPI
+from fila_cirurgica.auditoria import MODELOS_AUDITADOS
+from fila_cirurgica.remocao import remover_da_fila
+from fila_cirurgica.models import (
+    EspecialidadeAghu, ListaEsperaCirurgica, PacienteAghu, ProcedimentoAghu, ProfissionalAghu, RegistroAlteracao,
+)
+from .filters import AuditoriaFilter, FilaFilter
 from .forms import FilaCreateForm, FilaUpdateForm, FilaDeactivateForm
 from django.shortcuts import render
 
@@ -266,22 +274,20 @@ class FilaCreateView(StaffRequiredMixin, PermissionRequiredMixin, CreateView):
         # Pega o aih_id do formulário validado (cleaned_data)
         aih_id = form.cleaned_data.get('aih_id')
 
+        # Mensagem do histórico: definida antes do save, para já ir no
+        # registro de histórico (e no log de alterações)
+        if aih_id:
+            form.instance._change_reason = f"Criado via Portal a partir da AIH ID: {aih_id}"
+        else:
+            form.instance._change_reason = "Criado via Portal"
+
         # Salva o objeto da Fila no banco
-        obj = form.save(commit=True)
-        
         try:
-            # Lógica para definir a mensagem do histórico
-            if aih_id:
-                reason = f"Criado via Portal a partir da AIH ID: {aih_id}"
-            else:
-                reason = "Criado via Portal"
-            
-            # Chama a função de histórico com a mensagem correta
-            update_change_reason(obj, reason)
-        except Exception:
-            # Não impede a criação se o log de histórico falhar
-            pass 
-        
+            form.save(commit=True)
+        except FalhaResolucaoAPI as e:
+            form.add_error(None, f"Não foi possível consultar o AGHU: {e}")
+            return self.form_invalid(form)
+
         messages.success(self.request, "Entrada criada com sucesso.")
         return redirect(self.success_url)
 
@@ -306,13 +312,10 @@ class FilaUpdateView(StaffRequiredMixin, PermissionRequiredMixin, UpdateView):
         return form
 
     def form_valid(self, form):
-        response = super().form_valid(form)
         motivo = form.cleaned_data.get("motivo_alteracao")
         if motivo:
-            try:
-                update_change_reason(self.object, motivo)
-            except Exception:
-                pass
+            form.instance._change_reason = motivo
+        response = super().form_valid(form)
         messages.success(self.request, "Entrada atualizada com sucesso.")
         return response
 
@@ -325,81 +328,168 @@ class FilaUpdateView(StaffRequiredMixin, PermissionRequiredMixin, UpdateView):
 
 # --------------------- Histórico ---------------------
 class FilaHistoryView(StaffRequiredMixin, PermissionRequiredMixin, TemplateView):
-    """Exibe diffs a partir do django-simple-history."""
+    """
+    Exibe o histórico da entrada a partir do log de alterações
+    (``RegistroAlteracao``), com os diffs já calculados na escrita: uma
+    leitura paginada pelo índice do objeto, mais recente primeiro.
+    """
     permission_required = "fila_cirurgica.view_listaesperacirurgica"
     template_name = "portal/fila_history.html"
-
-    _IGNORE = {"id", "history_id", "history_date", "history_type",
-               "history_user", "history_change_reason"}
-
-    def _to_display(self, field, value):
-        """Formata valor para exibição (choices, FK, bool, datas)."""
-        if value is None:
-            return ""
-        # choices -> rótulo
-        if getattr(field, "choices", None):
-            return dict(field.choices).get(value, value)
-        # FK -> string amigável
-        if getattr(field, "many_to_one", False) and hasattr(field, "remote_field"):
-            return str(value) if value else ""
-        # boolean
-        from django.db.models import BooleanField
-        if isinstance(field, BooleanField):
-            return "Sim" if bool(value) else "Não"
-        # datas
-        from django.db.models import DateTimeField, DateField
-        if isinstance(field, DateTimeField):
-            return localtime(value).strftime("%d/%m/%Y %H:%M") if value else ""
-        if isinstance(field, DateField):
-            return value.strftime("%d/%m/%Y") if value else ""
-        return value
-
-    def _diff_records(self, older, newer):
-        """Retorna [(verbose_name, antes, depois)] apenas dos campos que mudaram."""
-        if not older or not newer:
-            return []
-        model_meta = newer.instance._meta
-        diffs = []
-        for field in model_meta.fields:
-            name = field.name
-            if name in self._IGNORE:
-                continue
-            before = getattr(older, name, None)
-            after = getattr(newer, name, None)
-            if before == after:
-                continue
-            diffs.append((
-                field.verbose_name or name,
-                self._to_display(field, before),
-                self._to_display(field, after),
-            ))
-        return diffs
+    paginate_by = 50
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         obj = get_object_or_404(ListaEsperaCirurgica, pk=self.kwargs.get("pk"))
 
-        # ordem decrescente (mais recente primeiro)
-        history = obj.history.select_related(
-            "history_user").order_by("-history_date")
-
-        linhas = []
-        for idx, h in enumerate(history):
-            older = history[idx + 1] if (idx + 1) < history.count() else None
-            diffs = self._diff_records(older, h)
-            linhas.append({
-                "data": h.history_date,
-                "usuario": getattr(h, "history_user", None),
-                "tipo": {"+": "Criado", "~": "Alterado", "-": "Deletado"}.get(h.history_type, h.history_type),
-                "motivo": getattr(h, "history_change_reason", "") or getattr(h, "change_reason", ""),
-                "diffs": diffs,
-            })
+        registros = RegistroAlteracao.objects.do_objeto(obj).select_related("usuario")
+        paginator = Paginator(registros, self.paginate_by)
+        page = paginator.get_page(self.request.GET.get("page"))
 
         ctx["obj"] = obj
-        ctx["linhas"] = linhas
+        ctx["linhas"] = [
+            {
+                "data": r.data,
+                "usuario": r.usuario,
+                "tipo": r.get_tipo_display(),
+                "motivo": r.motivo,
+                "diffs": r.linhas_diff,
+            }
+            for r in page
+        ]
+        ctx["page_obj"] = page
+        ctx["paginator"] = paginator
+        ctx["is_paginated"] = page.has_other_pages()
+        return ctx
+
+
+# --------------------- Auditoria (todas as alterações) ---------------------
+def _cursor(registro):
+    """Cursor opaco da paginação por keyset: (data, id) do último item da página."""
+    bruto = f"{registro.data.isoformat()}|{registro.pk}"
+    return base64.urlsafe_b64encode(bruto.encode()).decode()
+
+
+def _ler_cursor(cursor):
+    """(data, id) de um cursor; ``ValueError`` se vier adulterado."""
+    try:
+        data, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(data), int(pk)
+    except Exception as exc:
+        raise ValueError("cursor inválido") from exc
+
+
+class AuditoriaMixin:
+    """
+    Feed de alterações de todas as entradas da fila e AIHs, a partir do log
+    (``RegistroAlteracao``). Paginação por keyset em (data, id), mais recente
+    primeiro: cada página é uma leitura pelo índice, sem OFFSET nem COUNT,
+    não importa a profundidade.
+    """
+    permission_required = "fila_cirurgica.view_registroalteracao"
+    paginate_by = 50
+
+    def get_filterset(self):
+        return AuditoriaFilter(
+            self.request.GET,
+            queryset=RegistroAlteracao.objects.select_related("usuario"),
+        )
+
+    def get_pagina(self, filterset, limite, cursor=None):
+        """Até ``limite`` registros depois do cursor e o cursor da próxima página (ou None)."""
+        registros = filterset.qs.order_by("-data", "-id")
+        if cursor:
+            data, pk = _ler_cursor(cursor)
+            registros = registros.filter(Q(data__lt=data) | Q(data=data, id__lt=pk))
+        # um a mais só para saber se há próxima página
+        registros = list(registros[:limite + 1])
+        proximo = _cursor(registros[limite - 1]) if len(registros) > limite else None
+        return registros[:limite], proximo
+
+    def item(self, registro):
+        """Registro do log como dict (JSON e template), com o link do objeto."""
+        modelo = self.modelos_por_ct.get(registro.content_type_id)
+        url = None
+        if modelo == "fila":
+            url = reverse("portal:fila_history", args=[registro.objeto_id])
+        elif modelo == "aih":
+            url = reverse("portal:aih_detail", args=[registro.objeto_id])
+        return {
+            "id": registro.pk,
+            "data": registro.data,
+            "modelo": modelo,
+            "objeto_id": registro.objeto_id,
+            "url": url,
+            "tipo": registro.tipo,
+            "tipo_display": registro.get_tipo_display(),
+            "usuario": registro.usuario.get_username() if registro.usuario else None,
+            "motivo": registro.motivo,
+            "diffs": registro.diffs,
+        }
+
+    @cached_property
+    def modelos_por_ct(self):
+        return {
+            ContentType.objects.get_for_model(model).pk: nome
+            for nome, model in MODELOS_AUDITADOS.items()
+        }
+
+
+class AuditoriaView(AuditoriaMixin, StaffRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """Página de auditoria: alterações recentes de toda a fila e das AIHs, com filtros."""
+    template_name = "portal/auditoria.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        filterset = self.get_filterset()
+        cursor = self.request.GET.get("cursor")
+        try:
+            registros, proximo = self.get_pagina(filterset, self.paginate_by, cursor)
+        except ValueError:
+            messages.error(self.request, "Link de paginação inválido; mostrando as alterações mais recentes.")
+            cursor = None
+            registros, proximo = self.get_pagina(filterset, self.paginate_by)
+
+        # Filtros atuais, sem o cursor, para os links de paginação
+        params = self.request.GET.copy()
+        params.pop("cursor", None)
+
+        ctx["filter"] = filterset
+        ctx["linhas"] = [self.item(r) for r in registros]
+        ctx["proximo"] = proximo
+        ctx["is_primeira"] = not cursor
+        ctx["querystring"] = params.urlencode()
         return ctx
 
 
+class AuditoriaJsonView(AuditoriaMixin, StaffRequiredMixin, PermissionRequiredMixin, View):
+    """
+    Mesmo feed da página de auditoria em JSON. Aceita os mesmos filtros,
+    ``limite`` (padrão 50, máximo 200) e ``cursor`` (o ``proximo`` da
+    resposta anterior).
+    """
+    limite_maximo = 200
+
+    def get(self, request, *args, **kwargs):
+        filterset = self.get_filterset()
+        if not filterset.is_valid():
+            return JsonResponse({"error": filterset.errors.get_json_data()}, status=400)
+        try:
+            limite = min(max(int(request.GET.get("limite", self.paginate_by)), 1), self.limite_maximo)
+        except ValueError:
+            return JsonResponse({"error": "limite inválido"}, status=400)
+        try:
+            registros, proximo = self.get_pagina(filterset, limite, request.GET.get("cursor"))
+        except ValueError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+        resultados = []
+        for registro in registros:
+            item = self.item(registro)
+            item["data"] = item["data"].isoformat()
+            resultados.append(item)
+        return JsonResponse({"resultados": resultados, "proximo": proximo})
+
+
 # --------------------- Remoção (inativação) ---------------------
 class FilaDeactivateView(StaffRequiredMixin, PermissionRequiredMixin, FormView):
     """
@@ -426,14 +516,10 @@ class FilaDeactivateView(StaffRequiredMixin, PermissionRequiredMixin, FormView):
         change_reason = form.cleaned_data["change_reason"]
 
         obj = self.object
-        obj.ativo = False
-        obj.motivo_saida = motivo_value
-        obj.save(update_fields=["ativo", "motivo_saida"])
-
-        try:
-            update_change_reason(obj, change_reason)
-        except Exception:
-            pass
+        remover_da_fila(
+            ListaEsperaCirurgica.objects.filter(pk=obj.pk), motivo_value,
+            change_reason=change_reason, usuario=self.request.user,
+        )
 
         messages.success(self.request, f"{obj} removido da fila com sucesso.")
         return redirect(self.get_success_url())
@@ -460,7 +546,11 @@ class AihCreateView(StaffRequiredMixin, PermissionRequiredMixin, CreateView):
 
     def form_valid(self, form):
         # O método save() do AihCreateForm já lida com a lógica dos _api fields
-        self.object = form.save()
+        try:
+            self.object = form.save()
+        except FalhaResolucaoAPI as e:
+            form.add_error(None, f"Não foi possível consultar o AGHU: {e}")
+            return self.form_invalid(form)
         messages.success(self.request, "AIH criada com sucesso.")
         return redirect(self.get_success_url())
 
@@ -0,0 +1,71 @@
+# app/api/health.py
+"""
+Sondas de saúde da API (fora de /api/v1, para orquestrador e clientes).
+
+- ``/health/live``: o processo responde (não toca no banco).
+- ``/health/ready``: pronto para atender? Traz o estado do pool de conexões
+  (uso, conexões emprestadas, overflow, esperas), a latência de um
+  ``SELECT 1``, o cache HTTP, o catálogo de procedimentos em memória e, no
+  modo mock, a carga dos datasets/índices.
+
+``status`` da prontidão:
+- ``ok``: tudo certo;
+- ``degraded``: atende, mas o pool passou de ``HEALTH_POOL_SATURATION`` ou
+  há requisições esperando conexão; clientes devem adiar o que não é urgente;
+- ``unavailable``: banco fora ou dados mock não carregados → ``503`` com
+  ``Retry-After``.
+"""
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.db import session
+from app.db.mock_service import mock_repository
+from app.repositories.catalogo import catalogo_procedimentos
+
+router = APIRouter()
+
+
+@router.get("/live", summary="Liveness: o processo está de pé")
+async def read_live():
+    return {"status": "ok"}
+
+
+@router.get("/ready", summary="Readiness: banco, pool, cache e dados mock")
+async def read_ready():
+    status = "ok"
+    checks = {}
+
+    if settings.USE_MOCK_DATA:
+        datasets = mock_repository.status()
+        pronto = all(d["loaded"] for d in datasets.values())
+        checks["mock"] = {"ready": pronto, "datasets": datasets}
+        if not pronto:
+            status = "unavailable"
+    else:
+        # Foto do pool antes da sonda (que também pega uma conexão)
+        pool = session.pool_stats.snapshot()
+        try:
+            latencia = await asyncio.wait_for(session.probe(), settings.HEALTH_PROBE_TIMEOUT)
+            checks["db"] = {"ok": True, "latency_ms": round(latencia * 1000, 1)}
+        except Exception as e:
+            checks["db"] = {"ok": False, "error": type(e).__name__}
+            status = "unavailable"
+        checks["pool"] = pool
+        # Só informativo: sem o catálogo, os procedimentos saem do SQL
+        checks["procedimentos_catalogo"] = catalogo_procedimentos.status()
+        saturado = (pool["utilization"] or 0) >= settings.HEALTH_POOL_SATURATION or pool["waiting"] > 0
+        if status == "ok" and saturado:
+            status = "degraded"
+
+    cache = response_cache.stats()
+    checks["cache"] = {"enabled": cache["enabled"], "entries": cache["entries"]}
+
+    corpo = {"status": status, "checks": checks}
+    if status == "unavailable":
+        corpo["retry_after"] = settings.HEALTH_RETRY_AFTER
+        return JSONResponse(corpo, status_code=503, headers={"Retry-After": str(settings.HEALTH_RETRY_AFTER)})
+    return corpo
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import procedimentos, profissionais, especialidades, pacientes
+from app.api.v1.endpoints import procedimentos, profissionais, especialidades, pacientes, admin
 
 api_router = APIRouter()
 
 api_router.include_router(procedimentos.router, prefix="/procedimentos", tags=["Procedimentos"])
 api_router.include_router(profissionais.router, prefix="/profissionais", tags=["Profissionais"])
 api_router.include_router(especialidades.router, prefix="/especialidades", tags=["Especialidades"])
-api_router.include_router(pacientes.router, prefix="/pacientes", tags=["Pacientes"])
\ No newline at end of file
+api_router.include_router(pacientes.router, prefix="/pacientes", tags=["Pacientes"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
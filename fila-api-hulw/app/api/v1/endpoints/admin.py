@@ -0,0 +1,40 @@
+# app/api/v1/endpoints/admin.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+
+from app.core.cache import NAMESPACES, response_cache
+from app.core.config import settings
+
+router = APIRouter()
+
+
+def require_admin(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Com ADMIN_TOKEN configurado, exige o header `X-Admin-Token`; sem ele,
+    libera apenas os hosts de METRICS_ALLOWED_HOSTS.
+    """
+    if settings.ADMIN_TOKEN:
+        if x_admin_token != settings.ADMIN_TOKEN:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+        return
+    allowed = settings.metrics_allowed_hosts
+    if "*" not in allowed and (request.client is None or request.client.host not in allowed):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+
+@router.get("/cache", summary="Estatísticas do cache HTTP", dependencies=[Depends(require_admin)])
+async def read_cache_stats():
+    return response_cache.stats()
+
+
+@router.delete("/cache", summary="Invalida o cache HTTP (todo ou de um recurso)", dependencies=[Depends(require_admin)])
+async def invalidate_cache(namespace: Optional[str] = None):
+    """
+    Sem `namespace`, limpa tudo. Valores aceitos: especialidades,
+    procedimentos, profissionais, pacientes. Só vale para o processo que
+    atendeu a chamada (com vários workers, os outros esperam o TTL).
+    """
+    if namespace is not None and namespace not in NAMESPACES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Namespace inválido")
+    return {"namespace": namespace, "removidas": response_cache.invalidate(namespace)}
@@ -1,71 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import text, Connection
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
-from app.db.session import get_db_connection
+from app.core.export import NDJSON_MEDIA_TYPE, export_response
+from app.core.pagination import finish_page
+from app.core.projection import FIELDS_DESCRIPTION, resolve_fields
+from app.core.serialization import fast_item_response, fast_list_response
+from app.repositories import CatalogRepository, get_repository
 from app.schemas.especialidade import Especialidade
-from app.core.config import settings
-from app.db import mock_service
-
-from typing import List, Optional, Generator 
 
 router = APIRouter()
 
-# --- NOVA DEPENDÊNCIA INTELIGENTE ---
-def db_provider() -> Generator[Optional[Connection], None, None]:
-    """
-    Fornece uma conexão com o banco de dados somente se os dados mock não estiverem em uso.
-    """
-    if not settings.USE_MOCK_DATA:
-        yield from get_db_connection()
-    else:
-        yield None
-
 @router.get("/", response_model=List[Especialidade], summary="Lista ou busca especialidades com paginação")
-def read_especialidades(
+async def read_especialidades(
+    response: Response,
     term: Optional[str] = None, q: Optional[str] = None,
     page: Optional[int] = None, skip: int = 0, limit: int = 25,
-    # --- CORREÇÃO APLICADA AQUI ---
-    conn: Optional[Connection] = Depends(db_provider)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    repo: CatalogRepository = Depends(get_repository("especialidades")),
 ):
+    campos = resolve_fields(fields, Especialidade, repo)
     search_query = term or q
     if page and page > 0:
         skip = (page - 1) * limit
 
-    if settings.USE_MOCK_DATA:
-        results = mock_service.get_mock_data(
-            filename="especialidades.json",
-            term=search_query,
-            key_fields=["NOME_ESPECIALIDADE", "COD_ESPECIALIDADE"],
-            skip=skip,
-            limit=limit
-        )
-    else:
-        base_query = """
-            SELECT esp.seq AS "COD_ESPECIALIDADE", esp.nome_especialidade AS "NOME_ESPECIALIDADE"
-            FROM agh.agh_especialidades esp WHERE esp.ind_situacao = 'A'
-        """
-        params = {"skip": skip, "limit": limit}
-        if search_query:
-            base_query += " AND (esp.nome_especialidade ILIKE :search_term OR CAST(esp.seq AS TEXT) ILIKE :search_term)"
-            params["search_term"] = f"%{search_query}%"
-        final_query = text(base_query + " ORDER BY esp.nome_especialidade OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY")
-        results = conn.execute(final_query, params).fetchall()
+    results = await repo.search(search_query, cursor=cursor, skip=skip, limit=limit, fields=campos)
+    rows = finish_page(results, limit, repo.nome_key, repo.pk_key, response)
+    # Linhas do nosso SQL/mock: sem revalidar cada uma contra o schema
+    return fast_list_response(rows, Especialidade, response, campos)
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+    summary="Exporta todas as especialidades ativas (NDJSON)",
+)
+async def export_especialidades(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    repo: CatalogRepository = Depends(get_repository("especialidades")),
+):
+    """
+    Um item JSON por linha, ordenados pelo código, em stream (memória
+    constante dos dois lados). Para a sincronização do Django.
+    """
+    campos = resolve_fields(fields, Especialidade, repo)
+    return export_response(repo, Especialidade, campos)
 
-    return results
 
 @router.get("/{cod_especialidade}", response_model=Especialidade, summary="Busca uma especialidade pelo código")
-def read_especialidade_by_id(
-    cod_especialidade: int, 
-    # --- CORREÇÃO APLICADA AQUI ---
-    conn: Optional[Connection] = Depends(db_provider)
+async def read_especialidade_by_id(
+    cod_especialidade: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    repo: CatalogRepository = Depends(get_repository("especialidades")),
 ):
-    if settings.USE_MOCK_DATA:
-        result = mock_service.get_mock_data_by_id("especialidades.json", cod_especialidade, "COD_ESPECIALIDADE")
-    else:
-        query = text("SELECT esp.seq AS \"COD_ESPECIALIDADE\", esp.nome_especialidade AS \"NOME_ESPECIALIDADE\" FROM agh.agh_especialidades esp WHERE esp.ind_situacao = 'A' AND esp.seq = :cod")
-        result = conn.execute(query, {"cod": cod_especialidade}).fetchone()
-    
+    campos = resolve_fields(fields, Especialidade, repo)
+    result = await repo.get(cod_especialidade, fields=campos)
     if result is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Especialidade não encontrada ou inativa")
-    return result
\ No newline at end of file
+    return fast_item_response(result, Especialidade, campos)
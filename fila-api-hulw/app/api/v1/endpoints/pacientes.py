@@ -1,76 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import text, Connection
-from typing import List, Optional, Generator
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
 
-from app.db.session import get_db_connection
+from app.core.pagination import finish_page
+from app.core.projection import FIELDS_DESCRIPTION, resolve_fields
+from app.core.serialization import fast_item_response, fast_list_response
+from app.repositories import CatalogRepository, get_repository
 from app.schemas.paciente import Paciente
-from app.core.config import settings
-from app.db import mock_service
 
 router = APIRouter()
 
-# --- DEPENDÊNCIA INTELIGENTE ---
-def db_provider() -> Generator[Optional[Connection], None, None]:
-    """
-    Fornece uma conexão com o banco de dados somente se os dados mock não estiverem em uso.
-    """
-    if not settings.USE_MOCK_DATA:
-        yield from get_db_connection()
-    else:
-        yield None
-
 @router.get("/", response_model=List[Paciente], summary="Lista ou busca pacientes com paginação")
-def read_pacientes(
+async def read_pacientes(
+    response: Response,
     term: Optional[str] = None, q: Optional[str] = None,
     page: Optional[int] = None, skip: int = 0, limit: int = 25,
-    conn: Optional[Connection] = Depends(db_provider)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    repo: CatalogRepository = Depends(get_repository("pacientes")),
 ):
+    """
+    Ordenado por nome + prontuário. Para a próxima página, envie em `cursor`
+    o valor do header `X-Next-Cursor` (ausente na última página).
+    `page`/`skip` continuam aceitos, mas ficam lentos em páginas profundas.
+    """
+    campos = resolve_fields(fields, Paciente, repo)
     search_query = term or q
     if page and page > 0:
         skip = (page - 1) * limit
 
-    if settings.USE_MOCK_DATA:
-        results = mock_service.get_mock_data(
-            filename="pacientes.json",
-            term=search_query,
-            key_fields=["NOME_PACIENTE", "PRONTUARIO_PAC"],
-            skip=skip,
-            limit=limit
-        )
-    else:
-        base_query = """
-            SELECT pac.nome AS "NOME_PACIENTE", pac.prontuario AS "PRONTUARIO_PAC",
-                   pac.ddd_fone_residencial AS "DDD_FONE_RESIDENCIAL", pac.fone_residencial AS "FONE_RESIDENCIAL",
-                   pac.ddd_fone_recado AS "DDD_FONE_RECADO", pac.fone_recado AS "FONE_RECADO"
-            FROM agh.aip_pacientes pac
-        """
-        params = {"skip": skip, "limit": limit}
-        if search_query:
-            base_query += " WHERE (pac.nome ILIKE :search_term OR CAST(pac.prontuario AS TEXT) ILIKE :search_term)"
-            params["search_term"] = f"%{search_query}%"
-        final_query = text(base_query + " ORDER BY pac.nome OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY")
-        results = conn.execute(final_query, params).fetchall()
-
-    return results
+    results = await repo.search(search_query, cursor=cursor, skip=skip, limit=limit, fields=campos)
+    rows = finish_page(results, limit, repo.nome_key, repo.pk_key, response)
+    # Linhas do nosso SQL/mock: sem revalidar cada uma contra o schema
+    return fast_list_response(rows, Paciente, response, campos)
 
 @router.get("/{prontuario}", response_model=Paciente, summary="Busca um paciente pelo prontuário")
-def read_paciente_by_id(
-    prontuario: int, 
-    conn: Optional[Connection] = Depends(db_provider)
+async def read_paciente_by_id(
+    prontuario: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    repo: CatalogRepository = Depends(get_repository("pacientes")),
 ):
-    if settings.USE_MOCK_DATA:
-        result = mock_service.get_mock_data_by_id("pacientes.json", prontuario, "PRONTUARIO_PAC")
-    else:
-        query = text("""
-            SELECT pac.nome AS "NOME_PACIENTE", pac.prontuario AS "PRONTUARIO_PAC",
-                   pac.ddd_fone_residencial AS "DDD_FONE_RESIDENCIAL", pac.fone_residencial AS "FONE_RESIDENCIAL",
-                   pac.ddd_fone_recado AS "DDD_FONE_RECADO", pac.fone_recado AS "FONE_RECADO"
-            FROM agh.aip_pacientes pac
-            WHERE pac.prontuario = :prontuario
-        """)
-        result = conn.execute(query, {"prontuario": prontuario}).fetchone()
-    
+    campos = resolve_fields(fields, Paciente, repo)
+    result = await repo.get(prontuario, fields=campos)
     if result is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Paciente não encontrado")
 
-    return result
+    return fast_item_response(result, Paciente, campos)
@@ -0,0 +1,224 @@
+# app/core/cache.py
+"""
+Cache HTTP em memória (por processo) das respostas de catálogo.
+
+- Listagens e consultas por código de especialidades, procedimentos e
+  profissionais, e a consulta de paciente por prontuário, ficam guardadas
+  por um TTL (``CACHE_TTL_CATALOGO`` / ``CACHE_TTL_PACIENTE``).
+- Toda resposta cacheável sai com ``ETag`` e ``Cache-Control``; um
+  ``If-None-Match`` com o mesmo ETag recebe ``304`` sem corpo.
+- Estatísticas por namespace e invalidação ficam em ``/api/v1/admin/cache``.
+
+É um middleware ASGI puro (como o ``TracingMiddleware``): só respostas
+``200`` de ``GET`` entram no cache, com corpo e headers (inclusive o
+``X-Next-Cursor`` da paginação).
+
+Limite: o cache e a invalidação são por processo. Com mais de um worker
+(``uvicorn --workers N``, gunicorn), o ``DELETE /api/v1/admin/cache`` só
+limpa o worker que atendeu a chamada; os outros continuam servindo a
+resposta antiga (e o mesmo ETag) até o TTL vencer. A imagem roda um único
+worker; para escalar em processos, use TTLs curtos ou desligue o cache
+(``CACHE_ENABLED=false``).
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from app.core.config import settings
+
+# Headers da resposta original que são guardados junto com o corpo
+_STORED_HEADERS = {b"content-type", b"x-next-cursor"}
+
+
+class _Entrada:
+    __slots__ = ("expira", "headers", "body", "etag")
+
+    def __init__(self, expira: float, headers: List[Tuple[bytes, bytes]], body: bytes, etag: str):
+        self.expira = expira
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+
+
+class ResponseCache:
+    """Dicionário LRU com TTL por entrada e contadores por namespace."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._dados: "OrderedDict[tuple, _Entrada]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _conta(self, namespace: str, campo: str) -> None:
+        stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "stores": 0, "evictions": 0})
+        stats[campo] += 1
+
+    def get(self, key: tuple) -> Optional[_Entrada]:
+        namespace = key[0]
+        with self._lock:
+            entrada = self._dados.get(key)
+            if entrada is not None and entrada.expira <= time.monotonic():
+                del self._dados[key]
+                entrada = None
+            if entrada is None:
+                self._conta(namespace, "misses")
+                return None
+            self._dados.move_to_end(key)
+            self._conta(namespace, "hits")
+            return entrada
+
+    def set(self, key: tuple, entrada: _Entrada) -> None:
+        with self._lock:
+            self._dados[key] = entrada
+            self._dados.move_to_end(key)
+            self._conta(key[0], "stores")
+            while len(self._dados) > self.max_entries:
+                antiga, _ = self._dados.popitem(last=False)
+                self._conta(antiga[0], "evictions")
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Remove as entradas do namespace (ou todas) e retorna quantas saíram."""
+        with self._lock:
+            if namespace is None:
+                removidas = len(self._dados)
+                self._dados.clear()
+                return removidas
+            chaves = [k for k in self._dados if k[0] == namespace]
+            for k in chaves:
+                del self._dados[k]
+            return len(chaves)
+
+    def stats(self) -> dict:
+        with self._lock:
+            por_namespace: Dict[str, dict] = {}
+            for key, entrada in self._dados.items():
+                ns = por_namespace.setdefault(key[0], {"entries": 0, "bytes": 0})
+                ns["entries"] += 1
+                ns["bytes"] += len(entrada.body)
+            for namespace, contadores in self._stats.items():
+                ns = por_namespace.setdefault(namespace, {"entries": 0, "bytes": 0})
+                ns.update(contadores)
+                total = contadores["hits"] + contadores["misses"]
+                ns["hit_ratio"] = round(contadores["hits"] / total, 4) if total else None
+            return {
+                "enabled": settings.CACHE_ENABLED,
+                "max_entries": self.max_entries,
+                "entries": len(self._dados),
+                "namespaces": por_namespace,
+            }
+
+
+response_cache = ResponseCache(settings.CACHE_MAX_ENTRIES)
+
+
+# (regex do path, namespace, TTL em segundos, Cache-Control "public"?)
+# Pacientes: só a consulta por prontuário (a busca textual varia demais)
+# e com Cache-Control "private", por ser dado de paciente.
+CACHE_RULES: List[Tuple[Pattern, str, int, bool]] = []
+for _recurso in ("especialidades", "procedimentos", "profissionais"):
+    CACHE_RULES += [
+        (re.compile(rf"^/api/v1/{_recurso}/?$"), _recurso, settings.CACHE_TTL_CATALOGO, True),
+        (re.compile(rf"^/api/v1/{_recurso}/\d+/?$"), _recurso, settings.CACHE_TTL_CATALOGO, True),
+    ]
+CACHE_RULES += [
+    (re.compile(r"^/api/v1/procedimentos/pares-especialidade/?$"), "procedimentos", settings.CACHE_TTL_CATALOGO, True),
+    (re.compile(r"^/api/v1/pacientes/\d+/?$"), "pacientes", settings.CACHE_TTL_PACIENTE, False),
+]
+
+NAMESPACES = ("especialidades", "procedimentos", "profissionais", "pacientes")
+
+
+def _regra(path: str):
+    for padrao, namespace, ttl, publico in CACHE_RULES:
+        if padrao.match(path):
+            return namespace, ttl, publico
+    return None
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _etag_confere(if_none_match: Optional[bytes], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    valor = if_none_match.decode("latin-1")
+    if valor.strip() == "*":
+        return True
+    candidatos = [v.strip() for v in valor.split(",")]
+    return any(c == etag or c == f"W/{etag}" for c in candidatos)
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI: serve do cache, grava respostas 200 e responde 304."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") != "GET" or not settings.CACHE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        regra = _regra(scope["path"])
+        if regra is None:
+            await self.app(scope, receive, send)
+            return
+        namespace, ttl, publico = regra
+        cache_control = f"{'public' if publico else 'private'}, max-age={ttl}".encode()
+
+        if_none_match = None
+        for name, value in scope.get("headers", []):
+            if name == b"if-none-match":
+                if_none_match = value
+                break
+
+        # Query string normalizada: a ordem dos parâmetros não muda a chave
+        query = "&".join(sorted(scope.get("query_string", b"").decode("latin-1").split("&")))
+        key = (namespace, scope["path"].rstrip("/"), query)
+
+        entrada = response_cache.get(key)
+        if entrada is not None:
+            await self._enviar(send, entrada, cache_control, if_none_match, hit=True)
+            return
+
+        inicio = {}
+        partes = []
+
+        async def capturar(message):
+            if message["type"] == "http.response.start":
+                inicio.update(message)
+                return
+            partes.append(message.get("body", b""))
+            if message.get("more_body"):
+                return
+            body = b"".join(partes)
+            if inicio.get("status") != 200:
+                await send(inicio)
+                await send({"type": "http.response.body", "body": body})
+                return
+            headers = [(n, v) for n, v in inicio.get("headers", []) if n.lower() in _STORED_HEADERS]
+            nova = _Entrada(time.monotonic() + ttl, headers, body, _etag(body))
+            response_cache.set(key, nova)
+            await self._enviar(send, nova, cache_control, if_none_match, hit=False)
+
+        await self.app(scope, receive, capturar)
+
+    async def _enviar(self, send, entrada: _Entrada, cache_control: bytes,
+                      if_none_match: Optional[bytes], hit: bool):
+        headers = [
+            (b"etag", entrada.etag.encode()),
+            (b"cache-control", cache_control),
+            (b"x-cache", b"HIT" if hit else b"MISS"),
+        ]
+        if _etag_confere(if_none_match, entrada.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers += entrada.headers
+        headers.append((b"content-length", str(len(entrada.body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": entrada.body})
@@ -10,8 +10,54 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
 
+    # Pool de conexões (engine assíncrona, ver app/db/session.py)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 5.0       # segundos esperando uma conexão livre
+    DB_POOL_RECYCLE: int = 1800        # segundos até reciclar uma conexão
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+
+    # Exportações NDJSON (/api/v1/<recurso>/export): linhas por ida ao cursor
+    # do servidor e timeout próprio, já que a consulta percorre a tabela toda
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_STATEMENT_TIMEOUT_MS: int = 300000
+
+    # Catálogo de procedimentos em memória (app/repositories/catalogo.py):
+    # intervalo (s) entre as recargas. 0 = desligado, tudo direto no SQL
+    PROCEDIMENTOS_CATALOGO_REFRESH: int = 300
+
+    # URL assíncrona alternativa ao AGHU, ex.: a réplica local gerada por
+    # build_local_aghu.py ("sqlite+aiosqlite:///./aghu_local.db"). Vazio = Postgres acima.
+    AGHU_DATABASE_URL: str = ""
+
     # A variável pode não existir, então definimos um valor padrão `False`
     USE_MOCK_DATA: bool = False
+    # Diretório dos dados mock (vazio = app/db/mock_data). Aceita .json ou .jsonl
+    MOCK_DATA_DIR: str = ""
+
+    # Cache HTTP em memória dos catálogos (app/core/cache.py). Por processo:
+    # com vários workers, a invalidação só vale para um deles (ver cache.py)
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_CATALOGO: int = 600      # especialidades, procedimentos, profissionais
+    CACHE_TTL_PACIENTE: int = 60       # paciente por prontuário
+    CACHE_MAX_ENTRIES: int = 5000
+
+    # /health/ready: timeout do SELECT 1 e utilização do pool (0-1) a partir
+    # da qual o serviço se declara "degraded" (clientes devem aliviar a carga)
+    HEALTH_PROBE_TIMEOUT: float = 1.0
+    HEALTH_POOL_SATURATION: float = 0.8
+    HEALTH_RETRY_AFTER: int = 5        # segundos sugeridos no Retry-After do 503
+
+    # Token exigido (header X-Admin-Token) nos endpoints /api/v1/admin/*.
+    # Vazio = liberados apenas para METRICS_ALLOWED_HOSTS.
+    ADMIN_TOKEN: str = ""
+
+    # Hosts autorizados a ler /metrics (separados por vírgula; "*" libera todos)
+    METRICS_ALLOWED_HOSTS: str = "127.0.0.1,::1"
+
+    @property
+    def metrics_allowed_hosts(self) -> list:
+        return [h.strip() for h in self.METRICS_ALLOWED_HOSTS.split(",") if h.strip()]
 
     @property
     def DATABASE_URL(self) -> str:
@@ -28,6 +74,13 @@ class Settings(BaseSettings):
             f"{self.POSTGRES_DB}"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """Mesma URL, com o driver assíncrono (asyncpg) usado pela API."""
+        if self.AGHU_DATABASE_URL:
+            return self.AGHU_DATABASE_URL
+        return self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
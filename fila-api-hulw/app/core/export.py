@@ -0,0 +1,28 @@
+# app/core/export.py
+"""
+Exportação completa dos catálogos em NDJSON (``GET /api/v1/<recurso>/export``).
+
+Uma linha JSON por item, ordenadas pela chave, enviadas conforme os lotes
+saem do cursor do servidor (``EXPORT_BATCH_SIZE`` linhas por vez): nem a
+API nem o cliente precisam ter o catálogo inteiro em memória.
+
+É sempre a carga completa: as tabelas do AGHU lidas aqui não têm data de
+alteração para uma exportação incremental.
+"""
+from typing import Sequence, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.serialization import dumps, rows_to_dicts
+from app.repositories.base import CatalogRepository
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def export_response(repo: CatalogRepository, schema: Type[BaseModel], campos: Sequence[str]) -> StreamingResponse:
+    async def linhas():
+        async for lote in repo.export(fields=campos):
+            yield b"".join(dumps(item) + b"\n" for item in rows_to_dicts(lote, schema, campos))
+
+    return StreamingResponse(linhas(), media_type=NDJSON_MEDIA_TYPE)
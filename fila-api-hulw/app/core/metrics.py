@@ -0,0 +1,156 @@
+# app/core/metrics.py
+"""
+Métricas da API no formato texto do Prometheus (``GET /metrics``), sem
+biblioteca externa: contadores, gauges e histogramas simples, com rótulos,
+thread-safe e só em memória (por processo).
+
+Séries expostas:
+- ``fila_api_http_requests_total{route,method,status}``
+- ``fila_api_http_request_duration_seconds{route,method}`` (histograma)
+- ``fila_api_http_response_size_bytes{route,method}`` (histograma)
+- ``fila_api_http_requests_in_flight``
+- ``fila_api_db_query_duration_seconds{query}`` (histograma, por nome lógico
+  da consulta, ex.: ``pacientes_search``, ``procedimentos_by_especialidade``)
+- ``fila_api_db_query_errors_total{query}``
+- ``fila_api_db_pool_*`` (estado do pool no momento da coleta)
+"""
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+REGISTRY: List["_Metric"] = []
+# Funções chamadas na coleta que devolvem linhas prontas (ex.: estado do pool)
+COLLECTORS: List[Callable[[], List[str]]] = []
+
+
+def _escape(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple, object] = {}
+        REGISTRY.append(self)
+
+    def _labels(self, valores: Tuple, extra: str = "") -> str:
+        partes = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, valores)]
+        if extra:
+            partes.append(extra)
+        return "{" + ",".join(partes) + "}" if partes else ""
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: Tuple = (), valor: float = 1) -> None:
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + valor
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = dict(self._series)
+        if not series and not self.labelnames:
+            series = {(): 0}
+        return self._header() + [f"{self.name}{self._labels(k)} {v}" for k, v in sorted(series.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple = (), valor: float = 1) -> None:
+        self.inc(labels, -valor)
+
+
+class Histogram(_Metric):
+    """Histograma cumulativo por conjunto de rótulos."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: Tuple, valor: float) -> None:
+        with self._lock:
+            serie = self._series.get(labels)
+            if serie is None:
+                serie = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = serie[0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            serie[1] += valor
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = {k: (list(v[0]), v[1]) for k, v in self._series.items()}
+        lines = self._header()
+        for labels, (counts, soma) in sorted(series.items()):
+            acumulado = 0
+            for limite, c in zip(self.buckets, counts):
+                acumulado += c
+                le = self._labels(labels, f'le="{limite}"')
+                lines.append(f"{self.name}_bucket{le} {acumulado}")
+            acumulado += counts[-1]
+            le = self._labels(labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {acumulado}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {soma:.6f}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {acumulado}")
+        return lines
+
+
+def render() -> str:
+    """Todas as métricas registradas, no formato texto do Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collector in COLLECTORS:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# --------------------- HTTP ---------------------
+
+request_latency = Histogram(
+    "fila_api_http_request_duration_seconds", "Latência das requisições por rota, em segundos.",
+    ("route", "method"),
+)
+request_count = Counter(
+    "fila_api_http_requests_total", "Requisições atendidas por rota, método e status.",
+    ("route", "method", "status"),
+)
+response_size = Histogram(
+    "fila_api_http_response_size_bytes", "Tamanho do corpo das respostas por rota, em bytes.",
+    ("route", "method"), buckets=SIZE_BUCKETS,
+)
+requests_in_flight = Gauge(
+    "fila_api_http_requests_in_flight", "Requisições em andamento.",
+)
+
+# --------------------- Banco ---------------------
+
+db_query_duration = Histogram(
+    "fila_api_db_query_duration_seconds", "Duração das consultas ao AGHU por nome lógico, em segundos.",
+    ("query",), buckets=DB_BUCKETS,
+)
+db_query_errors = Counter(
+    "fila_api_db_query_errors_total", "Consultas ao AGHU que falharam, por nome lógico.",
+    ("query",),
+)
@@ -0,0 +1,101 @@
+# app/core/pagination.py
+"""
+Paginação por cursor (keyset) das listagens.
+
+A ordenação é sempre (nome, chave primária). O cursor é opaco para o
+cliente: guarda os valores da última linha da página, codificados em
+base64, e a próxima página começa logo depois deles
+(``WHERE (nome, pk) > (:cursor_nome, :cursor_pk)``), sem OFFSET.
+
+O cursor da próxima página vai no header ``X-Next-Cursor``; o corpo da
+resposta continua sendo a lista de itens. Sem o header, não há mais páginas.
+"""
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(nome: Any, pk: Any) -> str:
+    raw = json.dumps([nome, pk], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], int]:
+    """
+    (nome, pk) do cursor. Qualquer coisa fora do formato gerado por
+    ``encode_cursor`` (um par ``[str | None, int]``) é 400, e não um erro de
+    comparação lá na frente.
+    """
+    invalido = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        valor = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise invalido
+    if not isinstance(valor, list) or len(valor) != 2:
+        raise invalido
+    nome, pk = valor
+    if not (nome is None or isinstance(nome, str)) or not isinstance(pk, int) or isinstance(pk, bool):
+        raise invalido
+    return nome, pk
+
+
+def keyset_params(cursor: Optional[str], skip: int, limit: int) -> dict:
+    """
+    Parâmetros SQL da página: ``limit_mais_um`` (uma linha a mais para saber
+    se há próxima página), ``skip`` e, com cursor, ``cursor_nome``/``cursor_pk``.
+    """
+    params = {"limit_mais_um": limit + 1, "skip": 0 if cursor else skip}
+    if cursor:
+        params["cursor_nome"], params["cursor_pk"] = decode_cursor(cursor)
+    return params
+
+
+def finish_page(rows: Sequence, limit: int, nome_key: str, pk_key: str,
+                response: Response) -> List:
+    """
+    Corta a linha extra e, se ela existir, publica o cursor da próxima
+    página no header da resposta.
+    """
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        ultima = rows[-1]
+        ultima = ultima._mapping if hasattr(ultima, "_mapping") else ultima
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(ultima[nome_key] or "", ultima[pk_key])
+    return rows
+
+
+def keyset_sql(nome_expr: str, pk_expr: str, cursor: Optional[str]) -> Tuple[str, str]:
+    """
+    Trechos SQL da página: (condição extra para o WHERE, ORDER BY + limite).
+    A condição vem vazia quando não há cursor.
+
+    O nome entra como ``COALESCE(nome, '')`` na ordenação e na comparação,
+    igual ao que vai no cursor (``finish_page``): com NULL, a comparação de
+    tuplas não bate com o ORDER BY e a página pula ou repete linhas.
+    """
+    nome_expr = f"COALESCE({nome_expr}, '')"
+    where = f" AND ({nome_expr}, {pk_expr}) > (:cursor_nome, :cursor_pk)" if cursor else ""
+    # LIMIT/OFFSET (e não FETCH NEXT) para o mesmo SQL rodar na réplica SQLite
+    order = f" ORDER BY {nome_expr}, {pk_expr} LIMIT :limit_mais_um OFFSET :skip"
+    return where, order
+
+
+def keyset_slice(items: Sequence[dict], nome_key: str, pk_key: str,
+                 cursor: Optional[str], skip: int, limit: int) -> List[dict]:
+    """Equivalente em memória (dados mock): ordena e devolve até ``limit + 1`` itens."""
+    def chave(item):
+        return (item.get(nome_key) or "", item.get(pk_key))
+
+    ordenados = sorted(items, key=chave)
+    if cursor:
+        nome, pk = decode_cursor(cursor)
+        inicio = (nome or "", pk)
+        ordenados = [item for item in ordenados if chave(item) > inicio]
+        skip = 0
+    return ordenados[skip: skip + limit + 1]
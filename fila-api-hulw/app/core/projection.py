@@ -0,0 +1,58 @@
+# app/core/projection.py
+"""
+Projeção de campos (``?fields=``) dos endpoints.
+
+``fields`` é uma lista separada por vírgulas de campos do schema e/ou perfis:
+
+- ``autocomplete``: só a chave e o nome (o que o Select2 do Django mostra);
+- ``full``: todos os campos do schema (o padrão, sem ``fields``).
+
+Ex.: ``/pacientes/?term=maria&fields=autocomplete`` ou
+``/pacientes/?fields=autocomplete,DDD_FONE_RECADO,FONE_RECADO``.
+
+A projeção vale para a resposta e para o SQL: os repositórios só selecionam
+as colunas pedidas (sempre com nome e chave, que o cursor usa).
+"""
+from typing import Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from app.repositories.base import CatalogRepository
+
+PERFIS = ("autocomplete", "full")
+
+FIELDS_DESCRIPTION = (
+    "Campos da resposta, separados por vírgula: nomes do schema e/ou os perfis "
+    "`autocomplete` (chave + nome) e `full` (todos, o padrão)."
+)
+
+
+def resolve_fields(fields: Optional[str], schema: Type[BaseModel],
+                   repo: CatalogRepository) -> Tuple[str, ...]:
+    """
+    Campos pedidos em ``fields``, na ordem do schema. Sem ``fields``, todos.
+    Nome desconhecido → 400.
+    """
+    todos = tuple(schema.model_fields)
+    if not fields:
+        return todos
+
+    escolhidos = set()
+    for nome in fields.split(","):
+        nome = nome.strip()
+        if not nome:
+            continue
+        if nome == "full":
+            escolhidos.update(todos)
+        elif nome == "autocomplete":
+            escolhidos.update((repo.pk_key, repo.nome_key))
+        elif nome in todos:
+            escolhidos.add(nome)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campo desconhecido em fields: '{nome}'. "
+                       f"Válidos: {', '.join(PERFIS + todos)}",
+            )
+    return tuple(c for c in todos if c in escolhidos) or todos
@@ -0,0 +1,100 @@
+# app/core/serialization.py
+"""
+Caminho rápido de serialização das listagens.
+
+Por padrão o FastAPI valida cada linha contra o ``response_model`` (pydantic),
+converte o resultado com ``jsonable_encoder`` e só então gera o JSON. Para as
+listagens, que vêm do nosso próprio SQL (ou do mock) com tipos já corretos,
+isso é trabalho repetido. Aqui a linha vira ``dict`` direto (só com os campos
+do schema) e é codificada de uma vez, com ``orjson`` quando instalado.
+
+O ``response_model`` continua nos decorators para a documentação (OpenAPI).
+Benchmark: ``python bench_serialization.py``.
+"""
+import datetime
+import decimal
+import json
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.core.tracing import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+def _default(obj: Any):
+    if isinstance(obj, (datetime.date, datetime.datetime, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    raise TypeError(f"Tipo não serializável em JSON: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto em bytes (orjson, ou json da stdlib com a mesma saída)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def rows_to_dicts(rows: Iterable, schema: Type[BaseModel],
+                  campos: Optional[Sequence[str]] = None) -> List[dict]:
+    """
+    ``Row`` do SQLAlchemy (ou ``dict`` do mock) → ``dict`` só com os campos
+    do schema, na ordem dele (o mesmo recorte que o ``response_model`` faz).
+    Com ``campos`` (ver ``app/core/projection.py``), só esses.
+    """
+    campos = tuple(campos or schema.model_fields)
+    rows = list(rows)
+    if not rows:
+        return []
+    if hasattr(rows[0], "_fields"):
+        # Row: posições das colunas calculadas uma vez, acesso por índice na tupla
+        fields = rows[0]._fields
+        posicoes = [fields.index(c) if c in fields else None for c in campos]
+        if None not in posicoes:
+            return [dict(zip(campos, [row[i] for i in posicoes])) for row in rows]
+        return [{c: (row[i] if i is not None else None) for c, i in zip(campos, posicoes)} for row in rows]
+    return [{c: row.get(c) for c in campos} for row in rows]
+
+
+class FastJSONResponse(Response):
+    """Resposta JSON codificada por ``dumps`` (tempo medido na fase `json`)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with timed("json"):
+            return dumps(content)
+
+
+def fast_list_response(rows: Iterable, schema: Type[BaseModel], response: Response,
+                       campos: Optional[Sequence[str]] = None) -> FastJSONResponse:
+    """
+    Monta a resposta da listagem sem revalidar as linhas. Os headers já
+    definidos em ``response`` (ex.: ``X-Next-Cursor``) são copiados, porque o
+    FastAPI descarta o ``response`` injetado quando o endpoint devolve uma
+    ``Response`` pronta.
+    """
+    with timed("json"):
+        content = rows_to_dicts(rows, schema, campos)
+    resposta = FastJSONResponse(content)
+    for nome, valor in response.headers.items():
+        if nome not in ("content-length", "content-type"):
+            resposta.headers[nome] = valor
+    return resposta
+
+
+def fast_item_response(row: Mapping, schema: Type[BaseModel],
+                       campos: Optional[Sequence[str]] = None) -> FastJSONResponse:
+    """Mesmo recorte de ``fast_list_response`` para os endpoints por código."""
+    with timed("json"):
+        content = rows_to_dicts([row], schema, campos)[0]
+    return FastJSONResponse(content)
@@ -0,0 +1,73 @@
+# app/core/singleflight.py
+"""
+Coalescência de chamadas idênticas em andamento ("single-flight").
+
+Enquanto uma consulta com a mesma chave estiver em execução, novos
+chamadores esperam por ela e recebem o mesmo resultado (ou a mesma
+exceção) em vez de disparar outra ida ao banco. Não há cache: assim que a
+chamada termina, a chave é liberada.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Chamada:
+    __slots__ = ("evento", "resultado", "erro")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chamadas: Dict[Hashable, _Chamada] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            chamada = self._chamadas.get(key)
+            lider = chamada is None
+            if lider:
+                chamada = _Chamada()
+                self._chamadas[key] = chamada
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = fn()
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                self._chamadas.pop(key, None)
+            chamada.evento.set()
+        return chamada.resultado
+
+
+class AsyncSingleFlight:
+    """Mesma ideia para corrotinas, dentro do event loop do uvicorn."""
+
+    def __init__(self):
+        self._tarefas: Dict[Hashable, "asyncio.Task"] = {}
+
+    async def do(self, key: Hashable, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        tarefa = self._tarefas.get(key)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(coro_fn())
+            self._tarefas[key] = tarefa
+            tarefa.add_done_callback(lambda t: self._liberar(key, t))
+        # shield: se um chamador for cancelado (cliente desconectou), a
+        # consulta continua para os demais que esperam o mesmo resultado
+        return await asyncio.shield(tarefa)
+
+    def _liberar(self, key: Hashable, tarefa: "asyncio.Task") -> None:
+        if self._tarefas.get(key) is tarefa:
+            del self._tarefas[key]
@@ -0,0 +1,142 @@
+# app/core/tracing.py
+"""
+Rastreamento por requisição da API.
+
+- ``X-Request-ID`` recebido do Django (ou gerado aqui) é devolvido na
+  resposta, para correlacionar os logs dos dois serviços.
+- ``Server-Timing`` traz o tempo gasto no banco (``db``), na serialização
+  JSON (``json``) e o total da requisição.
+- Latência, contagem, tamanho das respostas e requisições em andamento
+  por rota vão para as métricas de ``/metrics`` (``app/core/metrics.py``).
+"""
+import contextvars
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.routing import Match
+
+from app.core import metrics
+
+REQUEST_ID_HEADER = "x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._\-]{1,64}$")
+
+# Descrições das fases no Server-Timing (headers HTTP: apenas ASCII)
+PHASES = {
+    "db": "AGHU",
+    "json": "JSON",
+}
+
+_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    __slots__ = ("request_id", "start", "phases")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.start
+        parts = [
+            f'{name};dur={self.phases[name] * 1000:.1f};desc="{desc}"'
+            for name, desc in PHASES.items() if name in self.phases
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def record(phase: str, seconds: float) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str):
+    """Acumula o tempo do bloco na fase `phase` da requisição corrente."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse que mede o tempo de codificação na fase `json`."""
+
+    def render(self, content) -> bytes:
+        with timed("json"):
+            return super().render(content)
+
+
+def _rota(scope) -> str:
+    """
+    Template da rota da requisição, para os rótulos das métricas. Respostas
+    dadas antes do roteamento (hits do ``ResponseCacheMiddleware``) não têm
+    ``scope["route"]``: aí a rota é resolvida pelo path nas rotas do app.
+    """
+    route = scope.get("route")
+    if route is None:
+        router = getattr(scope.get("app"), "router", None)
+        for candidata in getattr(router, "routes", ()):
+            match, _ = candidata.matches(scope)
+            if match is Match.FULL:
+                route = candidata
+                break
+    return getattr(route, "path", None) or "<sem rota>"
+
+
+class TracingMiddleware:
+    """Middleware ASGI: correlation ID, Server-Timing e métricas por rota."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER.encode():
+                incoming = value.decode("latin-1")
+                break
+        if not incoming or not _VALID_REQUEST_ID.match(incoming):
+            incoming = uuid.uuid4().hex
+
+        trace = Trace(incoming)
+        token = _trace.set(trace)
+        resposta = {"status": 500, "bytes": 0}
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                resposta["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), trace.request_id.encode()))
+                headers.append((b"server-timing", trace.server_timing().encode()))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                resposta["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _trace.reset(token)
+            metrics.requests_in_flight.dec()
+            path = _rota(scope)
+            method = scope.get("method", "")
+            metrics.request_latency.observe((path, method), time.perf_counter() - trace.start)
+            metrics.request_count.inc((path, method, str(resposta["status"])))
+            metrics.response_size.observe((path, method), resposta["bytes"])
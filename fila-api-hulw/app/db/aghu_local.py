@@ -0,0 +1,160 @@
+# app/db/aghu_local.py
+"""
+Réplica local (SQLite ou Postgres) das tabelas do schema ``agh`` que a API
+consulta, para rodar e medir as consultas SQL reais sem o banco do hospital.
+
+Só as colunas usadas pelas consultas existem aqui. No SQLite, o schema
+``agh`` é o próprio arquivo anexado (``ATTACH``) com esse nome, então o SQL
+dos repositórios (``agh.aip_pacientes`` etc.) roda sem alterações.
+
+O povoamento usa o gerador de ``app/db/synthetic.py`` (mesma seed = mesmos dados).
+"""
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import (
+    CHAR, Column, Index, Integer, MetaData, String, Table, event, insert,
+)
+from sqlalchemy.engine import Engine, make_url
+
+from app.db import synthetic
+
+metadata = MetaData(schema="agh")
+
+agh_especialidades = Table(
+    "agh_especialidades", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=False),
+    Column("nome_especialidade", String(120), nullable=False),
+    Column("ind_situacao", CHAR(1), nullable=False, server_default="A"),
+    Index("agh_esp_nome_idx", "nome_especialidade", "seq"),
+)
+
+fat_proced_hosp_internos = Table(
+    "fat_proced_hosp_internos", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=False),
+    Column("descricao", String(120), nullable=False),
+    Index("fat_phi_descricao_idx", "descricao", "seq"),
+)
+
+aac_proced_hosp_especialidades = Table(
+    "aac_proced_hosp_especialidades", metadata,
+    Column("esp_seq", Integer, primary_key=True, autoincrement=False),
+    Column("phi_seq", Integer, primary_key=True, autoincrement=False),
+    Column("ind_consulta", CHAR(1), nullable=False, server_default="N"),
+)
+
+mbc_procedimento_cirurgicos = Table(
+    "mbc_procedimento_cirurgicos", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=False),
+    Column("descricao", String(120), nullable=False),
+    Column("ind_situacao", CHAR(1), nullable=False, server_default="A"),
+    Index("mbc_pro_descricao_idx", "descricao", "seq"),
+)
+
+rap_pessoas_fisicas = Table(
+    "rap_pessoas_fisicas", metadata,
+    Column("codigo", Integer, primary_key=True, autoincrement=False),
+    Column("nome", String(120)),
+)
+
+rap_servidores = Table(
+    "rap_servidores", metadata,
+    Column("matricula", Integer, primary_key=True, autoincrement=False),
+    Column("pes_codigo", Integer),
+    Column("ind_situacao", CHAR(1), nullable=False, server_default="A"),
+)
+
+aip_pacientes = Table(
+    "aip_pacientes", metadata,
+    Column("prontuario", Integer, primary_key=True, autoincrement=False),
+    Column("nome", String(120), nullable=False),
+    Column("ddd_fone_residencial", String(3)),
+    Column("fone_residencial", String(20)),
+    Column("ddd_fone_recado", String(3)),
+    Column("fone_recado", String(20)),
+    Index("aip_pac_nome_idx", "nome", "prontuario"),
+)
+
+
+def instalar_schema_sqlite(engine: Engine, url: str) -> None:
+    """
+    Anexa o próprio arquivo SQLite como ``agh`` em cada conexão nova.
+    ``engine`` é a engine síncrona (``async_engine.sync_engine`` na API).
+    """
+    caminho = make_url(url).database
+
+    @event.listens_for(engine, "connect")
+    def _anexar_agh(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("ATTACH DATABASE ? AS agh", (caminho,))
+        cursor.close()
+
+
+def _lotes(linhas: Iterable[Dict], tamanho: int) -> Iterator[List[Dict]]:
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def povoar(conn, seed: int = 0, n_especialidades: int = 30, procedimentos_por_especialidade: int = 40,
+           n_profissionais: int = 1000, n_pacientes: int = 100000, batch_size: int = 5000,
+           log=print) -> None:
+    """Apaga e recria as tabelas e insere os dados sintéticos em lotes."""
+    metadata.drop_all(conn)
+    metadata.create_all(conn)
+
+    especialidades = list(synthetic.especialidades(n_especialidades, seed))
+    conn.execute(insert(agh_especialidades), [
+        {"seq": e["COD_ESPECIALIDADE"], "nome_especialidade": e["NOME_ESPECIALIDADE"], "ind_situacao": "A"}
+        for e in especialidades
+    ])
+    log(f"-> agh_especialidades: {len(especialidades)}")
+
+    procedimentos = list(synthetic.procedimentos(
+        [e["COD_ESPECIALIDADE"] for e in especialidades], procedimentos_por_especialidade, seed))
+    descricoes = {p["COD_PROCEDIMENTO"]: p["PROCEDIMENTO"] for p in procedimentos}
+    conn.execute(insert(fat_proced_hosp_internos), [
+        {"seq": cod, "descricao": descricao} for cod, descricao in descricoes.items()
+    ])
+    # Todo procedimento da especialidade entra como cirúrgico (ind_consulta = 'N');
+    # um em cada 10 também fica inativo na tabela de procedimentos cirúrgicos.
+    conn.execute(insert(aac_proced_hosp_especialidades), [
+        {"esp_seq": p["COD_ESPECIALIDADE_FK"], "phi_seq": p["COD_PROCEDIMENTO"], "ind_consulta": "N"}
+        for p in procedimentos
+    ])
+    conn.execute(insert(mbc_procedimento_cirurgicos), [
+        {"seq": cod, "descricao": descricao, "ind_situacao": "I" if i % 10 == 9 else "A"}
+        for i, (cod, descricao) in enumerate(descricoes.items())
+    ])
+    log(f"-> procedimentos: {len(descricoes)} ({len(procedimentos)} pares com especialidade)")
+
+    total = 0
+    for codigo, lote in enumerate(_lotes(synthetic.profissionais(n_profissionais, seed), batch_size)):
+        base = codigo * batch_size
+        conn.execute(insert(rap_pessoas_fisicas), [
+            {"codigo": base + i, "nome": p["NOME_PROFISSIONAL"]} for i, p in enumerate(lote)
+        ])
+        conn.execute(insert(rap_servidores), [
+            {"matricula": p["MATRICULA"], "pes_codigo": base + i, "ind_situacao": "A"} for i, p in enumerate(lote)
+        ])
+        total += len(lote)
+    log(f"-> rap_servidores: {total}")
+
+    total = 0
+    for lote in _lotes(synthetic.pacientes(n_pacientes, seed), batch_size):
+        conn.execute(insert(aip_pacientes), [
+            {
+                "prontuario": p["PRONTUARIO_PAC"],
+                "nome": p["NOME_PACIENTE"],
+                "ddd_fone_residencial": p["DDD_FONE_RESIDENCIAL"],
+                "fone_residencial": p["FONE_RESIDENCIAL"],
+                "ddd_fone_recado": p["DDD_FONE_RECADO"],
+                "fone_recado": p["FONE_RECADO"],
+            }
+            for p in lote
+        ])
+        total += len(lote)
+    log(f"-> aip_pacientes: {total}")
@@ -1,44 +1,173 @@
+"""
+Dados mock (modo ``USE_MOCK_DATA``) servidos a partir da memória.
+
+Cada arquivo JSON é lido uma única vez e vira um ``MockDataset`` com:
+- dicionário pela chave primária (``get``);
+- índices secundários, ex.: ``COD_ESPECIALIDADE_FK`` → procedimentos
+  (``lookup``), montados na carga ou, para outros campos, no primeiro uso;
+- textos de busca já em minúsculas, por conjunto de campos (``search``).
+
+A cada acesso só é feito um ``os.stat`` no arquivo: se o ``mtime`` mudou,
+o dataset é recarregado. Assim dá para trocar os JSON com a API no ar.
+
+Se existir ``<nome>.jsonl`` (ex.: gerado por ``generate_mock_data.py``), ele
+é usado no lugar de ``<nome>.json``. ``MOCK_DATA_DIR`` troca o diretório.
+"""
 import json
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.db.synthetic import caminho_dataset, ler_jsonl
 
 # Caminho para nossos dados mock
 MOCK_DATA_DIR = os.path.join(os.path.dirname(__file__), "mock_data")
 
-def _load_mock_data(filename: str) -> List[Dict[str, Any]]:
-    """Carrega um arquivo JSON de dados mock."""
-    filepath = os.path.join(MOCK_DATA_DIR, filename)
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-
-def get_mock_data(filename: str, term: Optional[str], key_fields: List[str], skip: int, limit: int):
-    """Função genérica para buscar e paginar dados mock."""
-    all_data = _load_mock_data(filename)
-
-    # Filtra os dados se um termo de busca for fornecido
-    if term:
+# Chave primária e índices secundários montados já na carga de cada arquivo.
+# Procedimentos se repetem (um registro por especialidade): pela chave
+# primária vale a primeira ocorrência, como na busca linear de antes.
+DATASETS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "especialidades.json": ("COD_ESPECIALIDADE", ()),
+    "pacientes.json": ("PRONTUARIO_PAC", ()),
+    "procedimentos.json": ("COD_PROCEDIMENTO", ("COD_ESPECIALIDADE_FK",)),
+    "profissionais.json": ("MATRICULA", ()),
+}
+
+
+class MockDataset:
+    """Linhas de um arquivo mock + índices. Só leitura depois de montado."""
+
+    def __init__(self, rows: List[Dict[str, Any]], mtime: Optional[float], exists: bool = True):
+        self.rows = rows
+        self.mtime = mtime
+        self.exists = exists
+        self.path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._indices: Dict[str, Dict[Any, List[int]]] = {}
+        self._textos: Dict[Tuple[str, ...], List[str]] = {}
+
+    def index(self, field: str) -> Dict[Any, List[int]]:
+        """Valor do campo → posições das linhas (na ordem do arquivo)."""
+        indice = self._indices.get(field)
+        if indice is None:
+            with self._lock:
+                indice = self._indices.get(field)
+                if indice is None:
+                    indice = {}
+                    for pos, row in enumerate(self.rows):
+                        valor = row.get(field)
+                        if valor is not None:
+                            indice.setdefault(valor, []).append(pos)
+                    self._indices[field] = indice
+        return indice
+
+    def _coerce(self, field: str, value: Any) -> Any:
+        # Garante que o tipo do valor buscado é o mesmo dos dados (ex.: "17" → 17)
+        indice = self.index(field)
+        if not indice:
+            return value
+        tipo = type(next(iter(indice)))
+        try:
+            return tipo(value)
+        except (TypeError, ValueError):
+            return value
+
+    def get(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        posicoes = self.index(field).get(self._coerce(field, value))
+        return self.rows[posicoes[0]] if posicoes else None
+
+    def lookup(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        posicoes = self.index(field).get(self._coerce(field, value), ())
+        return [self.rows[pos] for pos in posicoes]
+
+    def _texto_busca(self, key_fields: Sequence[str]) -> List[str]:
+        chave = tuple(key_fields)
+        textos = self._textos.get(chave)
+        if textos is None:
+            # "\x00" separa os campos para o termo não "atravessar" de um para outro
+            textos = [
+                "\x00".join(
+                    str(row.get(f)).lower() for f in chave if row.get(f) is not None
+                )
+                for row in self.rows
+            ]
+            self._textos[chave] = textos
+        return textos
+
+    def search(self, term: Optional[str], key_fields: Sequence[str],
+               positions: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Linhas em que ``term`` aparece em algum dos ``key_fields``
+        (sem diferenciar maiúsculas). ``positions`` restringe a busca a um
+        subconjunto vindo de ``index``.
+        """
+        if positions is None:
+            positions = range(len(self.rows))
+        if not term:
+            return [self.rows[pos] for pos in positions]
         term = term.lower()
-        filtered_data = []
-        for item in all_data:
-            for field in key_fields:
-                if term in str(item.get(field, '')).lower():
-                    filtered_data.append(item)
-                    break # Evita adicionar o mesmo item duas vezes
-    else:
-        filtered_data = all_data
-
-    # Aplica a paginação
-    return filtered_data[skip : skip + limit]
-
-def get_mock_data_by_id(filename: str, id_value: Any, id_field: str):
-    """Busca um único item por ID nos dados mock."""
-    all_data = _load_mock_data(filename)
-    id_value = type(all_data[0][id_field])(id_value) # Garante que os tipos são os mesmos
-
-    for item in all_data:
-        if item.get(id_field) == id_value:
-            return item
-    return None
\ No newline at end of file
+        textos = self._texto_busca(key_fields)
+        return [self.rows[pos] for pos in positions if term in textos[pos]]
+
+
+class MockRepository:
+    """Cache dos ``MockDataset`` por arquivo, recarregando quando o mtime muda."""
+
+    def __init__(self, data_dir: str = MOCK_DATA_DIR):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._datasets: Dict[str, MockDataset] = {}
+
+    def _mtime(self, filepath: str) -> Optional[float]:
+        try:
+            return os.stat(filepath).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _load(self, filename: str, filepath: str, mtime: Optional[float]) -> MockDataset:
+        if mtime is None:
+            return MockDataset([], None, exists=False)
+        if filepath.endswith(".jsonl"):
+            dataset = MockDataset(list(ler_jsonl(filepath)), mtime)
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                dataset = MockDataset(json.load(f), mtime)
+        pk, indices = DATASETS.get(filename, (None, ()))
+        for field in ((pk,) if pk else ()) + indices:
+            dataset.index(field)
+        return dataset
+
+    def dataset(self, filename: str) -> MockDataset:
+        filepath = caminho_dataset(self.data_dir, os.path.splitext(filename)[0])
+        mtime = self._mtime(filepath)
+        dataset = self._datasets.get(filename)
+        if dataset is not None and (dataset.path, dataset.mtime) == (filepath, mtime):
+            return dataset
+        with self._lock:
+            dataset = self._datasets.get(filename)
+            if dataset is None or (dataset.path, dataset.mtime) != (filepath, mtime):
+                dataset = self._load(filename, filepath, mtime)
+                dataset.path = filepath
+                self._datasets[filename] = dataset
+        return dataset
+
+    def warm_up(self) -> None:
+        """Carrega todos os arquivos conhecidos (evita a carga na 1ª requisição)."""
+        for filename in DATASETS:
+            self.dataset(filename)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """O que já está em memória (sem carregar nada): linhas e índices por arquivo."""
+        status = {}
+        for filename in DATASETS:
+            dataset = self._datasets.get(filename)
+            status[filename] = {
+                "loaded": dataset is not None and dataset.exists,
+                "rows": len(dataset.rows) if dataset is not None else 0,
+                "indexes": sorted(dataset._indices) if dataset is not None else [],
+            }
+        return status
+
+
+mock_repository = MockRepository(settings.MOCK_DATA_DIR or MOCK_DATA_DIR)
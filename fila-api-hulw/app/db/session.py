@@ -1,17 +1,226 @@
 # app/db/session.py
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+"""
+Acesso assíncrono ao banco do AGHU (SQLAlchemy async + asyncpg).
+
+As conexões não são mais injetadas nos endpoints: ``fetch_all`` e
+``fetch_one`` pegam uma conexão do pool só durante a consulta e a devolvem
+logo em seguida. Assim, requisições atendidas pelo mock (ou, mais tarde,
+por cache) nunca ocupam conexão, e nenhuma fica presa enquanto a resposta
+é serializada.
+"""
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from app.core import metrics
 from app.core.config import settings
+from app.core.singleflight import AsyncSingleFlight
+from app.core.tracing import timed
+from app.db.aghu_local import instalar_schema_sqlite
+
+
+def _build_engine() -> AsyncEngine:
+    url = settings.ASYNC_DATABASE_URL
+    if url.startswith("sqlite"):
+        # Réplica local do AGHU (build_local_aghu.py): sem pool nem timeouts do asyncpg
+        engine = create_async_engine(url)
+        instalar_schema_sqlite(engine.sync_engine, url)
+        return engine
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        # Conexões derrubadas pelo servidor/firewall são detectadas antes do uso
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={
+            "command_timeout": settings.DB_STATEMENT_TIMEOUT_MS / 1000,
+            "server_settings": {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+                "application_name": "fila-api-hulw",
+            },
+        },
+    )
+
+
+# Criamos o motor de conexão com o banco de dados (não conecta até a 1ª consulta)
+engine = _build_engine()
+
+class PoolStats:
+    """
+    Contadores de espera por conexão (o pool do SQLAlchemy não os expõe):
+    quantas requisições aguardam agora, quantas já encontraram o pool
+    cheio, o tempo total de espera e quantas estouraram ``DB_POOL_TIMEOUT``.
+    """
+
+    def __init__(self):
+        self.aguardando = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.timeouts = 0
+
+    def snapshot(self) -> dict:
+        pool = engine.pool
+        size = pool.size() if hasattr(pool, "size") else None
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else None
+        capacidade = (size or 0) + max(max_overflow, 0)
+        return {
+            "size": size,
+            "max_overflow": max_overflow,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "checked_out": checked_out,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "utilization": round(checked_out / capacidade, 3) if capacidade and checked_out is not None else None,
+            "waiting": self.aguardando,
+            "waits": self.esperas,
+            "wait_seconds": round(self.espera_total, 3),
+            "timeouts": self.timeouts,
+        }
+
 
-# Criamos o motor de conexão com o banco de dados
-engine = create_engine(str(settings.DATABASE_URL))
+pool_stats = PoolStats()
 
-# Função para obter uma conexão (será usada como dependência no FastAPI)
-def get_db_connection():
-    conn = None
+
+def _pool_metrics():
+    """Estado do pool nas métricas (coletado a cada leitura de /metrics)."""
+    foto = pool_stats.snapshot()
+    if foto["overflow"] is not None:
+        # o QueuePool conta negativo enquanto o pool ainda não encheu
+        foto["overflow"] = max(foto["overflow"], 0)
+    series = [
+        ("fila_api_db_pool_size", "gauge", "Tamanho do pool de conexões.", foto["size"]),
+        ("fila_api_db_pool_checked_out", "gauge", "Conexões emprestadas agora.", foto["checked_out"]),
+        ("fila_api_db_pool_overflow", "gauge", "Conexões além do pool_size agora.", foto["overflow"]),
+        ("fila_api_db_pool_waiting", "gauge", "Requisições esperando conexão agora.", foto["waiting"]),
+        ("fila_api_db_pool_waits_total", "counter", "Pedidos de conexão que encontraram o pool cheio.", foto["waits"]),
+        ("fila_api_db_pool_wait_seconds_total", "counter", "Tempo total esperando conexão.", foto["wait_seconds"]),
+        ("fila_api_db_pool_timeouts_total", "counter", "Pedidos de conexão que estouraram DB_POOL_TIMEOUT.", foto["timeouts"]),
+    ]
+    lines = []
+    for name, kind, description, valor in series:
+        if valor is not None:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}", f"{name} {valor}"]
+    return lines
+
+
+metrics.COLLECTORS.append(_pool_metrics)
+
+
+def _pool_cheio() -> bool:
+    pool = engine.pool
+    if not (hasattr(pool, "size") and hasattr(pool, "checkedout")):
+        return False
+    return pool.checkedout() >= pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+
+
+@asynccontextmanager
+async def connect():
+    """``engine.connect()`` contando as esperas por conexão livre (ver ``PoolStats``)."""
+    cheio = _pool_cheio()
+    if cheio:
+        pool_stats.esperas += 1
+    pool_stats.aguardando += 1
+    inicio = time.perf_counter()
+    try:
+        conn = await engine.connect()
+    except exc.TimeoutError:
+        pool_stats.timeouts += 1
+        raise
+    finally:
+        pool_stats.aguardando -= 1
+        if cheio:
+            pool_stats.espera_total += time.perf_counter() - inicio
     try:
-        conn = engine.connect()
         yield conn
     finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        await conn.close()
+
+
+# Consultas idênticas (mesmo SQL + mesmos parâmetros) executadas ao mesmo
+# tempo por requisições diferentes são coalescidas em uma única ida ao banco.
+_consultas = AsyncSingleFlight()
+
+
+def _query_key(kind, query, params):
+    return (kind, str(query), tuple(sorted((params or {}).items())))
+
+
+@contextmanager
+def _medir(name):
+    """Duração (e falha) da consulta em ``fila_api_db_query_*{query=name}``."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.db_query_errors.inc((name,))
+        raise
+    finally:
+        metrics.db_query_duration.observe((name,), time.perf_counter() - inicio)
+
+
+async def _execute(kind, query, params, name):
+    async with connect() as conn:
+        with _medir(name):
+            result = await conn.execute(query, params or {})
+            return result.fetchall() if kind == "all" else result.fetchone()
+
+
+async def fetch_all(query, params=None, name="sql"):
+    """
+    Executa `query` e retorna todas as linhas, coalescendo chamadas idênticas.
+    `name` é o nome lógico da consulta nas métricas (ex.: ``pacientes_search``).
+    """
+    with timed("db"):
+        return await _consultas.do(
+            _query_key("all", query, params),
+            lambda: _execute("all", query, params, name),
+        )
+
+
+async def fetch_one(query, params=None, name="sql"):
+    """Executa `query` e retorna a primeira linha (ou None), coalescendo chamadas idênticas."""
+    with timed("db"):
+        return await _consultas.do(
+            _query_key("one", query, params),
+            lambda: _execute("one", query, params, name),
+        )
+
+
+async def stream_batches(query, params=None, batch_size=None, name="sql"):
+    """
+    Executa `query` com cursor do lado do servidor e entrega as linhas em
+    lotes de `batch_size` (``EXPORT_BATCH_SIZE``), sem carregar o resultado
+    inteiro. Usado pelas exportações: a conexão fica presa enquanto o
+    cliente consome o stream, e o ``statement_timeout`` da transação sobe
+    para ``EXPORT_STATEMENT_TIMEOUT_MS``. Sem coalescência (cada stream é único).
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    async with connect() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(f"SET LOCAL statement_timeout = {int(settings.EXPORT_STATEMENT_TIMEOUT_MS)}"))
+        with timed("db"), _medir(name):
+            result = await conn.stream(query, params or {})
+        while True:
+            # Cada ida ao cursor conta como uma observação da mesma consulta
+            with timed("db"), _medir(name):
+                lote = await result.fetchmany(batch_size)
+            if not lote:
+                break
+            yield lote
+
+
+async def probe() -> float:
+    """``SELECT 1`` numa conexão do pool; retorna a latência em segundos."""
+    inicio = time.perf_counter()
+    async with connect() as conn:
+        with _medir("health_probe"):
+            await conn.execute(text("SELECT 1"))
+    return time.perf_counter() - inicio
+
+
+async def dispose_engine() -> None:
+    """Fecha as conexões do pool (chamado no shutdown da aplicação)."""
+    await engine.dispose()
@@ -0,0 +1,191 @@
+# app/db/synthetic.py
+"""
+Gerador determinístico de dados sintéticos no formato do AGHU.
+
+Produz especialidades, procedimentos (com ``COD_ESPECIALIDADE_FK``),
+profissionais e pacientes com as mesmas chaves dos JSON de ``mock_data``.
+Tudo é gerado sob demanda (iteradores), então dá para escrever milhões de
+linhas em JSON Lines sem montar as listas em memória.
+
+A mesma ``seed`` sempre gera os mesmos dados: cada conjunto usa o seu
+próprio ``random.Random(f"{seed}:<conjunto>")``, então mudar a quantidade de
+pacientes não altera, por exemplo, os procedimentos.
+"""
+import json
+import os
+import random
+from typing import Dict, Iterator, List, Optional
+
+NOMES = [
+    "ANA", "MARIA", "JOSE", "JOAO", "ANTONIO", "FRANCISCO", "CARLOS", "PAULO",
+    "PEDRO", "LUCAS", "LUIZ", "MARCOS", "LUIS", "GABRIEL", "RAFAEL", "DANIEL",
+    "MARCELO", "BRUNO", "EDUARDO", "FELIPE", "RAIMUNDO", "RODRIGO", "MANOEL",
+    "FRANCISCA", "ANTONIA", "ADRIANA", "JULIANA", "MARCIA", "FERNANDA",
+    "PATRICIA", "ALINE", "SANDRA", "CAMILA", "AMANDA", "BRUNA", "JESSICA",
+    "LETICIA", "JULIA", "LUCIANA", "VANESSA", "MARIANA", "GABRIELA", "VERA",
+    "VITORIA", "LARISSA", "CLAUDIA", "BEATRIZ", "LUANA", "RITA", "SEVERINO",
+    "EDILEUZA", "GENIVAL", "JOSEFA", "DAMIAO", "CICERA", "LINDALVA",
+]
+
+SOBRENOMES = [
+    "SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES",
+    "PEREIRA", "LIMA", "GOMES", "COSTA", "RIBEIRO", "MARTINS", "CARVALHO",
+    "ALMEIDA", "LOPES", "SOARES", "FERNANDES", "VIEIRA", "BARBOSA", "ROCHA",
+    "DIAS", "NASCIMENTO", "ANDRADE", "MOREIRA", "NUNES", "MARQUES", "MACHADO",
+    "MENDES", "FREITAS", "CAVALCANTI", "ARAUJO", "MEDEIROS", "BEZERRA",
+    "QUEIROZ", "BRITO", "MONTEIRO", "FARIAS", "TAVARES", "DANTAS", "LUCENA",
+]
+
+ESPECIALIDADES = [
+    "CIRURGIA GERAL", "CIRURGIA PEDIÁTRICA", "CIRURGIA TORÁCICA",
+    "CIRURGIA VASCULAR", "CIRURGIA CARDIOVASCULAR", "CIRURGIA PLÁSTICA",
+    "CIRURGIA DE CABEÇA E PESCOÇO", "CIRURGIA DO APARELHO DIGESTIVO",
+    "CIRURGIA E TRAUMATOLOGIA BUCO MAXILO FACIAIS", "COLOPROCTOLOGIA",
+    "GINECOLOGIA", "OBSTETRÍCIA", "MASTOLOGIA", "UROLOGIA", "NEUROCIRURGIA",
+    "OFTALMOLOGIA", "OTORRINOLARINGOLOGIA", "ORTOPEDIA E TRAUMATOLOGIA",
+    "CARDIOLOGIA", "GASTROENTEROLOGIA", "DERMATOLOGIA", "ENDOCRINOLOGIA E METABOLOGIA",
+    "NEFROLOGIA", "PNEUMOLOGIA", "ONCOLOGIA CLÍNICA", "HEMATOLOGIA",
+    "REUMATOLOGIA", "NEUROLOGIA", "PATOLOGIA", "ANESTESIOLOGIA",
+]
+
+# Procedimentos cirúrgicos comuns (base das descrições; a via/lado varia)
+PROCEDIMENTOS_BASE = [
+    "COLECISTECTOMIA", "HERNIOPLASTIA INGUINAL", "HERNIOPLASTIA UMBILICAL",
+    "HERNIOPLASTIA INCISIONAL", "APENDICECTOMIA", "TIREOIDECTOMIA TOTAL",
+    "TIREOIDECTOMIA PARCIAL", "MASTECTOMIA RADICAL", "SETORECTOMIA DE MAMA",
+    "HISTERECTOMIA TOTAL", "MIOMECTOMIA UTERINA", "OOFORECTOMIA",
+    "PROSTATECTOMIA", "RESSECÇÃO ENDOSCÓPICA DE PRÓSTATA", "NEFRECTOMIA",
+    "URETEROLITOTRIPSIA", "POSTECTOMIA", "HIDROCELECTOMIA", "COLECTOMIA PARCIAL",
+    "RETOSSIGMOIDECTOMIA", "HEMORROIDECTOMIA", "FISTULECTOMIA ANAL",
+    "GASTRECTOMIA PARCIAL", "GASTROPLASTIA", "LOBECTOMIA PULMONAR",
+    "TRATAMENTO CIRÚRGICO DE VARIZES", "FACECTOMIA COM IMPLANTE DE LENTE INTRA-OCULAR",
+    "AMIGDALECTOMIA", "ADENOIDECTOMIA", "SEPTOPLASTIA", "TIMPANOPLASTIA",
+    "RECONSTRUÇÃO DE LIGAMENTO CRUZADO DO JOELHO", "MENISCECTOMIA",
+    "ARTROPLASTIA TOTAL DE QUADRIL", "ARTROPLASTIA TOTAL DE JOELHO",
+    "TRATAMENTO CIRÚRGICO DE FRATURA DO FÊMUR", "MICRODISCECTOMIA LOMBAR",
+    "EXÉRESE DE LIPOMA", "EXÉRESE DE CISTO SEBÁCEO", "EXÉRESE DE TUMOR DE PELE",
+    "BIÓPSIA DE LINFONODO", "DRENAGEM DE ABSCESSO", "SAFENECTOMIA",
+    "REVASCULARIZAÇÃO MIOCÁRDICA", "TROCA VALVAR", "CORREÇÃO DE HIPOSPÁDIA",
+    "ORQUIDOPEXIA", "PALATOPLASTIA", "QUEILOPLASTIA", "EXODONTIA DE DENTE INCLUSO",
+]
+VIAS = ["", "", "", " VIDEOLAPAROSCÓPICA", " POR VIA ABERTA", " (UNILATERAL)", " (BILATERAL)", " EM ONCOLOGIA"]
+
+
+def _rng(seed: int, conjunto: str) -> random.Random:
+    return random.Random(f"{seed}:{conjunto}")
+
+
+def _nome(rng: random.Random, min_sobrenomes: int = 1, max_sobrenomes: int = 3) -> str:
+    partes = [rng.choice(NOMES)]
+    if rng.random() < 0.3:
+        partes.append(rng.choice(NOMES))
+    partes += rng.sample(SOBRENOMES, rng.randint(min_sobrenomes, max_sobrenomes))
+    return " ".join(partes)
+
+
+def _telefone(rng: random.Random):
+    if rng.random() < 0.35:
+        return None, None
+    ddd = rng.choice(["83", "83", "83", "84", "81", "87"])
+    return ddd, f"9{rng.randint(8000, 9999)}{rng.randint(0, 9999):04d}"
+
+
+def especialidades(n: int, seed: int = 0) -> Iterator[Dict]:
+    """``n`` especialidades com códigos crescentes e nomes reais (repetidos com sufixo além da lista)."""
+    rng = _rng(seed, "especialidades")
+    cod = 0
+    for i in range(n):
+        cod += rng.randint(1, 12)
+        nome = ESPECIALIDADES[i % len(ESPECIALIDADES)]
+        if i >= len(ESPECIALIDADES):
+            nome = f"{nome} {i // len(ESPECIALIDADES) + 1}"
+        yield {"COD_ESPECIALIDADE": cod, "NOME_ESPECIALIDADE": nome}
+
+
+def procedimentos(cod_especialidades: List[int], por_especialidade: int, seed: int = 0,
+                  compartilhados: float = 0.1) -> Iterator[Dict]:
+    """
+    ``por_especialidade`` procedimentos para cada especialidade. Uma fração
+    (``compartilhados``) reaproveita procedimentos de outras especialidades,
+    como no AGHU, onde o mesmo código aparece em mais de uma.
+    """
+    rng = _rng(seed, "procedimentos")
+    cod = 1000
+    ja_gerados: List[tuple] = []
+    for esp in cod_especialidades:
+        usados = set()
+        for _ in range(por_especialidade):
+            if ja_gerados and rng.random() < compartilhados:
+                cod_proc, descricao = rng.choice(ja_gerados)
+                if cod_proc in usados:
+                    continue
+            else:
+                cod += rng.randint(1, 40)
+                cod_proc = cod
+                descricao = f"{rng.choice(PROCEDIMENTOS_BASE)}{rng.choice(VIAS)}"
+                ja_gerados.append((cod_proc, descricao))
+            usados.add(cod_proc)
+            yield {"COD_PROCEDIMENTO": cod_proc, "PROCEDIMENTO": descricao, "COD_ESPECIALIDADE_FK": esp}
+
+
+def profissionais(n: int, seed: int = 0) -> Iterator[Dict]:
+    rng = _rng(seed, "profissionais")
+    matricula = 1000000
+    for _ in range(n):
+        matricula += rng.randint(1, 9000)
+        yield {"MATRICULA": matricula, "NOME_PROFISSIONAL": _nome(rng, 2, 3), "PROF_RESPONSAVEL": matricula}
+
+
+def pacientes(n: int, seed: int = 0) -> Iterator[Dict]:
+    rng = _rng(seed, "pacientes")
+    prontuario = 0
+    for _ in range(n):
+        prontuario += rng.randint(1, 3)
+        ddd_res, fone_res = _telefone(rng)
+        ddd_rec, fone_rec = _telefone(rng)
+        yield {
+            "NOME_PACIENTE": _nome(rng),
+            "PRONTUARIO_PAC": prontuario,
+            "DDD_FONE_RESIDENCIAL": ddd_res,
+            "FONE_RESIDENCIAL": fone_res,
+            "DDD_FONE_RECADO": ddd_rec,
+            "FONE_RECADO": fone_rec,
+        }
+
+
+def gerar_conjuntos(seed: int = 0, n_especialidades: int = 30, procedimentos_por_especialidade: int = 40,
+                    n_profissionais: int = 1000, n_pacientes: int = 100000) -> Dict[str, Iterator[Dict]]:
+    """Iteradores por nome de arquivo (sem extensão), prontos para ``escrever_jsonl``."""
+    cods = [e["COD_ESPECIALIDADE"] for e in especialidades(n_especialidades, seed)]
+    return {
+        "especialidades": especialidades(n_especialidades, seed),
+        "procedimentos": procedimentos(cods, procedimentos_por_especialidade, seed),
+        "profissionais": profissionais(n_profissionais, seed),
+        "pacientes": pacientes(n_pacientes, seed),
+    }
+
+
+def escrever_jsonl(linhas: Iterator[Dict], caminho: str) -> int:
+    """Escreve uma linha JSON compacta por registro e retorna quantas foram escritas."""
+    total = 0
+    with open(caminho, "w", encoding="utf-8") as f:
+        for linha in linhas:
+            f.write(json.dumps(linha, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            total += 1
+    return total
+
+
+def ler_jsonl(caminho: str, limite: Optional[int] = None) -> Iterator[Dict]:
+    with open(caminho, "r", encoding="utf-8") as f:
+        for i, linha in enumerate(f):
+            if limite is not None and i >= limite:
+                return
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def caminho_dataset(diretorio: str, nome: str) -> str:
+    """``<nome>.jsonl`` se existir no diretório; senão ``<nome>.json``."""
+    jsonl = os.path.join(diretorio, f"{nome}.jsonl")
+    return jsonl if os.path.exists(jsonl) else os.path.join(diretorio, f"{nome}.json")
@@ -1,14 +1,61 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from app.api.health import router as health_router
 from app.api.v1.api import api_router
+from app.core.cache import ResponseCacheMiddleware
+from app.core.config import settings
+from app.core import metrics
+from app.core.tracing import TimedJSONResponse, TracingMiddleware
+from app.db.mock_service import mock_repository
+from app.db.session import dispose_engine
+from app.repositories.catalogo import catalogo_procedimentos
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # No modo mock, lê os JSON e monta os índices antes da 1ª requisição
+    if settings.USE_MOCK_DATA:
+        mock_repository.warm_up()
+    else:
+        # Carga (em segundo plano) e renovação do catálogo de procedimentos
+        catalogo_procedimentos.iniciar()
+    yield
+    await catalogo_procedimentos.parar()
+    # Fecha as conexões do pool ao desligar o worker
+    await dispose_engine()
+
 
 app = FastAPI(
     title="API de Consulta HULW",
     description="API para consultar dados do sistema hospitalar.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=TimedJSONResponse,
+    lifespan=lifespan,
 )
 
+# Cache HTTP dos catálogos (ETag / 304). Adicionado antes do tracing para
+# que o tracing fique por fora e meça também as respostas vindas do cache.
+app.add_middleware(ResponseCacheMiddleware)
+
+# Correlation ID (X-Request-ID), Server-Timing e histograma de latência
+app.add_middleware(TracingMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(health_router, prefix="/health", tags=["Health"])
 
 @app.get("/", tags=["Root"])
-def read_root():
-    return {"message": "Bem-vindo à API do HULW!"}
\ No newline at end of file
+async def read_root():
+    return {"message": "Bem-vindo à API do HULW!"}
+
+@app.get("/metrics", tags=["Root"], response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics(request: Request):
+    """Métricas HTTP, de SQL e do pool (formato Prometheus), apenas para hosts autorizados."""
+    allowed = settings.metrics_allowed_hosts
+    if "*" not in allowed and (request.client is None or request.client.host not in allowed):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,37 @@
+# app/repositories/__init__.py
+"""
+Repositórios dos recursos da API (pacientes, especialidades, profissionais,
+procedimentos), com dois backends de mesma interface:
+
+- ``sql``: AGHU (Postgres) ou a réplica local gerada por ``build_local_aghu.py``;
+- ``memory``: datasets mock indexados (``USE_MOCK_DATA=true``).
+
+Os endpoints recebem o repositório por ``Depends(get_repository("<recurso>"))``
+e não sabem qual backend está ativo.
+"""
+from typing import Callable
+
+from app.core.config import settings
+from app.repositories import memory, sql
+from app.repositories.base import CatalogRepository, ProcedimentoRepository
+
+RECURSOS = ("pacientes", "especialidades", "profissionais", "procedimentos")
+
+
+def backend():
+    """Módulo do backend ativo (``memory`` no modo mock, senão ``sql``)."""
+    return memory if settings.USE_MOCK_DATA else sql
+
+
+def get_repository(recurso: str) -> Callable[[], CatalogRepository]:
+    """Dependência do FastAPI que entrega o repositório do recurso no backend ativo."""
+    if recurso not in RECURSOS:
+        raise ValueError(f"Recurso desconhecido: {recurso}")
+
+    def dependency() -> CatalogRepository:
+        return getattr(backend(), recurso)
+
+    return dependency
+
+
+__all__ = ["CatalogRepository", "ProcedimentoRepository", "RECURSOS", "backend", "get_repository"]
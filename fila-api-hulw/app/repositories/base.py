@@ -0,0 +1,65 @@
+# app/repositories/base.py
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence
+
+
+class CatalogRepository(ABC):
+    """
+    Interface comum dos backends (SQL e memória) de cada recurso. Abstrata:
+    um backend sem algum dos métodos falha ao ser instanciado (no import),
+    e não com 500 na primeira requisição.
+
+    ``search`` devolve até ``limit + 1`` linhas já ordenadas por
+    (``nome_key``, ``pk_key``); a linha extra indica que há próxima página
+    e é cortada por ``finish_page`` no endpoint.
+
+    ``fields`` (de ``resolve_fields``) é a lista de campos que a resposta vai
+    usar; o backend pode trazer só esses (o SQL faz isso) ou ignorar.
+    """
+
+    nome_key: str
+    pk_key: str
+
+    @abstractmethod
+    async def search(self, term: Optional[str], cursor: Optional[str] = None,
+                     skip: int = 0, limit: int = 25, fields: Optional[Sequence[str]] = None,
+                     **filtros: Any) -> Sequence:
+        ...
+
+    @abstractmethod
+    async def get(self, pk: Any, fields: Optional[Sequence[str]] = None) -> Optional[Mapping]:
+        ...
+
+    @abstractmethod
+    def export(self, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Sequence]:
+        """
+        Todas as linhas do recurso, ordenadas pela chave, em lotes de
+        ``EXPORT_BATCH_SIZE`` (gerador assíncrono).
+        """
+
+
+class ProcedimentoRepository(CatalogRepository):
+    """Procedimentos também sabem listar os pares (especialidade, procedimento)."""
+
+    @abstractmethod
+    async def pares(self) -> List[List[int]]:
+        ...
+
+
+def agrupar_especialidades(linhas, atual: Optional[dict] = None):
+    """
+    Agrupa linhas ``(código, descrição, especialidade)`` já ordenadas por
+    código em itens ``{COD_PROCEDIMENTO, PROCEDIMENTO, ESPECIALIDADES}``.
+
+    Funciona por lotes: devolve ``(itens completos, item em aberto)``; o item
+    em aberto entra como ``atual`` no próximo lote (ou é emitido no fim).
+    """
+    completos = []
+    for cod, descricao, esp in linhas:
+        if atual is None or atual["COD_PROCEDIMENTO"] != cod:
+            if atual is not None:
+                completos.append(atual)
+            atual = {"COD_PROCEDIMENTO": cod, "PROCEDIMENTO": descricao, "ESPECIALIDADES": []}
+        if esp is not None and esp not in atual["ESPECIALIDADES"]:
+            atual["ESPECIALIDADES"].append(esp)
+    return completos, atual
@@ -0,0 +1,164 @@
+# app/repositories/catalogo.py
+"""
+Catálogo unificado de procedimentos em memória (backend SQL).
+
+Sem ele, cada ``GET /procedimentos/{cod}`` roda o UNION de
+``fat_proced_hosp_internos`` com ``mbc_procedimento_cirurgicos``, e cada
+tecla do autocomplete com ``cod_especialidade`` refaz o JOIN com
+``aac_proced_hosp_especialidades``. Aqui essas tabelas são lidas de uma vez,
+numa task do lifespan, a cada ``PROCEDIMENTOS_CATALOGO_REFRESH`` segundos, e
+viram:
+
+- ``por_codigo``: código → procedimento (consulta por código em O(1));
+- ``por_especialidade``: especialidade → procedimentos já ordenados por
+  (descrição, código), a ordem do cursor, prontos para paginar. A ordem é
+  a dos code points (``sorted`` do Python), a mesma que o SQL de fallback
+  usa (``COLLATE "C"``, ver ``sql.py``): um cursor gerado por um lado
+  continua valendo no outro;
+- ``pares``: a resposta de ``/pares-especialidade``.
+
+Cada carga monta um ``Catalogo`` novo e só então troca a referência: quem
+está no meio de uma requisição segue com o anterior. Código ou especialidade
+fora do catálogo (ou catálogo ainda não carregado) → o repositório cai no SQL.
+"""
+import asyncio
+import bisect
+import logging
+import time
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.pagination import decode_cursor
+from app.db import session
+
+logger = logging.getLogger(__name__)
+
+# Procedimentos ligados a especialidades: mesmo critério do filtro
+# cod_especialidade da listagem (e dos pares)
+SQL_ESPECIALIDADES = """
+    SELECT php.esp_seq, phi.seq, phi.descricao
+    FROM agh.aac_proced_hosp_especialidades php
+    JOIN agh.fat_proced_hosp_internos phi ON phi.seq = php.phi_seq
+    WHERE php.ind_consulta = 'N'
+"""
+
+SQL_CIRURGICOS = """
+    SELECT pro.seq, pro.descricao
+    FROM agh.mbc_procedimento_cirurgicos pro
+    WHERE pro.ind_situacao = 'A'
+"""
+
+
+def _chave(item: Dict[str, Any]):
+    return (item["PROCEDIMENTO"] or "", item["COD_PROCEDIMENTO"])
+
+
+class Catalogo:
+    """Um retrato do catálogo. Só leitura depois de montado."""
+
+    def __init__(self, por_codigo: Dict[int, Dict[str, Any]],
+                 por_especialidade: Dict[int, List[Dict[str, Any]]]):
+        self.por_codigo = por_codigo
+        self.por_especialidade = por_especialidade
+        # Por especialidade, em paralelo às listas: chaves do cursor (bisect)
+        # e textos de busca em minúsculas ("\x00" separa descrição e código)
+        self._chaves = {esp: [_chave(item) for item in itens] for esp, itens in por_especialidade.items()}
+        self._textos = {
+            esp: [f"{(item['PROCEDIMENTO'] or '').lower()}\x00{item['COD_PROCEDIMENTO']}" for item in itens]
+            for esp, itens in por_especialidade.items()
+        }
+        self.pares = sorted(
+            [esp, item["COD_PROCEDIMENTO"]]
+            for esp, itens in por_especialidade.items()
+            for item in itens
+        )
+        self.carregado_em = time.monotonic()
+
+    def pagina(self, cod_especialidade: int, term: Optional[str], cursor: Optional[str],
+               skip: int, limit: int) -> List[Dict[str, Any]]:
+        """Até ``limit + 1`` procedimentos da especialidade, como o ``_search`` do SQL."""
+        itens = self.por_especialidade[cod_especialidade]
+        inicio = 0
+        if cursor:
+            nome, pk = decode_cursor(cursor)
+            inicio, skip = bisect.bisect_right(self._chaves[cod_especialidade], (nome or "", pk)), 0
+        if not term:
+            return itens[inicio + skip: inicio + skip + limit + 1]
+        term = term.lower()
+        encontrados = (
+            item for item, texto in islice(zip(itens, self._textos[cod_especialidade]), inicio, None)
+            if term in texto
+        )
+        return list(islice(encontrados, skip, skip + limit + 1))
+
+
+async def carregar() -> Catalogo:
+    """Lê as três tabelas (em stream) e monta um ``Catalogo`` novo."""
+    por_codigo: Dict[int, Dict[str, Any]] = {}
+    por_especialidade: Dict[int, Dict[int, Dict[str, Any]]] = {}
+    async for lote in session.stream_batches(text(SQL_ESPECIALIDADES), name="procedimentos_catalogo"):
+        for esp, cod, descricao in lote:
+            item = por_codigo.setdefault(cod, {"COD_PROCEDIMENTO": cod, "PROCEDIMENTO": descricao})
+            por_especialidade.setdefault(esp, {})[cod] = item
+    # Cirúrgicos ativos: só os códigos que ainda não vieram acima (no UNION
+    # da consulta por código, fat_proced_hosp_internos vem primeiro)
+    async for lote in session.stream_batches(text(SQL_CIRURGICOS), name="procedimentos_catalogo"):
+        for cod, descricao in lote:
+            por_codigo.setdefault(cod, {"COD_PROCEDIMENTO": cod, "PROCEDIMENTO": descricao})
+    return Catalogo(
+        por_codigo,
+        {esp: sorted(itens.values(), key=_chave) for esp, itens in por_especialidade.items()},
+    )
+
+
+class CatalogoProcedimentos:
+    """Guarda o catálogo atual e a task que o renova."""
+
+    def __init__(self):
+        self.atual: Optional[Catalogo] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def recarregar(self) -> None:
+        inicio = time.perf_counter()
+        self.atual = await carregar()
+        logger.info("Catálogo de procedimentos carregado: %d códigos, %d especialidades em %.1fs",
+                    len(self.atual.por_codigo), len(self.atual.por_especialidade),
+                    time.perf_counter() - inicio)
+
+    async def _renovar(self) -> None:
+        while True:
+            try:
+                await self.recarregar()
+            except Exception as e:
+                # Segue com o catálogo anterior (ou com o SQL, se nunca carregou)
+                logger.warning("Falha ao carregar o catálogo de procedimentos: %s", e)
+            await asyncio.sleep(settings.PROCEDIMENTOS_CATALOGO_REFRESH)
+
+    def iniciar(self) -> None:
+        """Agenda a primeira carga e as renovações (no lifespan, sem bloquear o startup)."""
+        if settings.PROCEDIMENTOS_CATALOGO_REFRESH > 0 and self._task is None:
+            self._task = asyncio.create_task(self._renovar(), name="procedimentos-catalogo")
+
+    async def parar(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        atual = self.atual
+        return {
+            "loaded": atual is not None,
+            "procedimentos": len(atual.por_codigo) if atual else 0,
+            "especialidades": len(atual.por_especialidade) if atual else 0,
+            "age_seconds": round(time.monotonic() - atual.carregado_em, 1) if atual else None,
+        }
+
+
+catalogo_procedimentos = CatalogoProcedimentos()
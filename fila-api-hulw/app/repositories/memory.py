@@ -0,0 +1,86 @@
+# app/repositories/memory.py
+"""
+Backend em memória dos repositórios (modo ``USE_MOCK_DATA``), sobre os
+datasets indexados de ``app/db/mock_service.py``.
+"""
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.pagination import keyset_slice
+from app.db.mock_service import MockDataset, mock_repository
+from app.repositories.base import CatalogRepository, ProcedimentoRepository, agrupar_especialidades
+
+
+class MemoryRepository(CatalogRepository):
+    def __init__(self, filename: str, nome_key: str, pk_key: str, search_fields: List[str]):
+        self.filename = filename
+        self.nome_key = nome_key
+        self.pk_key = pk_key
+        self.search_fields = search_fields
+
+    def dataset(self) -> MockDataset:
+        return mock_repository.dataset(self.filename)
+
+    async def search(self, term: Optional[str], cursor: Optional[str] = None,
+                     skip: int = 0, limit: int = 25, fields: Optional[Sequence[str]] = None,
+                     **filtros: Any) -> Sequence:
+        # Em memória as linhas já existem inteiras; o recorte fica para a resposta
+        results = self.dataset().search(term, self.search_fields)
+        return keyset_slice(results, self.nome_key, self.pk_key, cursor, skip, limit)
+
+    async def get(self, pk: Any, fields: Optional[Sequence[str]] = None) -> Optional[Mapping]:
+        return self.dataset().get(self.pk_key, pk)
+
+    async def export(self, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Sequence]:
+        linhas = sorted(self.dataset().rows, key=lambda row: row[self.pk_key])
+        for inicio in range(0, len(linhas), settings.EXPORT_BATCH_SIZE):
+            yield linhas[inicio:inicio + settings.EXPORT_BATCH_SIZE]
+
+
+class MemoryProcedimentoRepository(MemoryRepository, ProcedimentoRepository):
+    def dataset(self) -> MockDataset:
+        dataset = super().dataset()
+        if not dataset.exists:
+            raise HTTPException(status_code=500, detail=f"Arquivo de dados mock '{self.filename}' não encontrado.")
+        return dataset
+
+    async def search(self, term: Optional[str], cursor: Optional[str] = None,
+                     skip: int = 0, limit: int = 25, fields: Optional[Sequence[str]] = None,
+                     cod_especialidade: Optional[int] = None, **filtros: Any) -> Sequence:
+        dataset = self.dataset()
+        # Filtra por especialidade pelo índice COD_ESPECIALIDADE_FK, se fornecido
+        posicoes = dataset.index("COD_ESPECIALIDADE_FK").get(cod_especialidade, []) if cod_especialidade else None
+        results = dataset.search(term, self.search_fields, posicoes)
+        return keyset_slice(results, self.nome_key, self.pk_key, cursor, skip, limit)
+
+    async def export(self, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Sequence]:
+        linhas = sorted((
+            (row["COD_PROCEDIMENTO"], row["PROCEDIMENTO"], row.get("COD_ESPECIALIDADE_FK"))
+            for row in self.dataset().rows
+        ), key=lambda linha: (linha[0], linha[2] or 0))
+        completos, atual = agrupar_especialidades(linhas)
+        if atual is not None:
+            completos.append(atual)
+        for inicio in range(0, len(completos), settings.EXPORT_BATCH_SIZE):
+            yield completos[inicio:inicio + settings.EXPORT_BATCH_SIZE]
+
+    async def pares(self) -> List[List[int]]:
+        dataset = self.dataset()
+        pares = {
+            (esp, dataset.rows[pos]["COD_PROCEDIMENTO"])
+            for esp, posicoes in dataset.index("COD_ESPECIALIDADE_FK").items()
+            for pos in posicoes
+        }
+        return sorted([esp, proc] for esp, proc in pares)
+
+
+pacientes = MemoryRepository("pacientes.json", "NOME_PACIENTE", "PRONTUARIO_PAC",
+                             ["NOME_PACIENTE", "PRONTUARIO_PAC"])
+especialidades = MemoryRepository("especialidades.json", "NOME_ESPECIALIDADE", "COD_ESPECIALIDADE",
+                                  ["NOME_ESPECIALIDADE", "COD_ESPECIALIDADE"])
+profissionais = MemoryRepository("profissionais.json", "NOME_PROFISSIONAL", "MATRICULA",
+                                 ["NOME_PROFISSIONAL", "MATRICULA"])
+procedimentos = MemoryProcedimentoRepository("procedimentos.json", "PROCEDIMENTO", "COD_PROCEDIMENTO",
+                                             ["PROCEDIMENTO", "COD_PROCEDIMENTO"])
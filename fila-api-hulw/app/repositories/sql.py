@@ -0,0 +1,261 @@
+# app/repositories/sql.py
+"""
+Backend SQL dos repositórios (AGHU ou a réplica local de ``build_local_aghu.py``).
+
+O SQL é o mesmo nos dois bancos; a única diferença de dialeto tratada aqui é
+o ``ILIKE`` (Postgres), que no SQLite vira ``LIKE`` (já sem diferenciar
+maiúsculas em ASCII).
+"""
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import text
+
+from app.core.pagination import keyset_params, keyset_sql
+from app.db import session
+from app.repositories.base import CatalogRepository, ProcedimentoRepository, agrupar_especialidades
+from app.repositories.catalogo import catalogo_procedimentos
+
+
+def _ilike() -> str:
+    return "ILIKE" if session.engine.dialect.name == "postgresql" else "LIKE"
+
+
+def _binario(expr: str) -> str:
+    """
+    ``expr`` comparada por code point, como o ``sorted`` do Python (o
+    catálogo em memória). No Postgres a collation do banco (locale) ordena
+    diferente; no SQLite o padrão (BINARY) já é essa ordem.
+    """
+    return f'{expr} COLLATE "C"' if session.engine.dialect.name == "postgresql" else expr
+
+
+class SqlRepository(CatalogRepository):
+    """
+    Repositório SQL genérico, descrito por:
+    - ``name``: prefixo dos nomes lógicos das consultas nas métricas
+      (``<name>_search``, ``<name>_by_id``, ``<name>_export``);
+    - ``columns``: campo da resposta → expressão SQL (na ordem do schema);
+    - ``source``: ``FROM ... WHERE <condição base>``;
+    - ``search``: condição da busca textual (``{ilike}`` e ``:search_term``);
+    - ``nome_expr``/``pk_expr``: ordenação do cursor (nome nulo conta como
+      ``''``, ver ``keyset_sql``);
+    - ``by_id``: condição extra da consulta por chave primária (``:pk``).
+
+    Com ``fields``, o SELECT só traz as colunas pedidas (mais nome e chave,
+    que o cursor usa).
+    """
+
+    def __init__(self, name: str, columns: Dict[str, str], source: str, search: str, nome_expr: str, pk_expr: str,
+                 by_id: str, nome_key: str, pk_key: str):
+        self.name = name
+        self.columns = columns
+        self.source = source
+        self.search_cond = search
+        self.nome_expr = nome_expr
+        self.pk_expr = pk_expr
+        self.by_id = by_id
+        self.nome_key = nome_key
+        self.pk_key = pk_key
+
+    def _select(self, fields: Optional[Sequence[str]] = None) -> str:
+        campos = [
+            c for c in self.columns
+            if fields is None or c in fields or c in (self.nome_key, self.pk_key)
+        ]
+        colunas = ", ".join(f'{self.columns[c]} AS "{c}"' for c in campos)
+        return f"SELECT {colunas} {self.source}"
+
+    async def _search(self, name: str, select: str, search_cond: str, params: dict, term: Optional[str],
+                      cursor: Optional[str], skip: int, limit: int, nome_expr: str, pk_expr: str) -> Sequence:
+        query = select
+        params = {**params, **keyset_params(cursor, skip, limit)}
+        if term:
+            query += " AND " + search_cond.format(ilike=_ilike())
+            params["search_term"] = f"%{term}%"
+        where, order = keyset_sql(nome_expr, pk_expr, cursor)
+        return await session.fetch_all(text(query + where + order), params, name=name)
+
+    async def search(self, term: Optional[str], cursor: Optional[str] = None,
+                     skip: int = 0, limit: int = 25, fields: Optional[Sequence[str]] = None,
+                     **filtros: Any) -> Sequence:
+        return await self._search(f"{self.name}_search", self._select(fields), self.search_cond, {},
+                                  term, cursor, skip, limit, self.nome_expr, self.pk_expr)
+
+    async def get(self, pk: Any, fields: Optional[Sequence[str]] = None) -> Optional[Mapping]:
+        return await session.fetch_one(text(f"{self._select(fields)} AND {self.by_id}"), {"pk": pk},
+                                       name=f"{self.name}_by_id")
+
+    async def export(self, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Sequence]:
+        async for lote in session.stream_batches(text(f"{self._select(fields)} ORDER BY {self.pk_expr}"),
+                                                 name=f"{self.name}_export"):
+            yield lote
+
+
+class SqlProcedimentoRepository(SqlRepository, ProcedimentoRepository):
+    """
+    Com ``cod_especialidade``, lista os procedimentos da especialidade
+    (``aac_proced_hosp_especialidades``); sem, os procedimentos cirúrgicos ativos.
+
+    A listagem por especialidade, a consulta por código e os pares saem do
+    catálogo em memória (``catalogo.py``) quando ele já tem a resposta; o SQL
+    abaixo fica para o que não está lá.
+    """
+
+    select_especialidade = """
+        SELECT
+            phi.seq AS "COD_PROCEDIMENTO",
+            phi.descricao AS "PROCEDIMENTO"
+        FROM
+            agh.aac_proced_hosp_especialidades php
+        JOIN
+            agh.fat_proced_hosp_internos phi ON phi.seq = php.phi_seq
+        WHERE
+            php.ind_consulta = 'N'
+            AND php.esp_seq = :cod_especialidade
+    """
+    search_especialidade = "(phi.descricao {ilike} :search_term OR CAST(phi.seq AS TEXT) {ilike} :search_term)"
+
+    # Por código, unimos as duas fontes de procedimentos: assim um código
+    # retornado pela busca com filtro de especialidade também é encontrado aqui.
+    # (Só há dois campos, e os dois são nome/chave: não há o que projetar.)
+    union_by_id = """
+        SELECT * FROM (
+            SELECT
+                phi.seq AS "COD_PROCEDIMENTO",
+                phi.descricao AS "PROCEDIMENTO"
+            FROM agh.fat_proced_hosp_internos phi
+            WHERE phi.seq = :pk
+            UNION
+            SELECT
+                pro.seq AS "COD_PROCEDIMENTO",
+                pro.descricao AS "PROCEDIMENTO"
+            FROM agh.mbc_procedimento_cirurgicos pro
+            WHERE pro.ind_situacao = 'A' AND pro.seq = :pk
+        ) proc
+        LIMIT 1
+    """
+
+    # Exportação: os procedimentos das duas listagens (cirúrgicos ativos e os
+    # ligados a alguma especialidade), uma linha por par com especialidade,
+    # ordenada por código para o agrupamento em ESPECIALIDADES
+    export_query = """
+        SELECT pro.seq AS "COD_PROCEDIMENTO", pro.descricao AS "PROCEDIMENTO", php.esp_seq AS "COD_ESPECIALIDADE"
+        FROM agh.mbc_procedimento_cirurgicos pro
+        LEFT JOIN agh.aac_proced_hosp_especialidades php ON php.phi_seq = pro.seq AND php.ind_consulta = 'N'
+        WHERE pro.ind_situacao = 'A'
+        UNION
+        SELECT phi.seq, phi.descricao, php.esp_seq
+        FROM agh.aac_proced_hosp_especialidades php
+        JOIN agh.fat_proced_hosp_internos phi ON phi.seq = php.phi_seq
+        WHERE php.ind_consulta = 'N'
+          AND NOT EXISTS (
+              SELECT 1 FROM agh.mbc_procedimento_cirurgicos pro
+              WHERE pro.seq = phi.seq AND pro.ind_situacao = 'A'
+          )
+        ORDER BY 1, 3
+    """
+
+    async def search(self, term: Optional[str], cursor: Optional[str] = None,
+                     skip: int = 0, limit: int = 25, fields: Optional[Sequence[str]] = None,
+                     cod_especialidade: Optional[int] = None, **filtros: Any) -> Sequence:
+        if not cod_especialidade:
+            return await super().search(term, cursor, skip, limit, fields)
+        catalogo = catalogo_procedimentos.atual
+        if catalogo is not None and cod_especialidade in catalogo.por_especialidade:
+            return catalogo.pagina(cod_especialidade, term, cursor, skip, limit)
+        return await self._search("procedimentos_by_especialidade", self.select_especialidade,
+                                  self.search_especialidade,
+                                  {"cod_especialidade": cod_especialidade}, term, cursor, skip, limit,
+                                  # Mesma ordem do catálogo: o cursor passa de um para o outro
+                                  _binario("phi.descricao"), "phi.seq")
+
+    async def get(self, pk: Any, fields: Optional[Sequence[str]] = None) -> Optional[Mapping]:
+        catalogo = catalogo_procedimentos.atual
+        item = catalogo.por_codigo.get(pk) if catalogo is not None else None
+        if item is not None:
+            return item
+        return await session.fetch_one(text(self.union_by_id), {"pk": pk}, name="procedimentos_by_id")
+
+    async def export(self, fields: Optional[Sequence[str]] = None) -> AsyncIterator[Sequence]:
+        atual = None
+        async for lote in session.stream_batches(text(self.export_query), name="procedimentos_export"):
+            completos, atual = agrupar_especialidades(lote, atual)
+            if completos:
+                yield completos
+        if atual is not None:
+            yield [atual]
+
+    async def pares(self) -> List[List[int]]:
+        if catalogo_procedimentos.atual is not None:
+            return catalogo_procedimentos.atual.pares
+        rows = await session.fetch_all(text("""
+            SELECT DISTINCT
+                php.esp_seq AS "COD_ESPECIALIDADE",
+                php.phi_seq AS "COD_PROCEDIMENTO"
+            FROM
+                agh.aac_proced_hosp_especialidades php
+            WHERE
+                php.ind_consulta = 'N'
+            ORDER BY 1, 2
+        """), name="procedimentos_pares")
+        return [[row[0], row[1]] for row in rows]
+
+
+pacientes = SqlRepository(
+    name="pacientes",
+    columns={
+        "NOME_PACIENTE": "pac.nome",
+        "PRONTUARIO_PAC": "pac.prontuario",
+        "DDD_FONE_RESIDENCIAL": "pac.ddd_fone_residencial",
+        "FONE_RESIDENCIAL": "pac.fone_residencial",
+        "DDD_FONE_RECADO": "pac.ddd_fone_recado",
+        "FONE_RECADO": "pac.fone_recado",
+    },
+    source="FROM agh.aip_pacientes pac WHERE TRUE",
+    search="(pac.nome {ilike} :search_term OR CAST(pac.prontuario AS TEXT) {ilike} :search_term)",
+    nome_expr="pac.nome", pk_expr="pac.prontuario",
+    by_id="pac.prontuario = :pk",
+    nome_key="NOME_PACIENTE", pk_key="PRONTUARIO_PAC",
+)
+
+especialidades = SqlRepository(
+    name="especialidades",
+    columns={
+        "COD_ESPECIALIDADE": "esp.seq",
+        "NOME_ESPECIALIDADE": "esp.nome_especialidade",
+    },
+    source="FROM agh.agh_especialidades esp WHERE esp.ind_situacao = 'A'",
+    search="(esp.nome_especialidade {ilike} :search_term OR CAST(esp.seq AS TEXT) {ilike} :search_term)",
+    nome_expr="esp.nome_especialidade", pk_expr="esp.seq",
+    by_id="esp.seq = :pk",
+    nome_key="NOME_ESPECIALIDADE", pk_key="COD_ESPECIALIDADE",
+)
+
+profissionais = SqlRepository(
+    name="profissionais",
+    columns={
+        "NOME_PROFISSIONAL": "pes.nome",
+        "MATRICULA": "serv.matricula",
+    },
+    source="""
+        FROM agh.rap_servidores serv LEFT JOIN agh.rap_pessoas_fisicas pes ON pes.codigo = serv.pes_codigo
+        WHERE serv.ind_situacao = 'A'
+    """,
+    search="(pes.nome {ilike} :search_term OR CAST(serv.matricula AS TEXT) {ilike} :search_term)",
+    nome_expr="pes.nome", pk_expr="serv.matricula",
+    by_id="serv.matricula = :pk",
+    nome_key="NOME_PROFISSIONAL", pk_key="MATRICULA",
+)
+
+procedimentos = SqlProcedimentoRepository(
+    name="procedimentos",
+    columns={
+        "COD_PROCEDIMENTO": "pro.seq",
+        "PROCEDIMENTO": "pro.descricao",
+    },
+    source="FROM agh.mbc_procedimento_cirurgicos pro WHERE pro.ind_situacao = 'A'",
+    search="(pro.descricao {ilike} :search_term OR CAST(pro.seq AS TEXT) {ilike} :search_term)",
+    nome_expr="pro.descricao", pk_expr="pro.seq",
+    by_id="pro.seq = :pk",
+    nome_key="PROCEDIMENTO", pk_key="COD_PROCEDIMENTO",
+)
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel
 
 class Procedimento(BaseModel):
@@ -5,4 +7,8 @@ class Procedimento(BaseModel):
     PROCEDIMENTO: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProcedimentoExport(Procedimento):
+    """Linha da exportação NDJSON: o procedimento e as especialidades dele."""
+    ESPECIALIDADES: List[int] = []
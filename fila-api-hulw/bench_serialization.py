@@ -0,0 +1,98 @@
+"""
+Benchmark da serialização das listagens: custo por 1.000 linhas.
+
+Compara, sobre ``Row`` reais do SQLAlchemy (SQLite em memória, dados de
+app/db/synthetic.py):
+  - padrão do FastAPI: valida cada linha no ``response_model``, serializa
+    em modo JSON e codifica com ``json`` (o que o endpoint fazia antes);
+  - caminho rápido (app/core/serialization.py): Row → dict + ``dumps``,
+    com orjson (se instalado) e com o ``json`` da stdlib.
+
+Uso: python bench_serialization.py [--linhas 50000] [--repeticoes 5]
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, text
+
+from app.core import serialization
+from app.db import synthetic
+from app.schemas.paciente import Paciente
+
+
+def _linhas(n: int):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE aip_pacientes (prontuario INTEGER PRIMARY KEY, nome TEXT,
+                ddd_fone_residencial TEXT, fone_residencial TEXT, ddd_fone_recado TEXT, fone_recado TEXT)
+        """))
+        conn.execute(
+            text("INSERT INTO aip_pacientes VALUES (:PRONTUARIO_PAC, :NOME_PACIENTE, :DDD_FONE_RESIDENCIAL,"
+                 " :FONE_RESIDENCIAL, :DDD_FONE_RECADO, :FONE_RECADO)"),
+            list(synthetic.pacientes(n, seed=1)),
+        )
+        return conn.execute(text("""
+            SELECT pac.nome AS "NOME_PACIENTE", pac.prontuario AS "PRONTUARIO_PAC",
+                   pac.ddd_fone_residencial AS "DDD_FONE_RESIDENCIAL", pac.fone_residencial AS "FONE_RESIDENCIAL",
+                   pac.ddd_fone_recado AS "DDD_FONE_RECADO", pac.fone_recado AS "FONE_RECADO"
+            FROM aip_pacientes pac ORDER BY pac.nome, pac.prontuario
+        """)).fetchall()
+
+
+_adapter = TypeAdapter(List[Paciente])
+
+
+def caminho_padrao(rows) -> bytes:
+    validado = _adapter.validate_python(rows, from_attributes=True)
+    conteudo = _adapter.dump_python(validado, mode="json")
+    return json.dumps(conteudo, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def caminho_rapido(rows) -> bytes:
+    return serialization.dumps(serialization.rows_to_dicts(rows, Paciente))
+
+
+def caminho_rapido_stdlib(rows) -> bytes:
+    orjson, serialization.orjson = serialization.orjson, None
+    try:
+        return caminho_rapido(rows)
+    finally:
+        serialization.orjson = orjson
+
+
+def medir(nome, func, rows, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func(rows)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    por_mil = melhor / len(rows) * 1000 * 1000
+    print(f"{nome:<32} {por_mil:8.2f} ms / 1.000 linhas")
+    return por_mil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=50000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = _linhas(args.linhas)
+    assert json.loads(caminho_padrao(rows[:100])) == json.loads(caminho_rapido(rows[:100]))
+
+    print(f"{len(rows)} linhas, melhor de {args.repeticoes} execuções\n")
+    antes = medir("padrão (pydantic + json)", caminho_padrao, rows, args.repeticoes)
+    if serialization.orjson is not None:
+        depois = medir("rápido (dict + orjson)", caminho_rapido, rows, args.repeticoes)
+    else:
+        depois = None
+    stdlib = medir("rápido (dict + json stdlib)", caminho_rapido_stdlib, rows, args.repeticoes)
+    print(f"\nGanho: {antes / (depois or stdlib):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
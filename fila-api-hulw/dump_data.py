@@ -1,104 +1,154 @@
+"""
+Exporta um retrato do AGHU para os dados mock da API (JSON Lines).
+
+Uma consulta por conjunto, lida em stream (cursor do lado do servidor) e
+gravada linha a linha, já sem duplicatas: nada fica inteiro em memória além
+das chaves já vistas. O limite de procedimentos por especialidade é aplicado
+no próprio SQL (``ROW_NUMBER() OVER (PARTITION BY esp_seq)``).
+
+Exemplos:
+    python dump_data.py                                   # tamanhos padrão, em app/db/mock_data
+    python dump_data.py --pacientes 500000 --saida /tmp/retrato
+    python dump_data.py --url sqlite:///./aghu_local.db   # réplica de build_local_aghu.py
+
+Tamanho 0 = sem limite. O modo mock lê ``<nome>.jsonl`` antes de ``<nome>.json``.
+"""
+import argparse
 import os
-import json
+import time
+from typing import Dict, Iterator, Tuple
+
 from sqlalchemy import create_engine, text
-from app.core.config import settings
 
-# --- CONFIGURAÇÃO ---
-# Número de registros a serem exportados de cada tabela
-ROW_LIMIT = 300
-# Diretório de saída para os arquivos JSON
-OUTPUT_DIR = "app/db/mock_data"
+from app.db import aghu_local
+from app.db.synthetic import escrever_jsonl
+
+
+def _limite(n: int) -> str:
+    return " LIMIT :limite" if n else ""
+
+
+ESPECIALIDADES = """
+    SELECT esp.seq AS "COD_ESPECIALIDADE", esp.nome_especialidade AS "NOME_ESPECIALIDADE"
+    FROM agh.agh_especialidades esp
+    WHERE esp.ind_situacao = 'A'
+    ORDER BY esp.seq
+"""
+
+# Os N primeiros procedimentos (por código) de cada uma das especialidades
+# exportadas, numa consulta só
+PROCEDIMENTOS = """
+    WITH esp AS (
+        SELECT esp.seq
+        FROM agh.agh_especialidades esp
+        WHERE esp.ind_situacao = 'A'
+        ORDER BY esp.seq{limite_esp}
+    ),
+    numerados AS (
+        SELECT
+            phi.seq AS cod,
+            phi.descricao AS descricao,
+            php.esp_seq AS esp_seq,
+            ROW_NUMBER() OVER (PARTITION BY php.esp_seq ORDER BY phi.seq) AS n
+        FROM agh.aac_proced_hosp_especialidades php
+        JOIN esp ON esp.seq = php.esp_seq
+        JOIN agh.fat_proced_hosp_internos phi ON phi.seq = php.phi_seq
+        WHERE php.ind_consulta = 'N'
+    )
+    SELECT cod AS "COD_PROCEDIMENTO", descricao AS "PROCEDIMENTO", esp_seq AS "COD_ESPECIALIDADE_FK"
+    FROM numerados
+    {filtro}
+    ORDER BY esp_seq, cod
+"""
 
-# Garante que o diretório de saída exista
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+PROFISSIONAIS = """
+    SELECT serv.matricula AS "MATRICULA", pes.nome AS "NOME_PROFISSIONAL", serv.matricula AS "PROF_RESPONSAVEL"
+    FROM agh.rap_servidores serv
+    LEFT JOIN agh.rap_pessoas_fisicas pes ON pes.codigo = serv.pes_codigo
+    WHERE serv.ind_situacao = 'A'
+    ORDER BY pes.nome, serv.matricula
+"""
 
-def export_data():
-    print("Iniciando a exportação de dados do banco...")
+PACIENTES = """
+    SELECT
+        pac.nome AS "NOME_PACIENTE", pac.prontuario AS "PRONTUARIO_PAC",
+        pac.ddd_fone_residencial AS "DDD_FONE_RESIDENCIAL",
+        pac.fone_residencial AS "FONE_RESIDENCIAL",
+        pac.ddd_fone_recado AS "DDD_FONE_RECADO",
+        pac.fone_recado AS "FONE_RECADO"
+    FROM agh.aip_pacientes pac
+    ORDER BY pac.prontuario
+"""
 
-    engine = create_engine(str(settings.DATABASE_URL))
-    all_data_to_write = {}
 
+def consultas(args) -> Dict[str, Tuple[str, dict, Tuple[str, ...]]]:
+    """Conjunto → (SQL, parâmetros, campos da chave de deduplicação)."""
+    procedimentos = PROCEDIMENTOS.format(
+        limite_esp=" LIMIT :limite_esp" if args.especialidades else "",
+        filtro="WHERE n <= :por_especialidade" if args.procedimentos_por_especialidade else "",
+    )
+    return {
+        "especialidades": (ESPECIALIDADES + _limite(args.especialidades),
+                           {"limite": args.especialidades}, ("COD_ESPECIALIDADE",)),
+        "procedimentos": (procedimentos,
+                          {"limite_esp": args.especialidades,
+                           "por_especialidade": args.procedimentos_por_especialidade},
+                          ("COD_PROCEDIMENTO", "COD_ESPECIALIDADE_FK")),
+        "profissionais": (PROFISSIONAIS + _limite(args.profissionais),
+                          {"limite": args.profissionais}, ("MATRICULA",)),
+        "pacientes": (PACIENTES + _limite(args.pacientes),
+                      {"limite": args.pacientes}, ("PRONTUARIO_PAC",)),
+    }
+
+
+def linhas_unicas(conn, sql: str, params: dict, chave: Tuple[str, ...], batch_size: int,
+                  contagem: dict) -> Iterator[Dict]:
+    """Linhas da consulta em stream, pulando as de chave repetida."""
+    vistas = set()
+    result = conn.execution_options(yield_per=batch_size).execute(text(sql), params)
+    for row in result.mappings():
+        valor = tuple(row[c] for c in chave)
+        if valor in vistas:
+            contagem["duplicadas"] += 1
+            continue
+        vistas.add(valor)
+        yield dict(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta os dados mock (JSON Lines) a partir do AGHU.")
+    parser.add_argument("--url", help="URL síncrona do banco (padrão: o Postgres do .env)")
+    parser.add_argument("--saida", default="app/db/mock_data", help="Diretório de saída")
+    parser.add_argument("--especialidades", type=int, default=100)
+    parser.add_argument("--procedimentos-por-especialidade", type=int, default=100)
+    parser.add_argument("--profissionais", type=int, default=300)
+    parser.add_argument("--pacientes", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Linhas por ida ao cursor do servidor")
+    args = parser.parse_args()
+
+    if args.url:
+        url = args.url
+    else:
+        from app.core.config import settings
+        url = settings.DATABASE_URL
+
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        aghu_local.instalar_schema_sqlite(engine, url)
+    os.makedirs(args.saida, exist_ok=True)
+
+    inicio_total = time.perf_counter()
     with engine.connect() as conn:
-        # 1. Buscar as 100 primeiras especialidades ativas
-        print("Buscando até 100 especialidades ativas...")
-        especialidades_query = text("""
-            SELECT esp.seq AS "COD_ESPECIALIDADE", esp.nome_especialidade AS "NOME_ESPECIALIDADE"
-            FROM agh.agh_especialidades esp
-            WHERE esp.ind_situacao = 'A'
-            ORDER BY esp.seq
-            FETCH FIRST 100 ROWS ONLY
-        """)
-        result_especialidades = conn.execute(especialidades_query)
-        especialidades_data = [dict(row._mapping) for row in result_especialidades]
-        all_data_to_write["especialidades.json"] = especialidades_data
-        print(f"-> {len(especialidades_data)} especialidades ativas encontradas.")
-
-        # 2. Para cada especialidade, buscar até 100 procedimentos associados
-        procedimentos_list = []
-
-        procedimentos_query_template = text("""
-            SELECT
-                phi.seq AS "COD_PROCEDIMENTO",
-                phi.descricao AS "PROCEDIMENTO",
-                php.esp_seq AS "COD_ESPECIALIDADE_FK"
-            FROM agh.aac_proced_hosp_especialidades php
-            JOIN agh.fat_proced_hosp_internos phi ON phi.seq = php.phi_seq
-            WHERE php.ind_consulta = 'N'
-              AND php.esp_seq = :esp_seq
-            ORDER BY phi.seq
-            FETCH FIRST 100 ROWS ONLY
-        """)
-
-        for esp in especialidades_data:
-            esp_seq = esp["COD_ESPECIALIDADE"]
-            print(f"Buscando procedimentos para especialidade {esp_seq} - {esp['NOME_ESPECIALIDADE']}...")
-            result_procedimentos = conn.execute(procedimentos_query_template, {"esp_seq": esp_seq})
-            procedimentos_data = [dict(row._mapping) for row in result_procedimentos]
-            procedimentos_list.extend(procedimentos_data)
-            print(f"-> {len(procedimentos_data)} procedimentos encontrados para especialidade {esp_seq}")
-
-        all_data_to_write["procedimentos.json"] = procedimentos_list
-
-        # 3. Exportar outras tabelas independentes (profissionais, pacientes) como antes
-        INDEPENDENT_QUERIES = {
-            "profissionais.json": """
-                SELECT serv.matricula AS "MATRICULA", pes.nome AS "NOME_PROFISSIONAL", serv.matricula AS "PROF_RESPONSAVEL"
-                FROM agh.rap_servidores serv
-                LEFT JOIN agh.rap_pessoas_fisicas pes ON pes.codigo = serv.pes_codigo
-                WHERE serv.ind_situacao = 'A'
-                ORDER BY pes.nome
-                FETCH FIRST :limit ROWS ONLY
-            """,
-            "pacientes.json": """
-                SELECT
-                    pac.nome AS "NOME_PACIENTE", pac.prontuario AS "PRONTUARIO_PAC",
-                    pac.ddd_fone_residencial AS "DDD_FONE_RESIDENCIAL",
-                    pac.fone_residencial AS "FONE_RESIDENCIAL",
-                    pac.ddd_fone_recado AS "DDD_FONE_RECADO",
-                    pac.fone_recado AS "FONE_RECADO"
-                FROM agh.aip_pacientes pac
-                ORDER BY pac.prontuario
-                FETCH FIRST :limit ROWS ONLY
-            """
-        }
-
-        for filename, query_str in INDEPENDENT_QUERIES.items():
-            print(f"Exportando dados para {filename}...")
-            query = text(query_str)
-            result = conn.execute(query, {"limit": ROW_LIMIT})
-            data = [dict(row._mapping) for row in result]
-            all_data_to_write[filename] = data
-            print(f"-> {len(data)} registros encontrados para {filename}.")
-
-    # 4. Salvar os arquivos JSON
-    print("\nSalvando arquivos JSON...")
-    for filename, data in all_data_to_write.items():
-        filepath = os.path.join(OUTPUT_DIR, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        print(f"-> Arquivo salvo: {filepath}")
-
-    print("\nExportação concluída com sucesso!")
+        for nome, (sql, params, chave) in consultas(args).items():
+            caminho = os.path.join(args.saida, f"{nome}.jsonl")
+            contagem = {"duplicadas": 0}
+            inicio = time.perf_counter()
+            total = escrever_jsonl(linhas_unicas(conn, sql, params, chave, args.batch_size, contagem), caminho)
+            print(f"-> {caminho}: {total} registros ({contagem['duplicadas']} duplicados ignorados) "
+                  f"em {time.perf_counter() - inicio:.1f}s")
+
+    print(f"\nExportação concluída em {time.perf_counter() - inicio_total:.1f}s.")
+
 
 if __name__ == "__main__":
-    export_data()
\ No newline at end of file
+    main()
@@ -0,0 +1,44 @@
+"""
+Gera dados sintéticos (JSON Lines) para o modo mock da API.
+
+Exemplos:
+    python generate_mock_data.py --seed 42 --pacientes 2000000 --saida /tmp/mock_grande
+    MOCK_DATA_DIR=/tmp/mock_grande USE_MOCK_DATA=true uvicorn app.main:app
+
+Com a mesma seed e os mesmos tamanhos, a saída é sempre idêntica. O modo
+mock lê ``<nome>.jsonl`` quando existe e, senão, o ``<nome>.json`` de sempre.
+"""
+import argparse
+import os
+import time
+
+from app.db.synthetic import escrever_jsonl, gerar_conjuntos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no formato do AGHU (JSON Lines).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--especialidades", type=int, default=30)
+    parser.add_argument("--procedimentos-por-especialidade", type=int, default=40)
+    parser.add_argument("--profissionais", type=int, default=1000)
+    parser.add_argument("--pacientes", type=int, default=100000)
+    parser.add_argument("--saida", default="app/db/mock_data_sintetico", help="Diretório de saída")
+    args = parser.parse_args()
+
+    os.makedirs(args.saida, exist_ok=True)
+    conjuntos = gerar_conjuntos(
+        seed=args.seed,
+        n_especialidades=args.especialidades,
+        procedimentos_por_especialidade=args.procedimentos_por_especialidade,
+        n_profissionais=args.profissionais,
+        n_pacientes=args.pacientes,
+    )
+    for nome, linhas in conjuntos.items():
+        caminho = os.path.join(args.saida, f"{nome}.jsonl")
+        inicio = time.perf_counter()
+        total = escrever_jsonl(linhas, caminho)
+        print(f"-> {caminho}: {total} registros em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
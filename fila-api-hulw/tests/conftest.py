@@ -0,0 +1,27 @@
+# tests/conftest.py
+"""
+Os testes rodam no modo mock (``USE_MOCK_DATA``), sobre os JSON de
+``app/db/mock_data``: sem Postgres. As variáveis precisam existir antes do
+primeiro import de ``app.core.config``.
+"""
+import os
+import sys
+
+os.environ.setdefault("POSTGRES_DB", "teste")
+os.environ.setdefault("POSTGRES_USER", "teste")
+os.environ.setdefault("POSTGRES_PASSWORD", "teste")
+os.environ["USE_MOCK_DATA"] = "true"
+os.environ.setdefault("METRICS_ALLOWED_HOSTS", "*")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,59 @@
+import pytest
+
+from app.core.cache import response_cache
+
+URL = "/api/v1/especialidades/"
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    response_cache.invalidate()
+    yield
+    response_cache.invalidate()
+
+
+def test_segunda_leitura_vem_do_cache_com_o_mesmo_etag(client):
+    primeira = client.get(URL, params={"limit": 2})
+    segunda = client.get(URL, params={"limit": 2})
+    assert (primeira.status_code, segunda.status_code) == (200, 200)
+    assert (primeira.headers["x-cache"], segunda.headers["x-cache"]) == ("MISS", "HIT")
+    assert primeira.headers["etag"] == segunda.headers["etag"]
+    assert primeira.content == segunda.content
+    assert primeira.headers["cache-control"].startswith("public, max-age=")
+    # O cursor da paginação também é guardado
+    assert segunda.headers["x-next-cursor"] == primeira.headers["x-next-cursor"]
+
+
+def test_ordem_da_query_nao_muda_a_chave(client):
+    client.get(URL, params=[("limit", 2), ("skip", 1)])
+    assert client.get(URL, params=[("skip", 1), ("limit", 2)]).headers["x-cache"] == "HIT"
+
+
+@pytest.mark.parametrize("formato", ["{}", "W/{}", '"outro", {}', "*"])
+def test_if_none_match_confere_responde_304(client, formato):
+    etag = client.get(URL, params={"limit": 2}).headers["etag"]
+    resposta = client.get(URL, params={"limit": 2}, headers={"If-None-Match": formato.format(etag)})
+    assert resposta.status_code == 304
+    assert resposta.content == b""
+    assert resposta.headers["etag"] == etag
+
+
+def test_if_none_match_na_primeira_leitura(client):
+    etag = client.get(URL, params={"limit": 2}).headers["etag"]
+    response_cache.invalidate("especialidades")
+    resposta = client.get(URL, params={"limit": 2}, headers={"If-None-Match": etag})
+    assert (resposta.status_code, resposta.headers["x-cache"]) == (304, "MISS")
+
+
+def test_etag_diferente_recebe_o_corpo(client):
+    client.get(URL, params={"limit": 2})
+    resposta = client.get(URL, params={"limit": 2}, headers={"If-None-Match": '"outro"'})
+    assert resposta.status_code == 200
+    assert resposta.json()
+
+
+def test_fora_das_regras_e_erros_nao_entram_no_cache(client):
+    assert "etag" not in client.get("/api/v1/especialidades/export").headers
+    assert client.get("/api/v1/especialidades/999999999").status_code == 404
+    assert client.get("/api/v1/especialidades/999999999").headers.get("x-cache") is None
+    assert response_cache.stats()["entries"] == 0
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import encode_cursor
+from app.repositories.catalogo import Catalogo, _chave
+
+
+def _catalogo(nomes):
+    itens = [{"COD_PROCEDIMENTO": cod, "PROCEDIMENTO": nome} for cod, nome in enumerate(nomes, start=1)]
+    return Catalogo(
+        {item["COD_PROCEDIMENTO"]: item for item in itens},
+        {10: sorted(itens, key=_chave)},
+    )
+
+
+NOMES = ["Ápice", "apendicectomia", "Zeta", "abdome", "Érnia", None, "Biópsia", "biópsia"]
+
+
+def _percorrer(catalogo, limit, term=None):
+    vistos, cursor = [], None
+    while True:
+        pagina = catalogo.pagina(10, term, cursor, 0, limit)
+        vistos += [item["COD_PROCEDIMENTO"] for item in pagina[:limit]]
+        if len(pagina) <= limit:
+            return vistos
+        ultima = pagina[limit - 1]
+        cursor = encode_cursor(ultima["PROCEDIMENTO"] or "", ultima["COD_PROCEDIMENTO"])
+
+
+def test_paginas_pelo_cursor_cobrem_a_especialidade_uma_vez():
+    catalogo = _catalogo(NOMES)
+    esperado = [item["COD_PROCEDIMENTO"] for item in catalogo.por_especialidade[10]]
+    for limit in (1, 2, 3, 7):
+        assert _percorrer(catalogo, limit) == esperado
+
+
+def test_ordem_por_code_point():
+    # A ordem do SQL de fallback (COLLATE "C" / BINARY): maiúsculas antes de
+    # minúsculas e acentuadas depois de tudo em ASCII
+    catalogo = _catalogo(NOMES)
+    nomes = [item["PROCEDIMENTO"] for item in catalogo.por_especialidade[10]]
+    assert nomes == [None, "Biópsia", "Zeta", "abdome", "apendicectomia", "biópsia", "Ápice", "Érnia"]
+
+
+def test_busca_com_cursor():
+    catalogo = _catalogo(NOMES)
+    assert _percorrer(catalogo, 1, term="bióp") == [7, 8]
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor(1, "x"), encode_cursor("a", None), "%%%"])
+def test_cursor_forjado_e_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _catalogo(NOMES).pagina(10, None, cursor, 0, 5)
+    assert exc.value.status_code == 400
@@ -0,0 +1,68 @@
+import sys
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine
+
+import dump_data
+from app.db import aghu_local
+from app.db.synthetic import caminho_dataset, ler_jsonl
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """Réplica SQLite pequena do AGHU."""
+    url = f"sqlite:///{tmp_path / 'aghu.db'}"
+    engine = create_engine(url)
+    aghu_local.instalar_schema_sqlite(engine, url)
+    with engine.begin() as conn:
+        aghu_local.povoar(conn, seed=1, n_especialidades=5, procedimentos_por_especialidade=6,
+                          n_profissionais=20, n_pacientes=30, log=lambda *a: None)
+    engine.dispose()
+    return url
+
+
+def _exportar(monkeypatch, url, saida, *args):
+    monkeypatch.setattr(sys, "argv", ["dump_data.py", "--url", url, "--saida", str(saida), "--batch-size", "4", *args])
+    dump_data.main()
+    return {nome: list(ler_jsonl(caminho_dataset(str(saida), nome)))
+            for nome in ("especialidades", "procedimentos", "profissionais", "pacientes")}
+
+
+def test_limites_aplicados_no_sql(replica, tmp_path, monkeypatch, capsys):
+    dados = _exportar(monkeypatch, replica, tmp_path / "saida", "--especialidades", "3",
+                      "--procedimentos-por-especialidade", "2", "--profissionais", "0", "--pacientes", "10")
+
+    especialidades = [e["COD_ESPECIALIDADE"] for e in dados["especialidades"]]
+    assert especialidades == sorted(especialidades) and len(especialidades) == 3
+
+    por_especialidade = Counter(p["COD_ESPECIALIDADE_FK"] for p in dados["procedimentos"])
+    assert set(por_especialidade) == set(especialidades)
+    assert set(por_especialidade.values()) == {2}
+
+    assert len(dados["profissionais"]) == 20  # 0 = sem limite
+    prontuarios = [p["PRONTUARIO_PAC"] for p in dados["pacientes"]]
+    assert prontuarios == sorted(prontuarios) and len(prontuarios) == 10
+    assert "-> " in capsys.readouterr().out
+
+
+def test_zero_e_sem_limite(replica, tmp_path, monkeypatch):
+    dados = _exportar(monkeypatch, replica, tmp_path / "saida", "--especialidades", "0",
+                      "--procedimentos-por-especialidade", "0", "--profissionais", "0", "--pacientes", "0")
+
+    pares = [(p["COD_PROCEDIMENTO"], p["COD_ESPECIALIDADE_FK"]) for p in dados["procedimentos"]]
+    assert len(pares) == len(set(pares)) == 5 * 6
+    assert (len(dados["especialidades"]), len(dados["pacientes"])) == (5, 30)
+
+
+def test_linhas_repetidas_sao_puladas_no_stream():
+    engine = create_engine("sqlite://")
+    sql = """
+        SELECT 1 AS cod, 10 AS esp UNION ALL SELECT 1, 20 UNION ALL SELECT 1, 10
+        UNION ALL SELECT 2, 10 UNION ALL SELECT 1, 20
+    """
+    contagem = {"duplicadas": 0}
+    with engine.connect() as conn:
+        linhas = list(dump_data.linhas_unicas(conn, sql, {}, ("cod", "esp"), 2, contagem))
+    assert linhas == [{"cod": 1, "esp": 10}, {"cod": 1, "esp": 20}, {"cod": 2, "esp": 10}]
+    assert contagem == {"duplicadas": 2}
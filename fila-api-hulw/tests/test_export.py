@@ -0,0 +1,42 @@
+import json
+
+from app.core.config import settings
+from app.core.export import NDJSON_MEDIA_TYPE
+from app.repositories.base import agrupar_especialidades
+
+
+def _linhas(resposta):
+    return [json.loads(linha) for linha in resposta.text.splitlines()]
+
+
+def test_agrupar_especialidades_entre_lotes():
+    completos, atual = agrupar_especialidades([(1, "A", 10), (1, "A", 20), (2, "B", None)])
+    assert completos == [{"COD_PROCEDIMENTO": 1, "PROCEDIMENTO": "A", "ESPECIALIDADES": [10, 20]}]
+    assert atual == {"COD_PROCEDIMENTO": 2, "PROCEDIMENTO": "B", "ESPECIALIDADES": []}
+
+    # O próximo lote continua o procedimento que ficou em aberto
+    completos, atual = agrupar_especialidades([(2, "B", 30), (2, "B", 30), (3, "C", 10)], atual)
+    assert completos == [{"COD_PROCEDIMENTO": 2, "PROCEDIMENTO": "B", "ESPECIALIDADES": [30]}]
+    assert atual["COD_PROCEDIMENTO"] == 3
+
+
+def test_export_de_procedimentos_uma_linha_por_procedimento(client, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 7)  # vários lotes no stream
+    resposta = client.get("/api/v1/procedimentos/export")
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+
+    itens = _linhas(resposta)
+    codigos = [item["COD_PROCEDIMENTO"] for item in itens]
+    assert codigos == sorted(set(codigos))
+    assert all(set(item) == {"COD_PROCEDIMENTO", "PROCEDIMENTO", "ESPECIALIDADES"} for item in itens)
+    assert all(isinstance(item["ESPECIALIDADES"], list) for item in itens)
+
+    pares = {tuple(par) for par in client.get("/api/v1/procedimentos/pares-especialidade").json()}
+    assert pares == {(esp, item["COD_PROCEDIMENTO"]) for item in itens for esp in item["ESPECIALIDADES"]}
+
+
+def test_export_com_fields(client):
+    itens = _linhas(client.get("/api/v1/especialidades/export", params={"fields": "autocomplete"}))
+    assert itens and all(len(item) == 2 for item in itens)
+    assert client.get("/api/v1/especialidades/export", params={"fields": "nao_existe"}).status_code == 400
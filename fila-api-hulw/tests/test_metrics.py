@@ -0,0 +1,27 @@
+from app.core.cache import response_cache
+
+
+def _serie(texto, metrica, rota):
+    for linha in texto.splitlines():
+        if linha.startswith(metrica + "{") and f'route="{rota}"' in linha and 'status="200"' in linha:
+            return float(linha.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def _hits():
+    return sum(ns.get("hits", 0) for ns in response_cache.stats()["namespaces"].values())
+
+
+def test_hits_do_cache_contam_na_rota(client):
+    url = "/api/v1/especialidades/"
+    antes = client.get("/metrics").text
+    hits = _hits()
+    primeira = client.get(url, params={"limit": 3, "q": "metricas-cache"})
+    segunda = client.get(url, params={"limit": 3, "q": "metricas-cache"})
+    assert primeira.status_code == segunda.status_code == 200
+    assert _hits() == hits + 1  # a segunda veio do cache, sem passar pelo roteamento
+    depois = client.get("/metrics").text
+
+    metrica = "fila_api_http_requests_total"
+    assert _serie(depois, metrica, url) - _serie(antes, metrica, url) == 2
+    assert 'route="<sem rota>"' not in depois
@@ -0,0 +1,70 @@
+import json
+import os
+
+from app.db.mock_service import MockRepository
+
+PROCEDIMENTOS = [
+    {"COD_PROCEDIMENTO": 1, "PROCEDIMENTO": "Apendicectomia", "COD_ESPECIALIDADE_FK": 10},
+    {"COD_PROCEDIMENTO": 2, "PROCEDIMENTO": "Colecistectomia", "COD_ESPECIALIDADE_FK": 10},
+    {"COD_PROCEDIMENTO": 1, "PROCEDIMENTO": "Apendicectomia", "COD_ESPECIALIDADE_FK": 20},
+]
+
+
+def _gravar(diretorio, nome, linhas, mtime=None):
+    caminho = os.path.join(diretorio, nome)
+    with open(caminho, "w", encoding="utf-8") as f:
+        if nome.endswith(".jsonl"):
+            f.writelines(json.dumps(linha) + "\n" for linha in linhas)
+        else:
+            json.dump(linhas, f)
+    if mtime is not None:
+        os.utime(caminho, (mtime, mtime))
+    return caminho
+
+
+def test_indices_pela_chave_e_pelo_fk(tmp_path):
+    _gravar(tmp_path, "procedimentos.json", PROCEDIMENTOS)
+    repo = MockRepository(str(tmp_path))
+    dataset = repo.dataset("procedimentos.json")
+
+    # Montados na carga; chave repetida vale a primeira ocorrência
+    assert repo.status()["procedimentos.json"]["indexes"] == ["COD_ESPECIALIDADE_FK", "COD_PROCEDIMENTO"]
+    assert dataset.get("COD_PROCEDIMENTO", 1) == PROCEDIMENTOS[0]
+    assert dataset.get("COD_PROCEDIMENTO", "2")["PROCEDIMENTO"] == "Colecistectomia"  # "2" → 2
+    assert dataset.get("COD_PROCEDIMENTO", 99) is None
+    assert [r["COD_PROCEDIMENTO"] for r in dataset.lookup("COD_ESPECIALIDADE_FK", "10")] == [1, 2]
+
+
+def test_busca_sem_diferenciar_maiusculas(tmp_path):
+    _gravar(tmp_path, "procedimentos.json", PROCEDIMENTOS)
+    dataset = MockRepository(str(tmp_path)).dataset("procedimentos.json")
+    campos = ["PROCEDIMENTO", "COD_PROCEDIMENTO"]
+
+    assert [r["COD_PROCEDIMENTO"] for r in dataset.search("COLE", campos)] == [2]
+    assert len(dataset.search(None, campos)) == 3
+    # Restrita às posições do índice
+    posicoes = dataset.index("COD_ESPECIALIDADE_FK")[20]
+    assert dataset.search("apendi", campos, posicoes) == [PROCEDIMENTOS[2]]
+    # O termo não atravessa de um campo para o outro
+    assert dataset.search("ectomia2", campos) == []
+
+
+def test_recarrega_quando_o_arquivo_muda(tmp_path):
+    caminho = _gravar(tmp_path, "especialidades.json", [{"COD_ESPECIALIDADE": 1}], mtime=1000)
+    repo = MockRepository(str(tmp_path))
+    primeiro = repo.dataset("especialidades.json")
+    assert repo.dataset("especialidades.json") is primeiro
+
+    _gravar(tmp_path, "especialidades.json", [{"COD_ESPECIALIDADE": 1}, {"COD_ESPECIALIDADE": 2}], mtime=2000)
+    assert len(repo.dataset("especialidades.json").rows) == 2
+
+    # .jsonl tem prioridade sobre o .json
+    _gravar(tmp_path, "especialidades.jsonl", [{"COD_ESPECIALIDADE": 3}])
+    assert repo.dataset("especialidades.json").rows == [{"COD_ESPECIALIDADE": 3}]
+    assert os.path.exists(caminho)
+
+
+def test_arquivo_ausente(tmp_path):
+    repo = MockRepository(str(tmp_path))
+    assert not repo.dataset("pacientes.json").exists
+    assert repo.status()["pacientes.json"]["loaded"] is False
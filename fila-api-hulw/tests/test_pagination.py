@@ -0,0 +1,54 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def _forjar(valor) -> str:
+    return base64.urlsafe_b64encode(json.dumps(valor).encode()).decode().rstrip("=")
+
+
+def test_cursor_ida_e_volta():
+    assert decode_cursor(encode_cursor("Cardiologia", 12)) == ("Cardiologia", 12)
+    assert decode_cursor(encode_cursor(None, 3)) == (None, 3)
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor(1, "x"),
+    encode_cursor("a", "1"),
+    encode_cursor("a", True),
+    _forjar(["a", 1, 2]),
+    _forjar({"nome": "a", "pk": 1}),
+    _forjar("a"),
+    "não é base64",
+])
+def test_cursor_forjado_e_invalido(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor(1, "x"), _forjar([None, "1"]), "%%%"])
+def test_cursor_forjado_na_listagem_da_400(client, cursor):
+    for url in ("/api/v1/especialidades/", "/api/v1/procedimentos/", "/api/v1/pacientes/"):
+        r = client.get(url, params={"cursor": cursor})
+        assert r.status_code == 400, url
+        assert r.json()["detail"] == "Cursor inválido"
+
+
+def test_paginas_pelo_cursor_cobrem_a_lista(client):
+    vistos = []
+    params = {"limit": 7}
+    while True:
+        r = client.get("/api/v1/especialidades/", params=params)
+        assert r.status_code == 200
+        vistos += [item["COD_ESPECIALIDADE"] for item in r.json()]
+        proximo = r.headers.get(NEXT_CURSOR_HEADER)
+        if not proximo:
+            break
+        params = {"limit": 7, "cursor": proximo}
+    todos = client.get("/api/v1/especialidades/", params={"limit": 1000}).json()
+    assert vistos == [item["COD_ESPECIALIDADE"] for item in todos]
@@ -0,0 +1,51 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.projection import resolve_fields
+from app.repositories.sql import pacientes
+from app.schemas.paciente import Paciente
+
+TODOS = tuple(Paciente.model_fields)
+CHAVES = ("NOME_PACIENTE", "PRONTUARIO_PAC")
+
+
+@pytest.mark.parametrize("fields, esperado", [
+    (None, TODOS),
+    ("", TODOS),
+    ("full", TODOS),
+    ("autocomplete", CHAVES),
+    # Ordem do schema, sem repetir, ignorando vírgulas sobrando
+    ("FONE_RECADO, autocomplete,,DDD_FONE_RECADO,FONE_RECADO", CHAVES + ("DDD_FONE_RECADO", "FONE_RECADO")),
+    ("autocomplete,full", TODOS),
+])
+def test_resolve_fields(fields, esperado):
+    assert resolve_fields(fields, Paciente, pacientes) == esperado
+
+
+def test_campo_desconhecido_e_400(client):
+    with pytest.raises(HTTPException) as erro:
+        resolve_fields("autocomplete,CPF", Paciente, pacientes)
+    assert erro.value.status_code == 400
+    assert "'CPF'" in erro.value.detail
+
+    assert client.get("/api/v1/pacientes/", params={"fields": "CPF"}).status_code == 400
+
+
+def test_select_so_com_as_colunas_pedidas():
+    select = pacientes._select(("FONE_RECADO",))
+    assert '"FONE_RECADO"' in select
+    assert all(f'"{c}"' in select for c in CHAVES)  # o cursor precisa de nome e chave
+    assert '"DDD_FONE_RESIDENCIAL"' not in select
+    assert all(f'"{c}"' in pacientes._select() for c in TODOS)
+
+
+def test_listagem_e_busca_por_codigo_com_fields(client):
+    itens = client.get("/api/v1/pacientes/", params={"limit": 5, "fields": "autocomplete"}).json()
+    assert itens and all(tuple(item) == CHAVES for item in itens)
+
+    prontuario = itens[0]["PRONTUARIO_PAC"]
+    item = client.get(f"/api/v1/pacientes/{prontuario}", params={"fields": "PRONTUARIO_PAC,FONE_RECADO"}).json()
+    assert set(item) == {"PRONTUARIO_PAC", "FONE_RECADO"}
+
+    completo = client.get(f"/api/v1/pacientes/{prontuario}").json()
+    assert tuple(completo) == TODOS
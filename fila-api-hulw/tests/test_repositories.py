@@ -0,0 +1,35 @@
+import pytest
+
+from app.repositories import memory, sql
+from app.repositories.base import CatalogRepository, ProcedimentoRepository
+
+
+class _SemExport(CatalogRepository):
+    nome_key, pk_key = "NOME", "PK"
+
+    async def search(self, term, cursor=None, skip=0, limit=25, fields=None, **filtros):
+        return []
+
+    async def get(self, pk, fields=None):
+        return None
+
+
+def test_backend_incompleto_falha_ao_instanciar():
+    with pytest.raises(TypeError, match="export"):
+        _SemExport()
+
+
+def test_procedimentos_exigem_pares():
+    class SemPares(ProcedimentoRepository, _SemExport):
+        async def export(self, fields=None, updated_since=None):
+            yield []
+
+    with pytest.raises(TypeError, match="pares"):
+        SemPares()
+
+
+@pytest.mark.parametrize("backend", [memory, sql])
+def test_backends_implementam_a_interface(backend):
+    for recurso in ("pacientes", "especialidades", "profissionais"):
+        assert isinstance(getattr(backend, recurso), CatalogRepository)
+    assert isinstance(backend.procedimentos, ProcedimentoRepository)
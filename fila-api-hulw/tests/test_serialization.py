@@ -0,0 +1,65 @@
+import datetime
+import decimal
+import json
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine, text
+
+from app.core import serialization
+from app.core.serialization import dumps, fast_list_response, rows_to_dicts
+from app.schemas.especialidade import Especialidade
+
+CONTEUDO = {
+    "nome": "Cirurgia Pediátrica",
+    "data": datetime.date(2024, 2, 29),
+    "hora": datetime.datetime(2024, 2, 29, 13, 5, 1),
+    "valor": decimal.Decimal("1.5"),
+    "lista": [1, None, True],
+}
+
+
+def test_orjson_instalado():
+    assert serialization.orjson is not None
+
+
+def test_mesma_saida_com_e_sem_orjson(monkeypatch):
+    com_orjson = dumps(CONTEUDO)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert dumps(CONTEUDO) == com_orjson
+    assert json.loads(com_orjson)["hora"] == "2024-02-29T13:05:01"
+
+
+def test_tipo_desconhecido():
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+
+
+def _rows():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        return conn.execute(text(
+            'SELECT 2 AS "COD_ESPECIALIDADE", \'Ortopedia\' AS "NOME_ESPECIALIDADE", 1 AS "EXTRA"'
+        )).fetchall()
+
+
+def test_rows_to_dicts_recorta_pelo_schema():
+    esperado = [{"COD_ESPECIALIDADE": 2, "NOME_ESPECIALIDADE": "Ortopedia"}]
+    assert rows_to_dicts(_rows(), Especialidade) == esperado
+    assert rows_to_dicts([{**esperado[0], "EXTRA": 1}], Especialidade) == esperado
+    assert rows_to_dicts(_rows(), Especialidade, ["NOME_ESPECIALIDADE"]) == [{"NOME_ESPECIALIDADE": "Ortopedia"}]
+    # Coluna ausente vira null, como no response_model
+    assert rows_to_dicts([{"COD_ESPECIALIDADE": 3}], Especialidade) == [{"COD_ESPECIALIDADE": 3, "NOME_ESPECIALIDADE": None}]
+
+
+def test_fast_list_response_copia_os_headers():
+    response = Response()
+    response.headers["X-Next-Cursor"] = "abc"
+    resposta = fast_list_response(_rows(), Especialidade, response)
+    assert resposta.headers["x-next-cursor"] == "abc"
+    assert json.loads(resposta.body) == [{"COD_ESPECIALIDADE": 2, "NOME_ESPECIALIDADE": "Ortopedia"}]
+
+
+def test_listagem_igual_ao_response_model(client):
+    itens = client.get("/api/v1/especialidades/", params={"limit": 5}).json()
+    assert itens == [Especialidade(**item).model_dump() for item in itens]
@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db import session
+
+
+def test_engine_do_postgres_com_o_pool_configurado(monkeypatch):
+    for nome, valor in {"AGHU_DATABASE_URL": "", "DB_POOL_SIZE": 3, "DB_MAX_OVERFLOW": 2,
+                        "DB_POOL_TIMEOUT": 1.5, "DB_POOL_RECYCLE": 60, "DB_STATEMENT_TIMEOUT_MS": 2500}.items():
+        monkeypatch.setattr(settings, nome, valor)
+    chamadas = []
+
+    def criar(url, **kwargs):
+        chamadas.append(kwargs)
+        return create_async_engine(url, **kwargs)
+
+    monkeypatch.setattr(session, "create_async_engine", criar)
+    engine = session._build_engine()  # não conecta
+
+    assert engine.url.drivername == "postgresql+asyncpg"
+    pool = engine.pool
+    assert (pool.size(), pool._max_overflow, pool._timeout, pool._recycle, pool._pre_ping) == (3, 2, 1.5, 60, True)
+    (kwargs,) = chamadas
+    assert kwargs["connect_args"]["command_timeout"] == 2.5
+    assert kwargs["connect_args"]["server_settings"]["statement_timeout"] == "2500"
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Banco SQLite com pool de uma conexão só, para ver a espera e o timeout."""
+    caminho = tmp_path / "t.db"
+    with sqlite3.connect(caminho) as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, nome TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(1, "a"), (2, "b")])
+    engine = create_async_engine(f"sqlite+aiosqlite:///{caminho}", pool_size=1, max_overflow=0, pool_timeout=0.1)
+    execucoes = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: execucoes.append(statement))
+    monkeypatch.setattr(session, "engine", engine)
+    monkeypatch.setattr(session, "pool_stats", session.PoolStats())
+    yield execucoes
+    asyncio.run(engine.dispose())
+
+
+def test_consultas_iguais_simultaneas_vao_uma_vez_ao_banco(banco):
+    consulta = text("SELECT nome FROM t WHERE id = :id")
+
+    async def cenario():
+        iguais = await asyncio.gather(*(session.fetch_all(consulta, {"id": 1}) for _ in range(4)))
+        outra = await session.fetch_one(consulta, {"id": 2})
+        return iguais, outra
+
+    iguais, outra = asyncio.run(cenario())
+    assert [r[0] for r in iguais[0]] == ["a"]
+    assert all(r is iguais[0] for r in iguais)
+    assert outra[0] == "b"
+    assert len(banco) == 2
+
+
+def test_pool_cheio_conta_espera_e_timeout(banco):
+    async def cenario():
+        async with session.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with session.connect():
+                    pass
+        # Devolvida a conexão, o pool volta a atender
+        return await session.fetch_one(text("SELECT 1"))
+
+    assert asyncio.run(cenario())[0] == 1
+    foto = session.pool_stats.snapshot()
+    assert (foto["size"], foto["waits"], foto["timeouts"], foto["waiting"]) == (1, 1, 1, 0)
+    assert foto["wait_seconds"] >= 0.1
+    assert "fila_api_db_pool_timeouts_total 1" in session._pool_metrics()
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_threads_com_a_mesma_chave_compartilham_uma_chamada():
+    sf = SingleFlight()
+    chamadas = []
+    liberar = threading.Event()
+
+    def consulta():
+        chamadas.append(1)
+        liberar.wait(2)
+        return ["linha"]
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(sf.do("k", consulta))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)  # todas esperando a primeira
+    liberar.set()
+    for t in threads:
+        t.join(2)
+
+    assert chamadas == [1]
+    assert len(resultados) == 5
+    assert all(r is resultados[0] for r in resultados)
+
+
+def test_erro_propaga_e_libera_a_chave():
+    sf = SingleFlight()
+
+    def falha():
+        raise ValueError("falhou")
+
+    with pytest.raises(ValueError):
+        sf.do("k", falha)
+    assert sf.do("k", lambda: 2) == 2
+
+
+def test_async_coalesce_so_chamadas_em_andamento():
+    sf = AsyncSingleFlight()
+    chamadas = []
+
+    async def consulta(valor):
+        chamadas.append(valor)
+        await asyncio.sleep(0.01)
+        return valor
+
+    async def cenario():
+        iguais = await asyncio.gather(*(sf.do("a", lambda: consulta("a")) for _ in range(4)))
+        outra = await sf.do("b", lambda: consulta("b"))
+        de_novo = await sf.do("a", lambda: consulta("a"))  # terminou: não é cache
+        return iguais, outra, de_novo
+
+    iguais, outra, de_novo = asyncio.run(cenario())
+    assert iguais == ["a"] * 4
+    assert (outra, de_novo) == ("b", "a")
+    assert chamadas == ["a", "b", "a"]
+
+
+def test_async_erro_propaga_para_os_que_esperam():
+    sf = AsyncSingleFlight()
+    chamadas = []
+
+    async def consulta():
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("banco fora")
+
+    async def cenario():
+        return await asyncio.gather(*(sf.do("k", consulta) for _ in range(3)), return_exceptions=True)
+
+    erros = asyncio.run(cenario())
+    assert chamadas == [1]
+    assert all(isinstance(e, RuntimeError) for e in erros)
+
+
+def test_async_cancelar_um_chamador_nao_cancela_os_demais():
+    sf = AsyncSingleFlight()
+
+    async def consulta():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def cenario():
+        primeiro = asyncio.ensure_future(sf.do("k", consulta))
+        segundo = asyncio.ensure_future(sf.do("k", consulta))
+        await asyncio.sleep(0)
+        primeiro.cancel()
+        return await segundo, primeiro.cancelled()
+
+    assert asyncio.run(cenario()) == ("ok", True)
@@ -0,0 +1,52 @@
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi import Response
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.pagination import NEXT_CURSOR_HEADER, finish_page
+from app.db import session
+from app.db.aghu_local import instalar_schema_sqlite
+from app.repositories.sql import pacientes
+
+NOMES = ["Bruna", None, "Ana", None, "", "Carlos", "Ana", None]
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """Réplica SQLite mínima do AGHU com pacientes sem nome."""
+    caminho = tmp_path / "aghu.db"
+    with sqlite3.connect(caminho) as conn:
+        conn.execute("""
+            CREATE TABLE aip_pacientes (
+                prontuario INTEGER PRIMARY KEY, nome TEXT, ddd_fone_residencial INTEGER,
+                fone_residencial INTEGER, ddd_fone_recado INTEGER, fone_recado INTEGER
+            )
+        """)
+        conn.executemany("INSERT INTO aip_pacientes (prontuario, nome) VALUES (?, ?)",
+                         list(enumerate(NOMES, start=1)))
+    url = f"sqlite+aiosqlite:///{caminho}"
+    engine = create_async_engine(url)
+    instalar_schema_sqlite(engine.sync_engine, url)
+    monkeypatch.setattr(session, "engine", engine)
+    yield
+    asyncio.run(engine.dispose())
+
+
+async def _percorrer(limit):
+    vistos, cursor = [], None
+    while True:
+        response = Response()
+        rows = await pacientes.search(None, cursor=cursor, limit=limit)
+        pagina = finish_page(rows, limit, pacientes.nome_key, pacientes.pk_key, response)
+        vistos += [row._mapping["PRONTUARIO_PAC"] for row in pagina]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return vistos
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_nomes_nulos_nao_pulam_nem_repetem_linhas(replica, limit):
+    esperado = [pk for pk, nome in sorted(enumerate(NOMES, start=1), key=lambda par: (par[1] or "", par[0]))]
+    assert asyncio.run(_percorrer(limit)) == esperado
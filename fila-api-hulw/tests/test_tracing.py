@@ -0,0 +1,56 @@
+import re
+
+from app.core import metrics
+from app.core.tracing import Trace, _trace, record, timed
+
+
+def test_request_id_recebido_volta_na_resposta(client):
+    resposta = client.get("/api/v1/especialidades/1", headers={"X-Request-ID": "abc-123"})
+    assert resposta.headers["x-request-id"] == "abc-123"
+
+
+def test_request_id_invalido_e_gerado(client):
+    resposta = client.get("/", headers={"X-Request-ID": "com espaco"})
+    assert re.fullmatch(r"[0-9a-f]{32}", resposta.headers["x-request-id"])
+
+
+def test_server_timing_com_a_fase_json(client):
+    timing = client.get("/api/v1/profissionais/", params={"limit": 3, "q": "tracing"}).headers["server-timing"]
+    assert re.fullmatch(r'json;dur=[\d.]+;desc="JSON", total;dur=[\d.]+', timing)
+
+
+def test_fases_acumulam_so_com_trace_ativo():
+    record("db", 1.0)  # sem requisição: ignorado
+    trace = Trace("x")
+    token = _trace.set(trace)
+    try:
+        record("db", 0.002)
+        with timed("db"):
+            pass
+    finally:
+        _trace.reset(token)
+    assert set(trace.phases) == {"db"}
+    assert trace.phases["db"] >= 0.002
+    assert trace.server_timing().startswith('db;dur=')
+
+
+def test_metricas_por_rota(client):
+    client.get("/api/v1/especialidades/999999999")
+    texto = client.get("/metrics").text
+    rota = 'route="/api/v1/especialidades/{cod_especialidade}",method="GET"'
+    assert f'fila_api_http_requests_total{{{rota},status="404"}}' in texto
+    assert re.search(rf'^fila_api_http_request_duration_seconds_count{{{re.escape(rota)}}} [1-9]', texto, re.M)
+    assert re.search(rf'^fila_api_http_response_size_bytes_bucket{{{re.escape(rota)},le="\+Inf"}} [1-9]', texto, re.M)
+    assert "fila_api_http_requests_in_flight 1" in texto  # a própria /metrics
+
+
+def test_histograma_acumulado(monkeypatch):
+    monkeypatch.setattr(metrics, "REGISTRY", list(metrics.REGISTRY))  # não vaza para /metrics
+    histograma = metrics.Histogram("teste_seconds", "Teste.", ("rota",), buckets=(0.1, 1.0))
+    for segundos in (0.05, 0.5, 3):
+        histograma.observe(("r",), segundos)
+    linhas = histograma.render()
+    assert 'teste_seconds_bucket{rota="r",le="0.1"} 1' in linhas
+    assert 'teste_seconds_bucket{rota="r",le="1.0"} 2' in linhas
+    assert 'teste_seconds_bucket{rota="r",le="+Inf"} 3' in linhas
+    assert 'teste_seconds_count{rota="r"} 3' in linhas
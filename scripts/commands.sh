@@ -13,4 +13,10 @@ echo "âœ… Postgres Database Started Successfully ($POSTGRES_HOST:$POSTGRES_P
 python manage.py collectstatic --noinput
 python manage.py makemigrations --noinput
 python manage.py migrate --noinput
-python manage.py runserver 0.0.0.0:8050
\ No newline at end of file
+# DJANGO_SERVER=asgi sobe o projeto sob uvicorn (views async de autocomplete
+# não prendem workers); o padrão continua sendo o runserver de desenvolvimento.
+if [ "$DJANGO_SERVER" = "asgi" ]; then
+  uvicorn gestor_fila_hulw.asgi:application --host 0.0.0.0 --port 8050 --workers "${WEB_CONCURRENCY:-4}"
+else
+  python manage.py runserver 0.0.0.0:8050
+fi